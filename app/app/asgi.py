@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+# Serve API reads from async views, see recipe.asyncviews.
+os.environ.setdefault('RECIPE_ASYNC_READS', '1')
 
 application = get_asgi_application()
@@ -38,16 +38,21 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'core',
     'user',
     'rest_framework',
     'rest_framework.authtoken',
     'drf_spectacular',
-    'recipe'
+    'recipe',
+    'benchmark',
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.queries.QueryInspectionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,6 +63,8 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'app.urls'
 
+TEST_RUNNER = 'core.testing.QueryInspectionRunner'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -88,14 +95,171 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # }
 
 # PostgreSQL database configuration
+# Each thread keeps its connection for DB_CONN_MAX_AGE seconds and checks
+# it before reusing it in a new request. DB_POOL_SIZE > 0 shares a pool of
+# that many connections between all threads of a process instead, which
+# suits threaded and ASGI workers. See core.backends.postgresql.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '0'))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.backends.postgresql',
         'NAME': os.environ.get('DB_NAME', 'devdb'),
         'USER': os.environ.get('DB_USER', 'devuser'),
         'PASSWORD': os.environ.get('DB_PASS', 'changeme'),
         'HOST': os.environ.get('DB_HOST', 'db'),
+        'CONN_MAX_AGE': 0 if DB_POOL_SIZE else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
+        'POOL_SIZE': DB_POOL_SIZE,
+        'POOL_TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+    }
+}
+
+# Read replicas, one per host in DB_REPLICA_HOSTS. Tests use the primary
+# in their place. Pointing a replica at the primary's host gives a local
+# stand-in.
+DB_REPLICA_HOSTS = [host for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host]
+
+for index, host in enumerate(DB_REPLICA_HOSTS):
+    DATABASES[f'replica{index}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Safe recipe API requests read from one random replica per request unless
+# the user wrote within STICKY_SECONDS. Sticky users are remembered in the
+# cache CACHE_ALIAS, which must be shared between processes and kept
+# outside the database; startup fails otherwise.
+DATABASE_REPLICAS = {
+    'ALIASES': [f'replica{index}' for index in range(len(DB_REPLICA_HOSTS))],
+    'STICKY_SECONDS': int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5')),
+    'CACHE_ALIAS': 'default',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# The web and worker processes share memcached at CACHE_LOCATION, so cache
+# invalidations, revoked tokens and sticky reads reach all of them.
+# CACHE_BACKEND=database falls back to a table created by `manage.py
+# createcachetable`. Every lookup is then a query on the primary, which
+# only suits setups without replicas. Tests use TEST_CACHES.
+CACHE_BACKENDS = {
+    'memcached': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', '127.0.0.1:11211'),
+    },
+    'database': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'api_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', '10000')),
+        },
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[os.environ.get('CACHE_BACKEND', 'memcached')],
+}
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+RECIPE_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+}
+
+RECIPE_BATCH = {
+    'MAX_OPERATIONS': 500,
+}
+
+# Under ASGI, exports are written to a temporary file before they are sent,
+# in memory up to SPOOL_MAX_SIZE bytes.
+RECIPE_EXPORT = {
+    'CHUNK_SIZE': 2000,
+    'SPOOL_MAX_SIZE': 8 * 1024 * 1024,
+}
+
+RECIPE_IMPORT = {
+    'BATCH_SIZE': 1000,
+    'MAX_ERRORS': 1000,
+}
+
+RECIPE_SEARCH = {
+    'CONFIG': 'english',
+}
+
+# FAST_LIST builds recipe list responses from plain rows instead of model
+# instances and DRF fields. The output is the same either way.
+RECIPE_SERIALIZERS = {
+    'FAST_LIST': os.environ.get('RECIPE_FAST_LIST', '0') == '1',
+}
+
+# READS serves recipe, tag and ingredient reads from async views on a pool
+# of THREADS threads, each holding at most one database connection. The
+# ASGI entrypoint turns it on, WSGI servers keep plain sync views.
+RECIPE_ASYNC = {
+    'READS': os.environ.get('RECIPE_ASYNC_READS', '0') == '1',
+    'THREADS': int(os.environ.get('RECIPE_ASYNC_THREADS', '16')),
+}
+
+# Responses of these content types are compressed with brotli, when it is
+# installed, or gzip. Responses below MIN_SIZE bytes are sent as they are,
+# streaming responses are always compressed. HTML is left out: admin and
+# browsable API pages put CSRF tokens next to reflected input, which
+# compression would expose to BREACH.
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': 1024,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'CONTENT_TYPES': [
+        'application/json',
+        'application/x-ndjson',
+        'application/vnd.oai.openapi',
+        'text/csv',
+    ],
+}
+
+# Query counts, database, serializer and total time and response sizes are
+# recorded per view action and exposed at /api/metrics/ for Prometheus,
+# along with list cache hits and misses. Metrics are off unless API_METRICS
+# is 1. Scrapes must send "Authorization: Bearer <TOKEN>" when TOKEN is set,
+# which is required with DEBUG off.
+# SERVER_TIMING also sends each request's timings in a Server-Timing header.
+API_METRICS = {
+    'ENABLED': os.environ.get('API_METRICS', '0') == '1',
+    'SERVER_TIMING': os.environ.get('API_SERVER_TIMING', '0') == '1',
+    'TOKEN': os.environ.get('API_METRICS_TOKEN', ''),
+}
+
+# Queries of each request are grouped by shape. MODE 'log' writes queries
+# slower than SLOW_QUERY_MS and shapes repeated more than REPEAT_THRESHOLD
+# times to the core.queries logger as JSON with the calling code, 'strict'
+# also raises on repeats. Tests run in TEST_MODE, see core.testing.
+QUERY_INSPECTION = {
+    'MODE': os.environ.get('QUERY_INSPECTION', 'off'),
+    'TEST_MODE': os.environ.get('QUERY_INSPECTION_TEST', 'strict'),
+    'REPEAT_THRESHOLD': int(os.environ.get('QUERY_REPEAT_THRESHOLD', '10')),
+    'SLOW_QUERY_MS': int(os.environ.get('SLOW_QUERY_MS', '200')),
+}
+
+# Token lookups are cached in-process for LOCAL_TIMEOUT seconds and in the
+# ALIAS cache for TIMEOUT. ALIAS must be shared between processes, or
+# deleted tokens would stay valid elsewhere; startup fails otherwise. A
+# database cache is skipped, a lookup there costs as much as the token query.
+TOKEN_AUTH_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+    'LOCAL_TIMEOUT': 30,
+    'LOCAL_MAXSIZE': 1024,
 }
 
 
@@ -141,6 +305,22 @@ MEDIA_URL = '/static/media/'
 STATIC_ROOT = '/vol/web/static'
 MEDIA_ROOT = '/vol/web/media'
 
+# Resized copies of uploaded recipe images. PIPELINE is 'queue' to have the
+# process_image_jobs worker create them, or 'sync' to create them in the request.
+# Uploads above MAX_UPLOAD_BYTES or MAX_PIXELS are rejected while streaming.
+# Jobs running for longer than STALE_SECONDS are picked up again.
+RECIPE_IMAGES = {
+    'WIDTHS': [160, 480, 960],
+    'FORMATS': ['webp', 'jpeg'],
+    'QUALITY': 80,
+    'PIPELINE': os.environ.get('RECIPE_IMAGE_PIPELINE', 'queue'),
+    'MAX_ATTEMPTS': 3,
+    'STALE_SECONDS': 600,
+    'MAX_UPLOAD_BYTES': 10 * 2 ** 20,
+    'MAX_PIXELS': 25_000_000,
+    'MAX_HEADER_BYTES': 256 * 2 ** 10,
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -148,8 +328,19 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = "core.User"
 
+# The JSON renderer and parser use orjson when it is installed and the
+# stdlib otherwise.
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
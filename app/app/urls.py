@@ -22,12 +22,15 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from core.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/schema/", SpectacularAPIView.as_view(), name="api-schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="api-schema"), name="api-docs"),
     path("api/user/", include("user.urls")),
     path("api/recipe/", include("recipe.urls")),
+    path("api/metrics/", metrics, name="api-metrics"),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,194 @@
+"""
+Synthetic data for benchmarks.
+"""
+import io
+import os
+import random
+from collections import Counter
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from PIL import Image
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.counters import add_counts
+from recipe.search import update_search_vectors
+
+
+EMAIL = "bench-api-{index}@example.com"
+PASSWORD = "bench-pass"
+IMAGE_DIR = "uploads/recipe"
+IMAGE_PREFIX = f"{IMAGE_DIR}/bench-api"
+
+ADJECTIVES = [
+    "spicy", "creamy", "crispy", "smoky", "quick", "rustic", "lemony", "garlic",
+    "sweet", "roasted", "grilled", "baked", "fresh", "hearty", "tangy", "herbed",
+]
+DISHES = [
+    "curry", "soup", "salad", "pasta", "stew", "risotto", "tacos", "pie",
+    "noodles", "burger", "omelette", "pancakes", "chili", "casserole", "bowl", "tart",
+]
+INGREDIENTS = [
+    "chicken", "beef", "tofu", "salmon", "rice", "potato", "tomato", "onion",
+    "garlic", "ginger", "lemon", "basil", "spinach", "mushroom", "cheese", "egg",
+    "butter", "flour", "chickpea", "lentil", "carrot", "pepper", "coconut", "lime",
+]
+TAGS = [
+    "dinner", "lunch", "breakfast", "vegan", "vegetarian", "quick", "healthy",
+    "dessert", "spicy", "budget", "family", "party", "gluten free", "low carb",
+]
+
+
+def jpeg(width=800, height=600, seed=0):
+    """Return a JPEG of noise, which is about as hard to compress as a photo."""
+    pixels = random.Random(seed).randbytes(width * height * 3)
+    img = Image.frombytes("RGB", (width, height), pixels)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def _names(words, count):
+    """Return count distinct names, numbering words once they run out."""
+    return [
+        words[i % len(words)] + (f" {i // len(words) + 1}" if i >= len(words) else "")
+        for i in range(count)
+    ]
+
+
+def _weights(count):
+    """Return Zipf weights, a few items are picked far more often than most."""
+    return [1 / (rank + 1) for rank in range(count)]
+
+
+def _pick(rng, items, weights, count):
+    """Pick count distinct items by weight."""
+    count = min(count, len(items))
+    picked = set()
+    while len(picked) < count:
+        picked.add(rng.choices(range(len(items)), weights)[0])
+    return [items[i] for i in sorted(picked)]
+
+
+def save_images(storage):
+    """Store an image with derivatives shared by generated recipes.
+
+    Returns the image name and the derivatives in the layout of
+    `recipe.images.generate_derivatives()`.
+    """
+    source = jpeg()
+    name = storage.save(f"{IMAGE_PREFIX}.jpg", ContentFile(source))
+    derivatives = {}
+    for fmt, pil_format in (("webp", "WEBP"), ("jpeg", "JPEG")):
+        for width in (160, 480):
+            img = Image.open(io.BytesIO(source))
+            img.thumbnail((width, width))
+            buffer = io.BytesIO()
+            img.save(buffer, format=pil_format, quality=80)
+            derivatives.setdefault(fmt, {})[str(width)] = storage.save(
+                f"{IMAGE_PREFIX}-{width}.{fmt}", ContentFile(buffer.getvalue()),
+            )
+    return name, derivatives
+
+
+def generate(seed=1, users=10, recipes=50, tags=20, ingredients=60, image_ratio=0.5):
+    """Create users with recipes, tags, ingredients and images.
+
+    The data only depends on the arguments. Recipes per user, their tags
+    and ingredients vary around the given numbers, with a few tags and
+    ingredients used by most recipes. Returns the users, who log in with
+    `PASSWORD`.
+    """
+    rng = random.Random(seed)
+    password = make_password(PASSWORD)
+    created = get_user_model().objects.bulk_create(
+        get_user_model()(email=EMAIL.format(index=i), name=f"Bench {i}", password=password)
+        for i in range(users)
+    )
+
+    planned, with_image = [], []
+    for user in created:
+        for _ in range(rng.randint(recipes // 2, recipes * 3 // 2)):
+            recipe = Recipe(
+                user=user,
+                title=f"{rng.choice(ADJECTIVES)} {rng.choice(INGREDIENTS)} {rng.choice(DISHES)}",
+                description=" ".join(rng.choices(INGREDIENTS + ADJECTIVES, k=20)),
+                time_minutes=rng.randint(5, 180),
+                price=Decimal(rng.randint(100, 5000)) / 100,
+            )
+            if rng.random() < image_ratio:
+                with_image.append(recipe)
+            counts = {"tags": rng.randint(0, 5), "ingredients": rng.randint(3, 12)}
+            planned.append((user, recipe, counts))
+    if with_image:
+        image, derivatives = save_images(Recipe._meta.get_field("image").storage)
+        for recipe in with_image:
+            recipe.image, recipe.image_derivatives = image, derivatives
+    Recipe.objects.bulk_create(recipe for _, recipe, _ in planned)
+
+    for model, words, per_user, field in (
+        (Tag, TAGS, tags, "tags"),
+        (Ingredient, INGREDIENTS, ingredients, "ingredients"),
+    ):
+        objs = model.objects.bulk_create(
+            model(user=user, name=name)
+            for user in created
+            for name in _names(words, per_user)
+        )
+        by_user = {
+            user.id: objs[i * per_user:(i + 1) * per_user] for i, user in enumerate(created)
+        }
+        weights = _weights(per_user)
+        through = getattr(Recipe, field).through
+        fk_name = f"{model.__name__.lower()}_id"
+        links = through.objects.bulk_create(
+            through(recipe_id=recipe.id, **{fk_name: obj.id})
+            for user, recipe, counts in planned
+            for obj in _pick(rng, by_user[user.id], weights, counts[field])
+        )
+        add_counts(model, Counter(getattr(link, fk_name) for link in links))
+
+    update_search_vectors(Recipe.objects.filter(user__in=created))
+    return created
+
+
+def stored_images(storage):
+    """Return the names of the files in the recipe image directory."""
+    if not storage.exists(IMAGE_DIR):
+        return set()
+    return {f"{IMAGE_DIR}/{name}" for name in storage.listdir(IMAGE_DIR)[1]}
+
+
+def cleanup(users, stored=None):
+    """Delete the users with their data and the stored images.
+
+    With the names `stored_images()` returned before the run, files added
+    since that no recipe refers to are deleted too, such as images that
+    uploads replaced.
+    """
+    storage = Recipe._meta.get_field("image").storage
+    names = set()
+    for recipe in Recipe.objects.filter(user__in=users, image__isnull=False).exclude(image=""):
+        names.add(recipe.image.name)
+        names.update(
+            name
+            for widths in recipe.image_derivatives.values()
+            for name in widths.values()
+        )
+    get_user_model().objects.filter(pk__in=[user.pk for user in users]).delete()
+    if stored is not None:
+        added = stored_images(storage) - stored - names
+        # Derivatives are named after their image, "<image>-<width>.<format>".
+        referenced = {
+            os.path.splitext(name)[0]
+            for name in Recipe.objects.filter(image__in=added).values_list("image", flat=True)
+        }
+        names.update(
+            name for name in added
+            if os.path.splitext(name)[0] not in referenced
+            and name.rsplit("-", 1)[0] not in referenced
+        )
+    for name in names:
+        storage.delete(name)
@@ -0,0 +1,143 @@
+'''
+Load test the API with generated data and report results per scenario.
+'''
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from benchmark.data import cleanup, generate, stored_images
+from benchmark.reports import build_report, compare, load_report, save_report
+from benchmark.scenarios import SCENARIOS, fixture, wsgi_request
+from benchmark.utils import summarize
+from core.models import Recipe
+
+
+class Command(BaseCommand):
+    '''Django command to run API scenarios against the local database.
+
+    Data is generated from --seed and every worker draws its requests
+    from its own seeded generator, so runs with the same options send
+    the same requests. Requests go through the WSGI handler with the full
+    middleware stack from worker threads. Data is committed for them to
+    see and removed afterwards. Save a report with --output and compare
+    a later run, e.g. of another commit, with --compare.
+    '''
+    help = "Report throughput, p50 and p99 per scenario, optionally compared with an earlier run."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS),
+        )
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--recipes", type=int, default=50, help="Recipes per user on average.")
+        parser.add_argument("--tags", type=int, default=20, help="Tags per user.")
+        parser.add_argument("--ingredients", type=int, default=60, help="Ingredients per user.")
+        parser.add_argument("--image-ratio", type=float, default=0.5)
+        parser.add_argument("--output", help="Write the report as JSON to this file.")
+        parser.add_argument("--compare", help="Compare with a report written by --output.")
+
+    def _run(self, scenario, users, options, offset):
+        '''Send the scenario's requests from worker threads.'''
+        handler = WSGIHandler()
+        total, threads = options["requests"], options["threads"]
+        samples, errors = [], []
+
+        def worker(index):
+            rng = random.Random(f"{options['seed']}:{scenario}:{offset}:{index}")
+            try:
+                for i in range(index, total, threads):
+                    user = users[i % len(users)]
+                    request = SCENARIOS[scenario](rng, user)
+                    start = time.perf_counter()
+                    status = wsgi_request(handler, request, user)
+                    samples.append(time.perf_counter() - start)
+                    if status >= 400:
+                        errors.append(status)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return samples, errors, time.perf_counter() - start
+
+    def _result(self, samples, errors, elapsed):
+        '''Return the summary of a scenario run.'''
+        stats = summarize(samples)
+        return {
+            "requests": stats["count"],
+            "errors": len(errors),
+            "throughput": stats["count"] / elapsed,
+            "p50": stats["p50"],
+            "p99": stats["p99"],
+            "mean": stats["mean"],
+        }
+
+    def _write(self, name, result):
+        '''Write one report line.'''
+        self.stdout.write(
+            f"{name:<8} {result['throughput']:8.1f} req/s "
+            f"p50={result['p50'] * 1000:8.3f}ms "
+            f"p99={result['p99'] * 1000:8.3f}ms "
+            f"n={result['requests']} errors={result['errors']}"
+        )
+
+    def _write_changes(self, baseline, report):
+        '''Write the changes since the baseline report.'''
+        commit = baseline.get("commit") or {}
+        sha = commit.get("sha", "unknown")[:12]
+        self.stdout.write(f"compared with {sha} from {baseline['created']}")
+        for name, change in compare(baseline, report).items():
+            self.stdout.write(
+                f"{name:<8} throughput {change['throughput']:+7.1%} "
+                f"p50 {change['p50']:+7.1%} p99 {change['p99']:+7.1%}"
+            )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        baseline = load_report(options["compare"]) if options["compare"] else None
+        # Thumbnail URLs are made absolute, which validates the host.
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        stored = stored_images(Recipe._meta.get_field("image").storage)
+        created = generate(
+            seed=options["seed"],
+            users=options["users"],
+            recipes=options["recipes"],
+            tags=options["tags"],
+            ingredients=options["ingredients"],
+            image_ratio=options["image_ratio"],
+        )
+        try:
+            users = [fixture(user, host) for user in created]
+            results = {}
+            for scenario in options["scenarios"]:
+                if options["warmup"]:
+                    warmup = {**options, "requests": options["warmup"]}
+                    self._run(scenario, users, warmup, "warmup")
+                results[scenario] = self._result(*self._run(scenario, users, options, "run"))
+                self._write(scenario, results[scenario])
+        finally:
+            cleanup(created, stored)
+
+        report = build_report({
+            key: options[key] for key in (
+                "scenarios", "requests", "warmup", "threads", "seed", "users",
+                "recipes", "tags", "ingredients", "image_ratio",
+            )
+        }, results)
+        if options["output"]:
+            save_report(report, options["output"])
+        if baseline is not None:
+            self._write_changes(baseline, report)
@@ -0,0 +1,46 @@
+'''
+Benchmark per-request token authentication overhead.
+'''
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from benchmark.utils import measure, format_stats
+from user.authentication import CachedTokenAuthentication, invalidate_token
+
+
+class Command(BaseCommand):
+    '''Django command to compare plain and cached token authentication.'''
+    help = "Time authenticating a request with and without the token cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email="bench-auth@example.com",
+                password="BenchPass1234",
+            )
+            token = Token.objects.create(user=user)
+            request = APIRequestFactory().get(
+                "/", HTTP_AUTHORIZATION=f"Token {token.key}",
+            )
+
+            for name, auth in (
+                ("TokenAuthentication", TokenAuthentication()),
+                ("CachedTokenAuthentication", CachedTokenAuthentication()),
+            ):
+                stats = measure(
+                    lambda: auth.authenticate(Request(request)),
+                    repeat=options["repeat"],
+                )
+                self.stdout.write(format_stats(name, stats))
+
+            invalidate_token(token.key)
+            transaction.set_rollback(True)
@@ -0,0 +1,113 @@
+'''
+Benchmark the recipe batch endpoint against one request per operation.
+'''
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import resolve, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from benchmark.utils import measure, format_stats
+from core.models import Recipe
+from user.authentication import invalidate_token
+
+
+BATCH_URL = reverse("recipe:recipe-batch")
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def detail_url(recipe_id):
+    '''Return the detail URL of a recipe.'''
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+class Command(BaseCommand):
+    '''Django command to compare batched and sequential recipe writes.'''
+    help = "Time a mix of creates, updates and deletes, batched and one by one."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--creates", type=int, default=20)
+        parser.add_argument("--updates", type=int, default=20)
+        parser.add_argument("--deletes", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def _send(self, method, url, payload=None):
+        '''Send a token authenticated JSON request straight to the view.'''
+        request = self.factory.generic(
+            method,
+            url,
+            json.dumps(payload) if payload is not None else "",
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Token {self.token.key}",
+        )
+        match = resolve(url)
+        response = match.func(request, *match.args, **match.kwargs)
+        response.render()
+        assert response.status_code < 300, response.data
+        return response
+
+    def _operations(self, options):
+        '''Return the operations of one run, deleting fresh recipes.'''
+        to_delete = Recipe.objects.bulk_create(
+            Recipe(user=self.user, title="Delete me", time_minutes=1, price=Decimal("1"))
+            for _ in range(options["deletes"])
+        )
+        return (
+            [
+                {"op": "create", "data": {
+                    "title": f"Created {i}", "time_minutes": 5, "price": "2.00",
+                    "tags": [{"name": f"Tag {i % 5}"}],
+                    "ingredients": [{"name": f"Ingredient {i % 7}"}],
+                }}
+                for i in range(options["creates"])
+            ]
+            + [
+                {"op": "update", "id": recipe.id, "data": {
+                    "title": f"Updated {i}", "tags": [{"name": f"Tag {i % 3}"}],
+                }}
+                for i, recipe in enumerate(self.updated)
+            ]
+            + [{"op": "delete", "id": recipe.id} for recipe in to_delete]
+        )
+
+    def _sequential(self, options):
+        '''Send every operation as its own request.'''
+        for operation in self._operations(options):
+            if operation["op"] == "create":
+                self._send("POST", RECIPE_URL, operation["data"])
+            elif operation["op"] == "update":
+                self._send("PATCH", detail_url(operation["id"]), operation["data"])
+            else:
+                self._send("DELETE", detail_url(operation["id"]))
+
+    def _batched(self, options):
+        '''Send all operations in one batch request.'''
+        self._send("POST", BATCH_URL, {"operations": self._operations(options)})
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        self.factory = APIRequestFactory()
+        with transaction.atomic():
+            self.user = get_user_model().objects.create_user(
+                email="bench-batch@example.com", password="BenchPass1234",
+            )
+            self.token = Token.objects.create(user=self.user)
+            self.updated = Recipe.objects.bulk_create(
+                Recipe(user=self.user, title="Update me", time_minutes=1, price=Decimal("1"))
+                for _ in range(options["updates"])
+            )
+            count = options["creates"] + options["updates"] + options["deletes"]
+
+            for name, func in (
+                (f"{count} operations, one request each", self._sequential),
+                (f"{count} operations, one batch", self._batched),
+            ):
+                stats = measure(lambda: func(options), repeat=options["repeat"])
+                self.stdout.write(format_stats(name, stats))
+
+            invalidate_token(self.token.key)
+            transaction.set_rollback(True)
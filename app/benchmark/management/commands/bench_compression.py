@@ -0,0 +1,73 @@
+'''
+Measure compressed sizes and CPU cost of recipe list pages.
+'''
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import resolve, reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from benchmark.management.commands.bench_serializers import generate_recipes
+from benchmark.utils import measure
+from core.middleware import BrotliEncoder, GzipEncoder, brotli, compress
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+class Command(BaseCommand):
+    '''Django command to report bytes on the wire per encoding and page size.'''
+    help = "Compress recipe list pages with gzip and brotli and report size and cost."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+        parser.add_argument("--attrs", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def _encoders(self):
+        '''Return the encoder settings to compare.'''
+        encoders = [(f"gzip-{level}", GzipEncoder, level) for level in (1, 6, 9)]
+        if brotli is not None:
+            encoders += [(f"br-{quality}", BrotliEncoder, quality) for quality in (1, 5, 11)]
+        else:
+            self.stdout.write("brotli is not installed, only gzip is measured")
+        return encoders
+
+    def _page(self, user, size):
+        '''Return the rendered body of a recipe list page.'''
+        # Thumbnail URLs are made absolute, which validates the host.
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        request = APIRequestFactory().get(RECIPE_URL, {"page_size": size}, HTTP_HOST=host)
+        force_authenticate(request, user)
+        response = resolve(RECIPE_URL).func(request)
+        response.render()
+        return response.content
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        encoders = self._encoders()
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email="bench-compression@example.com", password="bench-pass",
+            )
+            generate_recipes(user, max(options["pages"]), options["attrs"])
+
+            for size in options["pages"]:
+                body = self._page(user, size)
+                kib = len(body) / 1024
+                self.stdout.write(f"page of {size} recipes: {len(body)} bytes")
+                for name, encoder_class, level in encoders:
+                    compressed = compress(encoder_class(level), body)
+                    stats = measure(
+                        lambda: compress(encoder_class(level), body),
+                        repeat=options["repeat"],
+                    )
+                    self.stdout.write(
+                        f"    {name:<8} {len(compressed):>8} bytes "
+                        f"{len(compressed) / len(body):6.1%} "
+                        f"{stats['p50'] * 1e6 / kib:8.1f}us/KiB "
+                        f"p50={stats['p50'] * 1000:7.3f}ms"
+                    )
+
+            transaction.set_rollback(True)
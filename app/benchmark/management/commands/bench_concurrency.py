@@ -0,0 +1,224 @@
+'''
+Load test recipe reads through the WSGI and ASGI handlers.
+'''
+import asyncio
+import sys
+import threading
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db.backends.signals import connection_created
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from benchmark.management.commands.bench_serializers import generate_recipes
+from benchmark.utils import summarize
+from core.models import Recipe, Tag
+from recipe.asyncviews import use_async_reads
+
+
+def target_paths(user, target):
+    '''Return the request paths to cycle through for the target.'''
+    if target == "detail":
+        ids = Recipe.objects.filter(user=user).values_list("id", flat=True)
+        return [(reverse("recipe:recipe-detail", args=[pk]), "") for pk in ids]
+    if target == "tags":
+        ids = Tag.objects.filter(user=user).values_list("id", flat=True)
+        # Lists are cached per query string, vary it to reach the database.
+        return [(reverse("recipe:tag-list"), f"page_size={pk % 50 + 1}") for pk in ids]
+    return [(reverse("recipe:recipe-list"), f"page_size={size}") for size in range(1, 51)]
+
+
+def wsgi_get(handler, path, query, headers):
+    '''Send a GET request through the WSGI handler and return its status.'''
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SCRIPT_NAME": "",
+        "SERVER_NAME": headers["host"],
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.input": BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http",
+        "HTTP_HOST": headers["host"],
+        "HTTP_AUTHORIZATION": headers["authorization"],
+    }
+    status = []
+    response = handler(environ, lambda line, response_headers: status.append(line))
+    try:
+        b"".join(response)
+    finally:
+        # Sends request_finished, which releases the database connection.
+        response.close()
+    return int(status[0].split()[0])
+
+
+class Command(BaseCommand):
+    '''Django command to compare concurrency ceilings of WSGI and ASGI.
+
+    Clients send requests back to back. The WSGI handler is served by a
+    fixed number of worker threads, like a threaded WSGI server, the ASGI
+    handler by one event loop. Both run in this process against the
+    configured database, so data is committed and removed afterwards.
+
+    ASGI reads use async views only with RECIPE_ASYNC_READS=1, as under
+    app.asgi. Run once with and once without to see both ASGI setups.
+    '''
+    help = "Report throughput and latency per concurrency level for WSGI and ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--handlers", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"])
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--target", choices=["detail", "list", "tags"], default="detail")
+        parser.add_argument("--rows", type=int, default=200)
+        parser.add_argument("--attrs", type=int, default=3)
+        parser.add_argument(
+            "--latency-ms", type=float, default=0,
+            help="Delay added to every query to model a database across the network.",
+        )
+
+    def _add_latency(self, seconds):
+        '''Delay queries on every connection opened from now on.'''
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            # Wrappers outlive reconnects of the same thread's connection.
+            if delay not in connection.execute_wrappers:
+                connection.execute_wrappers.append(delay)
+
+        connection_created.connect(install, weak=False)
+        return install
+
+    def _run_wsgi(self, paths, headers, concurrency, total, threads):
+        '''Run closed-loop clients against a thread-limited WSGI handler.'''
+        handler = WSGIHandler()
+        slots = threading.Semaphore(threads)
+        samples, errors = [], []
+
+        def client(offset):
+            for i in range(offset, total, concurrency):
+                path, query = paths[i % len(paths)]
+                start = time.perf_counter()
+                with slots:
+                    status = wsgi_get(handler, path, query, headers)
+                samples.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(status)
+
+        clients = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+        start = time.perf_counter()
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        return samples, errors, time.perf_counter() - start
+
+    async def _asgi_request(self, handler, path, query, headers):
+        '''Send one request through the ASGI handler and return its status.'''
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+            "server": (headers["host"], 80),
+            "client": ("127.0.0.1", 0),
+        }
+        status = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        await handler(scope, receive, send)
+        return status[0]
+
+    def _run_asgi(self, paths, headers, concurrency, total):
+        '''Run closed-loop clients against the ASGI handler on one event loop.'''
+        handler = ASGIHandler()
+        samples, errors = [], []
+
+        async def client(offset):
+            for i in range(offset, total, concurrency):
+                path, query = paths[i % len(paths)]
+                start = time.perf_counter()
+                status = await self._asgi_request(handler, path, query, headers)
+                samples.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(status)
+
+        async def run():
+            await asyncio.gather(*(client(n) for n in range(concurrency)))
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        return samples, errors, time.perf_counter() - start
+
+    def _report(self, name, results):
+        '''Write one line per concurrency level and the best throughput.'''
+        self.stdout.write(name)
+        best = None
+        for concurrency, (samples, errors, elapsed) in results:
+            stats = summarize(samples)
+            throughput = len(samples) / elapsed
+            if best is None or throughput > best[1]:
+                best = (concurrency, throughput)
+            self.stdout.write(
+                f"    c={concurrency:<4} {throughput:8.1f} req/s "
+                f"p50={stats['p50'] * 1000:8.3f}ms "
+                f"p99={stats['p99'] * 1000:8.3f}ms "
+                f"errors={len(errors)}"
+            )
+        self.stdout.write(f"    ceiling {best[1]:.1f} req/s at c={best[0]}")
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        user = get_user_model().objects.create_user(
+            email="bench-concurrency@example.com", password="bench-pass",
+        )
+        try:
+            generate_recipes(user, options["rows"], options["attrs"])
+            # Thumbnail URLs are made absolute, which validates the host.
+            headers = {
+                "host": settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost",
+                "authorization": f"Token {Token.objects.create(user=user).key}",
+            }
+            paths = target_paths(user, options["target"])
+            total = options["requests"]
+            if options["latency_ms"]:
+                install = self._add_latency(options["latency_ms"] / 1000)
+
+            if "wsgi" in options["handlers"]:
+                self._report(f"wsgi, {options['threads']} threads", [
+                    (c, self._run_wsgi(paths, headers, c, total, options["threads"]))
+                    for c in options["concurrency"]
+                ])
+            if "asgi" in options["handlers"]:
+                mode = "async reads" if use_async_reads() else "sync views"
+                self._report(f"asgi, {mode}", [
+                    (c, self._run_asgi(paths, headers, c, total))
+                    for c in options["concurrency"]
+                ])
+        finally:
+            if options["latency_ms"]:
+                connection_created.disconnect(install)
+            user.delete()
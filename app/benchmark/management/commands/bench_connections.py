@@ -0,0 +1,121 @@
+'''
+Measure database connection overhead per request for each connection mode.
+'''
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from rest_framework.authtoken.models import Token
+
+from benchmark.management.commands.bench_concurrency import target_paths, wsgi_get
+from benchmark.management.commands.bench_serializers import generate_recipes
+from benchmark.utils import format_stats, measure, summarize
+from core.backends.postgresql.pool import close_pool
+
+
+def modes(pool_size):
+    '''Return the connection settings to compare by name.'''
+    return {
+        "connect per request": {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False, "POOL_SIZE": 0},
+        "persistent": {"CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": False, "POOL_SIZE": 0},
+        "persistent, health checks": {
+            "CONN_MAX_AGE": 600, "CONN_HEALTH_CHECKS": True, "POOL_SIZE": 0,
+        },
+        f"pool of {pool_size}": {
+            "CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": True, "POOL_SIZE": pool_size,
+        },
+    }
+
+
+class Command(BaseCommand):
+    '''Django command to compare per-request latency across connection modes.
+
+    Requests go through the WSGI handler on worker threads, so connections
+    are opened, kept or pooled exactly as they are when serving traffic.
+    Data is committed for the workers to see and removed afterwards.
+    '''
+    help = "Report connect cost and request latency with and without connection reuse."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--pool-size", type=int, default=4)
+        parser.add_argument("--rows", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def _connect_cost(self, repeat):
+        '''Report opening a connection and a health check query.'''
+        wrapper = connections.create_connection(connection.alias)
+        try:
+            def connect():
+                wrapper.connect()
+                wrapper.close()
+
+            self.stdout.write(format_stats("connect and close", measure(connect, repeat=repeat)))
+            wrapper.connect()
+            self.stdout.write(format_stats("health check", measure(wrapper.is_usable, repeat=repeat)))
+        finally:
+            wrapper.close()
+
+    def _run(self, paths, headers, threads, total):
+        '''Send requests from worker threads and return latencies and elapsed time.'''
+        handler = WSGIHandler()
+        samples = []
+
+        def worker(offset):
+            try:
+                for i in range(offset, total, threads):
+                    path, query = paths[i % len(paths)]
+                    start = time.perf_counter()
+                    wsgi_get(handler, path, query, headers)
+                    samples.append(time.perf_counter() - start)
+            finally:
+                connections.close_all()
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return samples, time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        db = connections.databases[connection.alias]
+        original = {key: db.get(key) for key in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS", "POOL_SIZE")}
+        user = get_user_model().objects.create_user(
+            email="bench-connections@example.com", password="bench-pass",
+        )
+        try:
+            generate_recipes(user, options["rows"], 2)
+            # Thumbnail URLs are made absolute, which validates the host.
+            headers = {
+                "host": settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost",
+                "authorization": f"Token {Token.objects.create(user=user).key}",
+            }
+            paths = target_paths(user, "detail")
+            self._connect_cost(options["repeat"])
+
+            for threads in options["threads"]:
+                self.stdout.write(f"{threads} threads")
+                baseline = None
+                for name, mode in modes(options["pool_size"]).items():
+                    # Connections share the settings dict, new ones pick this up.
+                    db.update(mode)
+                    samples, elapsed = self._run(paths, headers, threads, options["requests"])
+                    close_pool((connection.alias, db["NAME"]))
+                    stats = summarize(samples)
+                    baseline = baseline or stats["p50"]
+                    self.stdout.write(
+                        f"    {format_stats(name, stats)} "
+                        f"{len(samples) / elapsed:8.1f} req/s "
+                        f"saved={(baseline - stats['p50']) * 1000:7.3f}ms"
+                    )
+        finally:
+            db.update(original)
+            user.delete()
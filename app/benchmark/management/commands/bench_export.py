@@ -0,0 +1,75 @@
+'''
+Benchmark the streaming recipe export against serializing everything at once.
+'''
+import time
+import tracemalloc
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import resolve, reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from benchmark.management.commands.bench_import import make_row, to_ndjson
+from core.models import Recipe
+from recipe.serializers import RecipeSerializer
+
+
+IMPORT_URL = reverse("recipe:recipe-bulk-import")
+EXPORT_URL = reverse("recipe:recipe-export")
+
+
+class Command(BaseCommand):
+    '''Django command to time exports and trace their peak memory.'''
+    help = "Export synthetic recipes by streaming and in one go, reporting time and memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50_000)
+
+    def _traced(self, name, count, func):
+        '''Run func and report its duration and peak traced memory.'''
+        tracemalloc.start()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stdout.write(
+            f"{name:<30} {count:>7} rows {elapsed:8.2f}s "
+            f"{count / elapsed:10.0f} rows/s peak={peak / 2 ** 20:8.1f}MiB"
+        )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        factory = APIRequestFactory()
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email="bench-export@example.com", password="bench-pass",
+            )
+            request = factory.post(
+                IMPORT_URL,
+                to_ndjson(make_row(i) for i in range(options["rows"])),
+                content_type="application/x-ndjson",
+            )
+            force_authenticate(request, user)
+            count = resolve(IMPORT_URL).func(request).data["created"]
+
+            def export(media_type):
+                request = factory.get(EXPORT_URL, HTTP_ACCEPT=media_type)
+                force_authenticate(request, user)
+                for _ in resolve(EXPORT_URL).func(request).streaming_content:
+                    pass
+
+            def serialize_all():
+                queryset = Recipe.objects.with_attrs().for_user(user).order_by("-id")
+                request = Request(factory.get("/"))
+                data = RecipeSerializer(queryset, many=True, context={"request": request}).data
+                JSONRenderer().render(data)
+
+            self._traced("export, NDJSON", count, lambda: export("application/x-ndjson"))
+            self._traced("export, CSV", count, lambda: export("text/csv"))
+            self._traced("serialize all, JSON", count, serialize_all)
+
+            transaction.set_rollback(True)
@@ -0,0 +1,94 @@
+'''
+Benchmark bulk recipe import against one POST per recipe.
+'''
+import csv
+import io
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.urls import resolve, reverse
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+IMPORT_URL = reverse("recipe:recipe-bulk-import")
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def make_row(i):
+    '''Return a recipe payload sharing tags and ingredients with others.'''
+    return {
+        "title": f"Imported recipe {i}",
+        "time_minutes": i % 120,
+        "price": "9.99",
+        "description": f"Step {i}",
+        "tags": [{"name": f"Tag {i % 50}"}, {"name": f"Tag {i % 7}"}],
+        "ingredients": [{"name": f"Ingredient {i % 200}"}, {"name": "Salt"}],
+    }
+
+
+def to_ndjson(rows):
+    '''Encode rows as newline delimited JSON.'''
+    return "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+
+def to_csv(rows):
+    '''Encode rows as CSV with semicolon separated names.'''
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["title", "time_minutes", "price", "description", "tags", "ingredients"])
+    for row in rows:
+        writer.writerow([
+            row["title"], row["time_minutes"], row["price"], row["description"],
+            ";".join(tag["name"] for tag in row["tags"]),
+            ";".join(item["name"] for item in row["ingredients"]),
+        ])
+    return out.getvalue().encode()
+
+
+class Command(BaseCommand):
+    '''Django command to time recipe imports.'''
+    help = "Import synthetic recipes in bulk and one by one and report throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20_000)
+        parser.add_argument("--single-rows", type=int, default=500)
+
+    def _post(self, user, url, body, content_type):
+        '''Send a POST straight to the view and return the response.'''
+        request = APIRequestFactory().generic("POST", url, body, content_type=content_type)
+        force_authenticate(request, user)
+        response = resolve(url).func(request)
+        response.render()
+        return response
+
+    def _report(self, name, count, elapsed):
+        '''Write the throughput of a run.'''
+        self.stdout.write(
+            f"{name:<30} {count:>7} rows {elapsed:8.2f}s {count / elapsed:10.0f} rows/s"
+        )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        rows = [make_row(i) for i in range(options["rows"])]
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email="bench-import@example.com", password="bench-pass",
+            )
+            single = rows[:options["single_rows"]]
+            start = time.perf_counter()
+            for row in single:
+                self._post(user, RECIPE_URL, json.dumps(row).encode(), "application/json")
+            self._report("one POST per recipe", len(single), time.perf_counter() - start)
+
+            for name, body, content_type in (
+                ("bulk import, NDJSON", to_ndjson(rows), "application/x-ndjson"),
+                ("bulk import, CSV", to_csv(rows), "text/csv"),
+            ):
+                start = time.perf_counter()
+                response = self._post(user, IMPORT_URL, body, content_type)
+                self._report(name, response.data["created"], time.perf_counter() - start)
+
+            transaction.set_rollback(True)
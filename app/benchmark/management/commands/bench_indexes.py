@@ -0,0 +1,103 @@
+'''
+Benchmark the per-user recipe, tag and ingredient queries on a large table.
+'''
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from benchmark.utils import measure, format_stats
+from core.models import Recipe, Tag, Ingredient
+
+
+class Command(BaseCommand):
+    '''Django command to time the hot list queries at scale.'''
+    help = "Fill the database with synthetic rows and time per-user queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the generated rows instead of rolling back.",
+        )
+
+    def _generate(self, rows, users, batch_size):
+        '''Bulk insert users and spread recipes, tags and ingredients.'''
+        User = get_user_model()
+        User.objects.bulk_create(
+            User(email=f"bench-index-{i}@example.com", name=f"Bench {i}")
+            for i in range(users)
+        )
+        user_ids = list(
+            User.objects.filter(email__startswith="bench-index-")
+            .values_list("id", flat=True)
+        )
+        per_user = max(rows // len(user_ids), 1)
+
+        for model, make in (
+            (Recipe, lambda user_id, i: Recipe(
+                user_id=user_id,
+                title=f"Recipe {i}",
+                time_minutes=i % 120,
+                price=Decimal("9.99"),
+            )),
+            (Tag, lambda user_id, i: Tag(user_id=user_id, name=f"Tag {i}")),
+            (Ingredient, lambda user_id, i: Ingredient(
+                user_id=user_id,
+                name=f"Ingredient {i}",
+            )),
+        ):
+            batch = []
+            for i in range(per_user):
+                for user_id in user_ids:
+                    batch.append(make(user_id, i))
+                    if len(batch) >= batch_size:
+                        model.objects.bulk_create(batch)
+                        batch = []
+            model.objects.bulk_create(batch)
+            self.stdout.write(f"Inserted {per_user * len(user_ids)} {model.__name__} rows")
+
+        with connection.cursor() as cursor:
+            for model in (Recipe, Tag, Ingredient):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+        return user_ids[len(user_ids) // 2]
+
+    def _report(self, name, queryset, repeat):
+        '''Time a queryset and show how its plan reads the table.'''
+        stats = measure(lambda: list(queryset.all()), repeat=repeat)
+        self.stdout.write(format_stats(name, stats))
+        for line in queryset.explain().splitlines():
+            if "Scan" in line or "Sort" in line:
+                self.stdout.write(f"    {line.strip()}")
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        with transaction.atomic():
+            user_id = self._generate(
+                options["rows"], options["users"], options["batch_size"],
+            )
+            repeat = options["repeat"]
+
+            self._report(
+                "recipes for user, newest 50",
+                Recipe.objects.filter(user_id=user_id).order_by("-id")[:50],
+                repeat,
+            )
+            self._report(
+                "tags for user, by name desc 50",
+                Tag.objects.filter(user_id=user_id).order_by("-name")[:50],
+                repeat,
+            )
+            self._report(
+                "ingredient by user and name",
+                Ingredient.objects.filter(user_id=user_id, name="Ingredient 7"),
+                repeat,
+            )
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
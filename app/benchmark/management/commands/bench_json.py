@@ -0,0 +1,74 @@
+'''
+Benchmark the JSON renderer and parser against DRF's.
+'''
+import io
+from collections import OrderedDict
+
+from django.core.management.base import BaseCommand
+from rest_framework import parsers, renderers
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from benchmark.utils import measure, format_stats
+from core.parsers import JSONParser
+from core.renderers import JSONRenderer, orjson
+from recipe.serializers import RecipeDetailSerializer
+
+
+def make_recipe(i, attrs=5):
+    '''Return a recipe shaped like the serializer output.'''
+    return OrderedDict([
+        ("id", i),
+        ("title", f"Recipe {i} with a longer title"),
+        ("time_minutes", i % 120),
+        ("price", f"{i % 100}.{i % 100:02d}"),
+        ("link", f"https://example.com/recipes/{i}"),
+        ("tags", [OrderedDict([("id", j), ("name", f"Tag {j}")]) for j in range(attrs)]),
+        ("ingredients", [
+            OrderedDict([("id", j), ("name", f"Ingredient {j}")]) for j in range(attrs)
+        ]),
+        ("thumbnail", f"http://localhost/static/media/uploads/recipe/{i}-160.webp"),
+    ])
+
+
+class Command(BaseCommand):
+    '''Django command to time JSON encoding and decoding of API payloads.'''
+    help = "Render list, detail and error responses and parse request bodies."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        self.stdout.write(f"orjson: {orjson.__version__ if orjson else 'not installed'}")
+
+        detail = make_recipe(1)
+        detail.update(description="A description " * 20, image=None, image_derivatives={})
+        serializer = RecipeDetailSerializer(data={"tags": [{}], "price": "1234.567"})
+        serializer.is_valid()
+        payloads = {
+            "list": OrderedDict([
+                ("next", "http://localhost/api/recipe/recipes/?cursor=cD0xMjM0"),
+                ("previous", None),
+                ("results", ReturnList(
+                    [make_recipe(i) for i in range(options["rows"])], serializer=None,
+                )),
+            ]),
+            "detail": ReturnDict(detail, serializer=None),
+            "error": serializer.errors,
+        }
+
+        for name, data in payloads.items():
+            for renderer in (renderers.JSONRenderer(), JSONRenderer()):
+                assert renderer.render(data) == JSONRenderer().render(data)
+                stats = measure(lambda: renderer.render(data), repeat=options["repeat"])
+                label = f"render {name}, {type(renderer).__module__.split('.')[0]}"
+                self.stdout.write(format_stats(label, stats))
+
+        body = JSONRenderer().render(payloads["list"])
+        for parser in (parsers.JSONParser(), JSONParser()):
+            stats = measure(
+                lambda: parser.parse(io.BytesIO(body)), repeat=options["repeat"],
+            )
+            label = f"parse list, {type(parser).__module__.split('.')[0]}"
+            self.stdout.write(format_stats(label, stats))
@@ -0,0 +1,118 @@
+'''
+Measure the overhead of request metrics on recipe API requests.
+'''
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+from benchmark.management.commands.bench_concurrency import target_paths, wsgi_get
+from benchmark.management.commands.bench_serializers import generate_recipes
+from benchmark.utils import format_stats, summarize
+from core.metrics import install_query_hook, record_query
+
+
+MIDDLEWARE = "core.metrics.MetricsMiddleware"
+
+
+def modes():
+    '''Return the metrics settings to compare by name, baseline first.'''
+    return {
+        "off": None,
+        "metrics": {"ENABLED": True, "SERVER_TIMING": False},
+        "metrics, Server-Timing": {"ENABLED": True, "SERVER_TIMING": True},
+    }
+
+
+class Command(BaseCommand):
+    '''Django command to compare request latency with and without metrics.
+
+    Requests go through the WSGI handler one after another. Modes take
+    turns in rounds, so drift of the machine affects all of them alike.
+    The baseline runs without the middleware and the query hook. Data is
+    committed, as requests close the connection, and removed afterwards.
+    '''
+    help = "Report request latency with metrics off and on and the overhead."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", choices=["detail", "list", "tags"], default="detail")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--rows", type=int, default=50)
+        parser.add_argument("--attrs", type=int, default=3)
+
+    def _query_hook(self, enabled):
+        '''Install or remove the query hook on current and new connections.'''
+        if enabled:
+            connection_created.connect(install_query_hook, dispatch_uid="core.metrics")
+        else:
+            connection_created.disconnect(dispatch_uid="core.metrics")
+        for conn in connections.all():
+            if record_query in conn.execute_wrappers:
+                conn.execute_wrappers.remove(record_query)
+            if enabled:
+                conn.execute_wrappers.append(record_query)
+
+    def _handler(self, mode):
+        '''Return a WSGI handler with the middleware of the mode.'''
+        middleware = [name for name in settings.MIDDLEWARE if name != MIDDLEWARE]
+        if mode is not None:
+            middleware.insert(0, MIDDLEWARE)
+        with override_settings(MIDDLEWARE=middleware):
+            return WSGIHandler()
+
+    def _run(self, handler, mode, paths, headers, total):
+        '''Send requests one after another and return their latencies.'''
+        config = {**settings.API_METRICS, **(mode or {"ENABLED": False})}
+        samples = []
+        self._query_hook(mode is not None)
+        with override_settings(API_METRICS=config):
+            for i in range(total):
+                path, query = paths[i % len(paths)]
+                start = time.perf_counter()
+                wsgi_get(handler, path, query, headers)
+                samples.append(time.perf_counter() - start)
+        return samples
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        user = get_user_model().objects.create_user(
+            email="bench-metrics@example.com", password="bench-pass",
+        )
+        try:
+            generate_recipes(user, options["rows"], options["attrs"])
+            # Thumbnail URLs are made absolute, which validates the host.
+            headers = {
+                "host": settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost",
+                "authorization": f"Token {Token.objects.create(user=user).key}",
+            }
+            paths = target_paths(user, options["target"])
+            handlers = {name: (self._handler(mode), mode) for name, mode in modes().items()}
+            samples = {name: [] for name in handlers}
+
+            for name, (handler, mode) in handlers.items():
+                # Warm up caches, connections and imports.
+                self._run(handler, mode, paths, headers, len(paths))
+            for _ in range(options["rounds"]):
+                for name, (handler, mode) in handlers.items():
+                    samples[name] += self._run(handler, mode, paths, headers, options["requests"])
+
+            baseline = None
+            for name, values in samples.items():
+                stats = summarize(values)
+                baseline = baseline or stats
+                self.stdout.write(
+                    f"{format_stats(name, stats)} "
+                    f"overhead p50={stats['p50'] / baseline['p50'] - 1:6.2%} "
+                    f"mean={stats['mean'] / baseline['mean'] - 1:6.2%} "
+                    f"({(stats['mean'] - baseline['mean']) * 1e6:6.1f}us)"
+                )
+        finally:
+            self._query_hook(True)
+            user.delete()
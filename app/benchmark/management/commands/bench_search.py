@@ -0,0 +1,113 @@
+'''
+Benchmark full-text recipe search on a large synthetic corpus.
+'''
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from benchmark.utils import measure, format_stats
+from core.models import Recipe
+from recipe.search import search, update_search_vectors
+
+
+WORDS = [
+    "chicken", "beef", "tofu", "lentil", "rice", "noodle", "tomato", "garlic",
+    "curry", "soup", "salad", "roast", "grilled", "spicy", "creamy", "lemon",
+    "basil", "ginger", "potato", "mushroom", "pepper", "honey", "smoked",
+    "baked", "fried", "stew", "pie", "tart", "bread", "pasta", "quick",
+]
+
+
+class Command(BaseCommand):
+    '''Django command to time ranked search queries at scale.'''
+    help = "Fill the database with synthetic recipes and time search queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=10_000)
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the generated rows instead of rolling back.",
+        )
+
+    def _generate(self, rows, users, batch_size):
+        '''Bulk insert recipes with random titles and fill their vectors.'''
+        rng = random.Random(0)
+        User = get_user_model()
+        User.objects.bulk_create(
+            User(email=f"bench-search-{i}@example.com", name=f"Bench {i}")
+            for i in range(users)
+        )
+        user_ids = list(
+            User.objects.filter(email__startswith="bench-search-")
+            .values_list("id", flat=True)
+        )
+
+        batch = []
+        for i in range(rows):
+            batch.append(Recipe(
+                user_id=user_ids[i % len(user_ids)],
+                title=" ".join(rng.sample(WORDS, 3)),
+                description=" ".join(rng.choices(WORDS, k=12)),
+                time_minutes=i % 120,
+                price=Decimal("9.99"),
+            ))
+            if len(batch) >= batch_size:
+                Recipe.objects.bulk_create(batch)
+                batch = []
+        Recipe.objects.bulk_create(batch)
+
+        # bulk_create skips signals, so vectors are filled in one pass.
+        update_search_vectors(Recipe.objects.filter(user_id__in=user_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Recipe._meta.db_table}")
+        self.stdout.write(f"Inserted {rows} Recipe rows")
+        return user_ids[len(user_ids) // 2]
+
+    def _report(self, name, queryset, repeat):
+        '''Time a queryset and show how its plan reads the table.'''
+        stats = measure(lambda: list(queryset.all()), repeat=repeat)
+        self.stdout.write(format_stats(name, stats))
+        for line in queryset.explain().splitlines():
+            if "Scan" in line or "Sort" in line:
+                self.stdout.write(f"    {line.strip()}")
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        with transaction.atomic():
+            user_id = self._generate(
+                options["rows"], options["users"], options["batch_size"],
+            )
+            repeat = options["repeat"]
+            recipes = Recipe.objects.filter(user_id=user_id)
+
+            self._report(
+                "search one word, top 50",
+                search(recipes, "curry").order_by("-rank", "-id")[:50],
+                repeat,
+            )
+            self._report(
+                "search two words, top 50",
+                search(recipes, "spicy chicken").order_by("-rank", "-id")[:50],
+                repeat,
+            )
+            self._report(
+                "search phrase, all users, top 50",
+                search(Recipe.objects.all(), '"lemon chicken"')
+                .order_by("-rank", "-id")[:50],
+                repeat,
+            )
+            self._report(
+                "icontains on title, top 50",
+                recipes.filter(title__icontains="curry").order_by("-id")[:50],
+                repeat,
+            )
+
+            if not options["keep"]:
+                transaction.set_rollback(True)
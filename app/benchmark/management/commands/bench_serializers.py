@@ -0,0 +1,102 @@
+'''
+Benchmark the fast recipe list serializer against the DRF serializers.
+'''
+from collections import Counter
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from benchmark.utils import measure, format_stats
+from core.models import Recipe, Tag, Ingredient
+from recipe.counters import add_counts
+from recipe.fast import recipe_rows
+from recipe.serializers import RecipeSerializer, FastRecipeSerializer
+
+
+DERIVATIVES = {
+    "webp": {"160": "uploads/recipe/bench-160.webp", "480": "uploads/recipe/bench-480.webp"},
+    "jpeg": {"160": "uploads/recipe/bench-160.jpg", "480": "uploads/recipe/bench-480.jpg"},
+}
+
+
+def generate_recipes(user, rows, attrs):
+    '''Bulk insert recipes linked to tags and ingredients.'''
+    recipes = Recipe.objects.bulk_create(
+        Recipe(
+            user=user,
+            title=f"Recipe {i}",
+            time_minutes=i % 120,
+            price=Decimal("9.99"),
+            image=f"uploads/recipe/bench-{i}.jpg" if i % 2 else None,
+            image_derivatives=DERIVATIVES if i % 2 else {},
+        )
+        for i in range(rows)
+    )
+    for field, model in (("tags", Tag), ("ingredients", Ingredient)):
+        objs = model.objects.bulk_create(
+            model(user=user, name=f"{model.__name__} {i}") for i in range(attrs * 4)
+        )
+        through = getattr(Recipe, field).through
+        fk_name = f"{model.__name__.lower()}_id"
+        links = through.objects.bulk_create(
+            through(recipe_id=recipe.id, **{fk_name: objs[(i + j) % len(objs)].id})
+            for i, recipe in enumerate(recipes)
+            for j in range(attrs)
+        )
+        add_counts(model, Counter(getattr(link, fk_name) for link in links))
+
+
+class Command(BaseCommand):
+    '''Django command to compare list serialization throughput.'''
+    help = "Serialize a page of recipes with both serializers and report items/s."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200)
+        parser.add_argument("--attrs", type=int, default=5)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        rows = options["rows"]
+        # Thumbnail URLs are made absolute, which validates the host.
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        request = Request(APIRequestFactory().get("/api/recipe/recipes/", HTTP_HOST=host))
+        context = {"request": request}
+        renderer = JSONRenderer()
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email="bench-serializers@example.com", password="bench-pass",
+            )
+            generate_recipes(user, rows, options["attrs"])
+            queryset = Recipe.objects.for_user(user).order_by("-id")
+
+            def serialize():
+                recipes = queryset.with_attrs()[:rows]
+                return renderer.render(
+                    RecipeSerializer(recipes, many=True, context=context).data
+                )
+
+            def serialize_fast():
+                recipes = recipe_rows(queryset)[:rows]
+                return renderer.render(
+                    FastRecipeSerializer(recipes, many=True, context=context).data
+                )
+
+            assert serialize() == serialize_fast()
+            for name, func in (
+                ("RecipeSerializer", serialize),
+                ("FastRecipeSerializer", serialize_fast),
+            ):
+                stats = measure(func, repeat=options["repeat"])
+                self.stdout.write(
+                    f"{format_stats(f'{name}, {rows} items', stats)} "
+                    f"{rows / stats['p50']:9.0f} items/s"
+                )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,61 @@
+"""
+Benchmark reports that can be saved and compared across commits.
+"""
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+
+def git_commit():
+    """Return the checked out commit and whether the tree has changes."""
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+
+    try:
+        return {"sha": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(options, results):
+    """Return a report of scenario results with what they ran on."""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "options": options,
+        "scenarios": results,
+    }
+
+
+def save_report(report, path):
+    """Write the report as JSON."""
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+
+
+def load_report(path):
+    """Read a report written by `save_report()`."""
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(baseline, report):
+    """Return relative changes of the scenarios both reports ran."""
+    changes = {}
+    for name, result in report["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        changes[name] = {
+            "p50": result["p50"] / before["p50"] - 1,
+            "p99": result["p99"] / before["p99"] - 1,
+            "throughput": result["throughput"] / before["throughput"] - 1,
+        }
+    return changes
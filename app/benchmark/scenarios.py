@@ -0,0 +1,145 @@
+"""
+Request scenarios for load tests of the API.
+"""
+import json
+import sys
+from collections import namedtuple
+from functools import lru_cache
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from benchmark.data import ADJECTIVES, DISHES, INGREDIENTS, PASSWORD, TAGS, jpeg
+from core.models import Ingredient, Recipe, Tag
+
+
+Request = namedtuple("Request", "method path query body content_type")
+Request.__new__.__defaults__ = ("", b"", None)
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TOKEN_URL = reverse("user:token")
+
+
+def fixture(user, host):
+    """Return what scenarios need to send requests as the user."""
+    return {
+        "email": user.email,
+        "host": host,
+        "authorization": f"Token {Token.objects.get_or_create(user=user)[0].key}",
+        "recipe_ids": list(Recipe.objects.filter(user=user).values_list("id", flat=True)),
+        "tag_ids": list(
+            Tag.objects.filter(user=user).order_by("-recipe_count").values_list("id", flat=True)
+        ),
+        "ingredient_ids": list(
+            Ingredient.objects.filter(user=user).order_by("-recipe_count")
+            .values_list("id", flat=True)
+        ),
+    }
+
+
+def _json(method, path, data):
+    """Return a request with a JSON body."""
+    return Request(method, path, body=json.dumps(data).encode(), content_type="application/json")
+
+
+def _recipe_data(rng):
+    """Return a new recipe with tags and ingredients, some of them new."""
+    return {
+        "title": f"{rng.choice(ADJECTIVES)} {rng.choice(INGREDIENTS)} {rng.choice(DISHES)}",
+        "time_minutes": rng.randint(5, 180),
+        "price": f"{rng.randint(100, 5000) / 100:.2f}",
+        "tags": [{"name": name} for name in rng.sample(TAGS, rng.randint(0, 4))],
+        "ingredients": [
+            {"name": f"{name} {rng.randint(1, 3)}"}
+            for name in rng.sample(INGREDIENTS, rng.randint(3, 10))
+        ],
+    }
+
+
+def list_recipes(rng, user):
+    """Read a page of the recipe list."""
+    return Request("GET", RECIPE_URL, f"page_size={rng.choice([10, 25, 50])}")
+
+
+def filter_recipes(rng, user):
+    """Filter recipes by popular tags or ingredients, or search them."""
+    kind = rng.choice(["tags", "ingredients", "search"])
+    if kind == "search":
+        return Request("GET", RECIPE_URL, f"search={rng.choice(INGREDIENTS + DISHES)}")
+    ids = user[f"{kind[:-1]}_ids"][:5] or [0]
+    chosen = ",".join(str(pk) for pk in rng.sample(ids, min(len(ids), rng.randint(1, 2))))
+    match = rng.choice(["any", "all"])
+    return Request("GET", RECIPE_URL, f"{kind}={chosen}&{kind}_match={match}")
+
+
+def create_recipe(rng, user):
+    """Create a recipe with tags and ingredients."""
+    return _json("POST", RECIPE_URL, _recipe_data(rng))
+
+
+def update_recipe(rng, user):
+    """Change the title and tags of a recipe."""
+    data = _recipe_data(rng)
+    path = reverse("recipe:recipe-detail", args=[rng.choice(user["recipe_ids"])])
+    return _json("PATCH", path, {"title": data["title"], "tags": data["tags"]})
+
+
+@lru_cache(maxsize=None)
+def _upload_body():
+    """Return a multipart body with a photo sized image."""
+    image = SimpleUploadedFile("photo.jpg", jpeg(1600, 1200), content_type="image/jpeg")
+    return encode_multipart(BOUNDARY, {"image": image})
+
+
+def upload_image(rng, user):
+    """Upload an image to a recipe."""
+    path = reverse("recipe:recipe-upload-image", args=[rng.choice(user["recipe_ids"])])
+    return Request("POST", path, body=_upload_body(), content_type=MULTIPART_CONTENT)
+
+
+def token_login(rng, user):
+    """Log in with email and password for a token."""
+    return _json("POST", TOKEN_URL, {"email": user["email"], "password": PASSWORD})
+
+
+SCENARIOS = {
+    "list": list_recipes,
+    "filter": filter_recipes,
+    "create": create_recipe,
+    "update": update_recipe,
+    "upload": upload_image,
+    "token": token_login,
+}
+
+
+def wsgi_request(handler, request, user):
+    """Send the request as the user through the WSGI handler, return its status."""
+    environ = {
+        "REQUEST_METHOD": request.method,
+        "PATH_INFO": request.path,
+        "QUERY_STRING": request.query,
+        "SCRIPT_NAME": "",
+        "SERVER_NAME": user["host"],
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "CONTENT_LENGTH": str(len(request.body)),
+        "wsgi.input": BytesIO(request.body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.url_scheme": "http",
+        "HTTP_HOST": user["host"],
+    }
+    if request.content_type:
+        environ["CONTENT_TYPE"] = request.content_type
+    if request.path != TOKEN_URL:
+        environ["HTTP_AUTHORIZATION"] = user["authorization"]
+    status = []
+    response = handler(environ, lambda line, response_headers: status.append(line))
+    try:
+        b"".join(response)
+    finally:
+        # Sends request_finished, which releases the database connection.
+        response.close()
+    return int(status[0].split()[0])
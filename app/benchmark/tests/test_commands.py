@@ -0,0 +1,157 @@
+"""
+Smoke tests for benchmark commands.
+"""
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from core.models import Recipe
+
+
+class BenchmarkCommandTests(TestCase):
+    """Test benchmark commands run on a small data set."""
+
+    def test_bench_indexes(self):
+        """Test the index benchmark reports timings and rolls back"""
+        out = StringIO()
+
+        call_command("bench_indexes", rows=20, users=2, repeat=2, stdout=out)
+
+        self.assertIn("recipes for user, newest 50", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_auth(self):
+        """Test the auth benchmark reports both authentication classes"""
+        out = StringIO()
+
+        call_command("bench_auth", repeat=2, stdout=out)
+
+        self.assertIn("CachedTokenAuthentication", out.getvalue())
+
+    def test_bench_search(self):
+        """Test the search benchmark reports timings and rolls back"""
+        out = StringIO()
+
+        call_command("bench_search", rows=50, users=2, repeat=2, stdout=out)
+
+        self.assertIn("search one word, top 50", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_import(self):
+        """Test the import benchmark reports throughput and rolls back"""
+        out = StringIO()
+
+        call_command("bench_import", rows=20, single_rows=2, stdout=out)
+
+        self.assertIn("bulk import, NDJSON", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_export(self):
+        """Test the export benchmark reports both approaches and rolls back"""
+        out = StringIO()
+
+        call_command("bench_export", rows=20, stdout=out)
+
+        self.assertIn("export, NDJSON", out.getvalue())
+        self.assertIn("serialize all, JSON", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_batch(self):
+        """Test the batch benchmark reports both approaches and rolls back"""
+        out = StringIO()
+
+        call_command(
+            "bench_batch", creates=2, updates=2, deletes=2, repeat=1, stdout=out,
+        )
+
+        self.assertIn("6 operations, one batch", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_serializers(self):
+        """Test the serializer benchmark reports both serializers and rolls back"""
+        out = StringIO()
+
+        call_command("bench_serializers", rows=10, attrs=2, repeat=2, stdout=out)
+
+        self.assertIn("FastRecipeSerializer, 10 items", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_json(self):
+        """Test the JSON benchmark reports renderers and parsers"""
+        out = StringIO()
+
+        call_command("bench_json", rows=5, repeat=2, stdout=out)
+
+        self.assertIn("render error, core", out.getvalue())
+        self.assertIn("parse list, rest_framework", out.getvalue())
+
+    def test_bench_compression(self):
+        """Test the compression benchmark reports sizes and rolls back"""
+        out = StringIO()
+
+        call_command("bench_compression", pages=[5], attrs=1, repeat=2, stdout=out)
+
+        self.assertIn("page of 5 recipes", out.getvalue())
+        self.assertIn("gzip-6", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+
+class ThreadedBenchmarkTests(TransactionTestCase):
+    """Test benchmarks whose requests run on other connections."""
+
+    def test_bench_concurrency(self):
+        """Test the load test reports both handlers and cleans up"""
+        out = StringIO()
+
+        call_command(
+            "bench_concurrency", concurrency=[1, 2], requests=4, rows=4, attrs=1, stdout=out,
+        )
+
+        self.assertIn("wsgi, 8 threads", out.getvalue())
+        self.assertIn("asgi, sync views", out.getvalue())
+        self.assertNotIn("errors=1", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_connections(self):
+        """Test the connection benchmark reports each mode and cleans up"""
+        out = StringIO()
+
+        call_command(
+            "bench_connections", threads=[2], requests=4, rows=2, repeat=2, stdout=out,
+        )
+
+        self.assertIn("connect and close", out.getvalue())
+        self.assertIn("persistent, health checks", out.getvalue())
+        self.assertIn("pool of 4", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_metrics(self):
+        """Test the metrics benchmark reports the overhead and cleans up"""
+        out = StringIO()
+
+        call_command("bench_metrics", requests=2, rounds=1, rows=2, attrs=1, stdout=out)
+
+        self.assertIn("metrics, Server-Timing", out.getvalue())
+        self.assertIn("overhead p50=", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+
+    def test_bench_api(self):
+        """Test the API benchmark runs all scenarios, compares and cleans up"""
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            report = os.path.join(directory, "report.json")
+            options = {"requests": 2, "warmup": 0, "threads": 2, "users": 2, "recipes": 2}
+
+            call_command("bench_api", output=report, stdout=StringIO(), **options)
+            call_command("bench_api", compare=report, stdout=out, **options)
+
+        for scenario in ("list", "filter", "create", "update", "upload", "token"):
+            self.assertIn(f"{scenario:<8} throughput", out.getvalue())
+        self.assertNotIn("errors=1", out.getvalue())
+        self.assertNotIn("errors=2", out.getvalue())
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(get_user_model().objects.exists())
@@ -0,0 +1,82 @@
+"""
+Tests for benchmark data and reports.
+"""
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from benchmark.data import cleanup, generate, stored_images
+from benchmark.reports import compare
+from core.models import Ingredient, Recipe, Tag
+
+
+def snapshot():
+    """Return the generated recipes with their tag and ingredient names"""
+    return [
+        (
+            recipe.user.email, recipe.title, recipe.price, bool(recipe.image),
+            sorted(tag.name for tag in recipe.tags.all()),
+            sorted(ingredient.name for ingredient in recipe.ingredients.all()),
+        )
+        for recipe in Recipe.objects.order_by("id").prefetch_related("tags", "ingredients")
+    ]
+
+
+class GenerateTests(TestCase):
+    """Test synthetic data is reproducible and cleaned up"""
+
+    def _generate(self, seed):
+        users = generate(seed=seed, users=2, recipes=6, tags=4, ingredients=8)
+        self.addCleanup(cleanup, users)
+        return users
+
+    def test_reproducible(self):
+        """Test the same seed generates the same data"""
+        users = self._generate(1)
+        first = snapshot()
+        cleanup(users)
+        self._generate(1)
+
+        self.assertEqual(snapshot(), first)
+        self.assertTrue(first)
+
+    def test_counts(self):
+        """Test recipe counts match the generated links"""
+        self._generate(2)
+
+        for model in (Tag, Ingredient):
+            for obj in model.objects.all():
+                self.assertEqual(obj.recipe_count, obj.recipe_set.count())
+
+    def test_cleanup(self):
+        """Test users, recipes and images are removed"""
+        storage = Recipe._meta.get_field("image").storage
+        stored = stored_images(storage)
+        users = generate(seed=3, users=1, recipes=4, image_ratio=1)
+        replaced = storage.save("uploads/recipe/replaced.jpg", storage.open(
+            Recipe.objects.first().image.name,
+        ))
+
+        cleanup(users, stored)
+
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(storage.exists(replaced))
+        self.assertEqual(stored_images(storage), stored)
+
+
+class CompareTests(TestCase):
+    """Test reports are compared per scenario"""
+
+    def test_compare(self):
+        """Test relative changes are reported for shared scenarios"""
+        baseline = {"scenarios": {"list": {"p50": 0.01, "p99": 0.1, "throughput": 100}}}
+        report = {"scenarios": {
+            "list": {"p50": 0.02, "p99": 0.05, "throughput": 80},
+            "token": {"p50": 0.3, "p99": 0.4, "throughput": 3},
+        }}
+
+        changes = compare(baseline, report)
+
+        self.assertEqual(list(changes), ["list"])
+        self.assertAlmostEqual(changes["list"]["p50"], 1)
+        self.assertAlmostEqual(changes["list"]["p99"], -0.5)
+        self.assertAlmostEqual(changes["list"]["throughput"], -0.2)
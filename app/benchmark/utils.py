@@ -0,0 +1,41 @@
+"""
+Helpers for timing benchmarks.
+"""
+import math
+import statistics
+import time
+
+
+def summarize(samples):
+    """Return count, mean, p50 and p99 for a list of durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": statistics.median(ordered),
+        "p99": ordered[max(math.ceil(len(ordered) * 0.99) - 1, 0)],
+    }
+
+
+def measure(func, repeat=50, warmup=3):
+    """Call func repeatedly and return a summary of the durations."""
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def format_stats(name, stats):
+    """Format a summary as a single report line."""
+    return (
+        f"{name:<40} "
+        f"p50={stats['p50'] * 1000:8.3f}ms "
+        f"p99={stats['p99'] * 1000:8.3f}ms "
+        f"mean={stats['mean'] * 1000:8.3f}ms "
+        f"n={stats['count']}"
+    )
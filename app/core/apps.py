@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from core import metrics, queries, routers
+
+        connection_created.connect(metrics.install_query_hook, dispatch_uid="core.metrics")
+        connection_created.connect(queries.install_query_hook, dispatch_uid="core.queries")
+        metrics.check_token()
+        routers.check_shared_cache()
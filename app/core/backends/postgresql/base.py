@@ -0,0 +1,103 @@
+"""
+PostgreSQL backend with connection health checks and pooling
+
+Extra settings of a database using this backend:
+
+* CONN_HEALTH_CHECKS: check a connection kept from an earlier request
+  before it is used again, and reconnect if the check fails.
+* POOL_SIZE: share this many connections between all threads of the
+  process instead of keeping one per thread. Connections go back to the
+  pool at the end of each request, so CONN_MAX_AGE must be 0.
+* POOL_TIMEOUT: seconds to wait for a free pooled connection.
+"""
+from functools import partial
+
+import psycopg2
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+
+from core.backends.postgresql.creation import DatabaseCreation
+from core.backends.postgresql.pool import get_pool
+
+
+def is_alive(conn):
+    """Return whether a raw connection still answers queries."""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        if not conn.autocommit:
+            # Don't leave the check's transaction open for Django to trip on.
+            conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL connection with health checks and an optional pool"""
+    creation_class = DatabaseCreation
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        # The pool the open connection came from.
+        self.connection_pool = None
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get("CONN_HEALTH_CHECKS", False)
+
+    @property
+    def pool_key(self):
+        return (self.alias, self.settings_dict["NAME"])
+
+    @property
+    def pool(self):
+        """Return the pool shared by connections to this database, if any."""
+        size = self.settings_dict.get("POOL_SIZE", 0)
+        if not size:
+            return None
+        return get_pool(self.pool_key, size, self.settings_dict.get("POOL_TIMEOUT", 10))
+
+    def check_settings(self):
+        super().check_settings()
+        if self.settings_dict.get("POOL_SIZE") and self.settings_dict["CONN_MAX_AGE"] != 0:
+            raise ImproperlyConfigured(
+                "Pooled connections return to the pool after each request, "
+                "set CONN_MAX_AGE to 0 when POOL_SIZE is set."
+            )
+
+    def get_new_connection(self, conn_params):
+        self.connection_pool = self.pool
+        if self.connection_pool is None:
+            return super().get_new_connection(conn_params)
+        # Pooled connections are checked when they are taken out.
+        check = is_alive if self.health_check_enabled else None
+        return self.connection_pool.get(partial(super().get_new_connection, conn_params), check)
+
+    def _close(self):
+        if self.connection_pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.connection_pool.put(self.connection)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        # Runs at the start and end of each request.
+        self.health_check_done = False
+
+    def close_if_health_check_failed(self):
+        """Drop a connection kept from an earlier request if it went away."""
+        if self.connection is None or self.health_check_done or not self.health_check_enabled:
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def _cursor(self, name=None):
+        self.close_if_health_check_failed()
+        return super()._cursor(name)
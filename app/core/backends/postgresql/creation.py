@@ -0,0 +1,21 @@
+"""
+Test database handling for the pooling PostgreSQL backend
+"""
+from django.db.backends.postgresql import creation
+
+from core.backends.postgresql.pool import close_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """Release connections held by pools and other threads before dropping"""
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pool((self.connection.alias, test_database_name))
+        # Threads that served requests may still keep persistent connections.
+        with self._nodb_cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+                "WHERE datname = %s AND pid <> pg_backend_pid()",
+                [test_database_name],
+            )
+        super()._destroy_test_db(test_database_name, verbosity)
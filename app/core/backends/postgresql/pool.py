@@ -0,0 +1,96 @@
+"""
+In-process pool of PostgreSQL connections
+"""
+import threading
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class ConnectionPool:
+    """Open connections shared by all threads of a process
+
+    Holds at most `size` connections, checked out ones included. A thread
+    waits up to `timeout` seconds for a connection to be returned before
+    giving up. Idle connections are reused newest first, so a quiet
+    process keeps using few of them.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def get(self, connect, check=None):
+        """Return an idle connection passing check, or a new one from connect."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.OperationalError(
+                f"No database connection was returned to the pool of {self.size} "
+                f"within {self.timeout} seconds."
+            )
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    return connect()
+                if check is None or check(conn):
+                    return conn
+                conn.close()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def put(self, conn):
+        """Take a connection back, rolling back a transaction left open."""
+        try:
+            if conn.closed:
+                return
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                conn.close()
+                return
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    conn.close()
+                    return
+            with self._lock:
+                self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def clear(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    @property
+    def idle(self):
+        """Number of connections waiting in the pool."""
+        return len(self._idle)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, size, timeout):
+    """Return the pool for key, creating it on first use."""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(size, timeout)
+        return _pools[key]
+
+
+def close_pool(key):
+    """Close the idle connections of the pool for key and forget it."""
+    with _pools_lock:
+        pool = _pools.pop(key, None)
+    if pool is not None:
+        pool.clear()
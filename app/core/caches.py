@@ -0,0 +1,25 @@
+"""
+Cache configuration helpers
+"""
+from django.conf import settings
+
+
+# Backends whose entries only live in the process that wrote them.
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+# Backends whose entries are rows in the database.
+DATABASE_BACKENDS = (
+    "django.core.cache.backends.db.DatabaseCache",
+)
+
+
+def is_process_local(alias):
+    """Return whether the cache keeps its entries in the current process."""
+    return settings.CACHES[alias]["BACKEND"] in PROCESS_LOCAL_BACKENDS
+
+
+def is_database(alias):
+    """Return whether the cache keeps its entries in the database."""
+    return settings.CACHES[alias]["BACKEND"] in DATABASE_BACKENDS
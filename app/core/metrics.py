@@ -0,0 +1,281 @@
+"""
+Per-request query and latency metrics
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.deprecation import MiddlewareMixin
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_current = ContextVar("request_metrics", default=None)
+
+
+def _config():
+    """Return the metrics settings."""
+    return settings.API_METRICS
+
+
+def check_token():
+    """Refuse to expose metrics to anyone outside DEBUG."""
+    config = _config()
+    if config["ENABLED"] and not config.get("TOKEN") and not settings.DEBUG:
+        raise ImproperlyConfigured(
+            'API_METRICS["TOKEN"] is empty, so /api/metrics/ is open to anyone. '
+            "Set API_METRICS_TOKEN or disable metrics with DEBUG off."
+        )
+
+
+def _format(value):
+    """Format a sample value or bucket bound."""
+    if value == math.inf:
+        return "+Inf"
+    return repr(value)
+
+
+def _escape(value):
+    """Escape a label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Thread-safe histogram with fixed buckets per view"""
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, view, value):
+        """Count a value for the view."""
+        # Bounds are inclusive, a value equal to a bound falls in its bucket.
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][index] += 1
+            series[1] += value
+
+    def snapshot(self):
+        """Return cumulative bucket counts and the sum per view."""
+        with self._lock:
+            series = {
+                view: (list(counts), total) for view, (counts, total) in self._series.items()
+            }
+        result = {}
+        for view, (counts, total) in series.items():
+            cumulative, buckets = 0, []
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            result[view] = {"buckets": buckets, "sum": total, "count": cumulative}
+        return result
+
+    def render(self):
+        """Return the histogram in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for view, series in sorted(self.snapshot().items()):
+            view = _escape(view)
+            for bound, count in series["buckets"]:
+                lines.append(f'{self.name}_bucket{{view="{view}",le="{_format(bound)}"}} {count}')
+            lines.append(f'{self.name}_sum{{view="{view}"}} {_format(series["sum"])}')
+            lines.append(f'{self.name}_count{{view="{view}"}} {series["count"]}')
+        return "\n".join(lines)
+
+    def reset(self):
+        """Forget all values."""
+        with self._lock:
+            self._series = {}
+
+
+class Metrics:
+    """Histograms of the requests served by this process
+
+    Every process keeps its own, so scrapes of a server with several
+    worker processes see the worker that answered. Other apps add their
+    metrics with register().
+    """
+
+    def __init__(self):
+        self.collectors = []
+        self.duration = Histogram(
+            "api_request_duration_seconds", "Time to the response in seconds.", LATENCY_BUCKETS,
+        )
+        self.queries = Histogram(
+            "api_request_queries", "Database queries per request.", QUERY_BUCKETS,
+        )
+        self.db_duration = Histogram(
+            "api_request_db_duration_seconds",
+            "Time spent in database queries per request in seconds.",
+            LATENCY_BUCKETS,
+        )
+        self.serialize_duration = Histogram(
+            "api_request_serialize_duration_seconds",
+            "Time spent in serializers per request in seconds, queries excluded.",
+            LATENCY_BUCKETS,
+        )
+        self.response_size = Histogram(
+            "api_response_size_bytes",
+            "Size of response bodies in bytes, streaming responses excluded.",
+            SIZE_BUCKETS,
+        )
+
+    def histograms(self):
+        """Return all histograms."""
+        return [
+            self.duration, self.queries, self.db_duration,
+            self.serialize_duration, self.response_size,
+        ]
+
+    def record(self, request_metrics, duration, size=None):
+        """Count a finished request."""
+        view = request_metrics.view
+        self.duration.observe(view, duration)
+        self.queries.observe(view, request_metrics.queries)
+        self.db_duration.observe(view, request_metrics.db_time)
+        self.serialize_duration.observe(view, request_metrics.serialize_time)
+        if size is not None:
+            self.response_size.observe(view, size)
+
+    def register(self, collector):
+        """Expose the metrics rendered by collector.render() as well."""
+        if collector not in self.collectors:
+            self.collectors.append(collector)
+
+    def render(self):
+        """Return all metrics in the Prometheus text format."""
+        return "\n".join(
+            metric.render() for metric in self.histograms() + self.collectors
+        ) + "\n"
+
+    def reset(self):
+        """Forget all requests."""
+        for histogram in self.histograms():
+            histogram.reset()
+
+
+registry = Metrics()
+
+
+class RequestMetrics:
+    """Counters of the request being served"""
+    __slots__ = ("view", "start", "queries", "db_time", "serialize_time", "serializing")
+
+    def __init__(self):
+        self.view = "unmatched"
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+        self.serializing = False
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper counting queries and their time for the request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - start
+
+
+def install_query_hook(sender, connection, **kwargs):
+    """Count the queries of every connection, see `record_query()`."""
+    # Wrappers outlive reconnects of the same thread's connection.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class ProfiledSerializerMixin:
+    """Add the time spent serializing to the request's metrics
+
+    Only the outermost serializer is timed, nested ones are part of its
+    time, and queries run while serializing count as database time.
+    """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return super().to_representation(instance)
+        metrics.serializing = True
+        start, db_time = time.perf_counter(), metrics.db_time
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializing = False
+            metrics.serialize_time += (
+                time.perf_counter() - start - (metrics.db_time - db_time)
+            )
+
+
+def view_label(view_func, method):
+    """Return the label of the view action handling the request."""
+    cls = getattr(view_func, "cls", None)
+    if cls is None:
+        return getattr(view_func, "__name__", "unmatched")
+    method = method.lower()
+    actions = getattr(view_func, "actions", None) or {}
+    if method == "head" and "head" not in actions:
+        method = "get"
+    return f"{cls.__name__}.{actions.get(method, method)}"
+
+
+def server_timing(metrics, duration):
+    """Return a Server-Timing header value for the request."""
+    return (
+        f'db;dur={metrics.db_time * 1000:.3f};desc="{metrics.queries} queries", '
+        f"serialize;dur={metrics.serialize_time * 1000:.3f}, "
+        f"total;dur={duration * 1000:.3f}"
+    )
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """Record query counts, timings and response sizes per view action
+
+    Queries are counted by `record_query()` on every connection, including
+    those of the async read pool, as the counters follow the request's
+    context. Durations run from this middleware to the response, so it
+    should come first.
+    """
+
+    def process_request(self, request):
+        if not _config()["ENABLED"]:
+            return
+        request._metrics = RequestMetrics()
+        _current.set(request._metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, "_metrics", None)
+        if metrics is not None:
+            metrics.view = view_label(view_func, request.method)
+
+    def process_response(self, request, response):
+        metrics = getattr(request, "_metrics", None)
+        if metrics is None:
+            return response
+        # The thread serves other requests next.
+        _current.set(None)
+        duration = time.perf_counter() - metrics.start
+        size = None if response.streaming else len(response.content)
+        registry.record(metrics, duration, size)
+        if _config()["SERVER_TIMING"]:
+            response["Server-Timing"] = server_timing(metrics, duration)
+        return response
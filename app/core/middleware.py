@@ -0,0 +1,157 @@
+"""
+Response compression negotiated by Accept-Encoding
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _config():
+    """Return the compression settings."""
+    return settings.RESPONSE_COMPRESSION
+
+
+class GzipEncoder:
+    """Incremental gzip encoder"""
+    name = "gzip"
+
+    def __init__(self, level=None):
+        level = _config()["GZIP_LEVEL"] if level is None else level
+        # A window of 31 bits makes zlib write gzip headers.
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def process(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class BrotliEncoder:
+    """Incremental brotli encoder"""
+    name = "br"
+
+    def __init__(self, quality=None):
+        quality = _config()["BROTLI_QUALITY"] if quality is None else quality
+        self._obj = brotli.Compressor(quality=quality)
+
+    def process(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+def available_encoders():
+    """Return the usable encoders, preferred first."""
+    encoders = [GzipEncoder]
+    if brotli is not None:
+        encoders.insert(0, BrotliEncoder)
+    return encoders
+
+
+def _quality(value):
+    """Parse a q-value, treating malformed ones as not acceptable."""
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def choose_encoder(accept_encoding):
+    """Return the encoder class the client prefers, or None.
+
+    Encodings the client rates higher win, ties go to the server's
+    preference and `q=0` rules an encoding out.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                quality = _quality(value.strip())
+        accepted[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoder in available_encoders():
+        quality = accepted.get(encoder.name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoder, quality
+    return best
+
+
+def compress(encoder, content):
+    """Compress a complete body."""
+    return encoder.process(content) + encoder.finish()
+
+
+def compress_stream(encoder, chunks):
+    """Compress chunks one by one, flushing so each can be sent right away."""
+    for chunk in chunks:
+        if chunk:
+            yield encoder.process(chunk) + encoder.flush()
+    yield encoder.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress text responses with brotli, when installed, or gzip
+
+    Streaming responses are compressed as they are sent. Other responses
+    smaller than the configured minimum are left as they are, as are
+    responses that don't shrink.
+    """
+
+    def _compressible(self, response):
+        """Return whether the response type and size are worth compressing."""
+        if response.has_header("Content-Encoding"):
+            return False
+        content_type = response.get("Content-Type", "").lower()
+        if not content_type.startswith(tuple(_config()["CONTENT_TYPES"])):
+            return False
+        return response.streaming or len(response.content) >= _config()["MIN_SIZE"]
+
+    def process_response(self, request, response):
+        if not self._compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoder_class = choose_encoder(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoder_class is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                encoder_class(), response.streaming_content,
+            )
+            del response["Content-Length"]
+        else:
+            compressed = compress(encoder_class(), response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # The compressed body differs byte for byte, see RFC 7232 2.1.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoder_class.name
+        return response
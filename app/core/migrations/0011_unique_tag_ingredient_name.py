@@ -0,0 +1,59 @@
+# Generated by Django 3.2.25 on 2026-10-17 05:53
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_names(apps, schema_editor):
+    """Merge tags and ingredients sharing a name for the same user."""
+    Recipe = apps.get_model("core", "Recipe")
+    for field_name in ("tags", "ingredients"):
+        field = Recipe._meta.get_field(field_name)
+        model = field.related_model
+        through = field.remote_field.through
+        fk_name = f"{model._meta.model_name}_id"
+
+        duplicates = (
+            model.objects.values("user", "name")
+            .annotate(count=Count("id"), keep_id=Min("id"))
+            .filter(count__gt=1)
+        )
+        for duplicate in duplicates:
+            keep_id = duplicate["keep_id"]
+            extra_ids = list(
+                model.objects.filter(user=duplicate["user"], name=duplicate["name"])
+                .exclude(id=keep_id)
+                .values_list("id", flat=True)
+            )
+            linked = set(
+                through.objects.filter(**{fk_name: keep_id})
+                .values_list("recipe_id", flat=True)
+            )
+            moved = set(
+                through.objects.filter(**{f"{fk_name}__in": extra_ids})
+                .values_list("recipe_id", flat=True)
+            )
+            through.objects.bulk_create([
+                through(recipe_id=recipe_id, **{fk_name: keep_id})
+                for recipe_id in moved - linked
+            ])
+            model.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_recipe_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_names, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='ingredient',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_ingredient_name_per_user'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(fields=('user', 'name'), name='unique_tag_name_per_user'),
+        ),
+    ]
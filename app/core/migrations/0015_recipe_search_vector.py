@@ -0,0 +1,55 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:08
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_search_vectors(apps, schema_editor):
+    """Compute the search vector of existing recipes."""
+    Recipe = apps.get_model("core", "Recipe")
+    config = getattr(settings, "RECIPE_SEARCH", {}).get("CONFIG", "english")
+
+    def names(field, target):
+        through = Recipe._meta.get_field(field).remote_field.through
+        return Coalesce(
+            Subquery(
+                through.objects.filter(recipe=OuterRef("pk"))
+                .values("recipe")
+                .annotate(names=StringAgg(f"{target}__name", delimiter=" "))
+                .values("names")
+            ),
+            Value(""),
+        )
+
+    Recipe.objects.update(search_vector=(
+        SearchVector("title", weight="A", config=config)
+        + SearchVector(names("tags", "tag"), weight="B", config=config)
+        + SearchVector(names("ingredients", "ingredient"), weight="C", config=config)
+        + SearchVector("description", weight="D", config=config)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_search_vectors, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:54
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_recipe_counts(apps, schema_editor):
+    """Count the recipes of existing tags and ingredients."""
+    Recipe = apps.get_model("core", "Recipe")
+    for field, model_name, fk_name in (
+        ("tags", "Tag", "tag"),
+        ("ingredients", "Ingredient", "ingredient"),
+    ):
+        model = apps.get_model("core", model_name)
+        through = Recipe._meta.get_field(field).remote_field.through
+        links = (
+            through.objects.filter(**{fk_name: OuterRef("pk")})
+            .values(fk_name)
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        model.objects.update(recipe_count=Coalesce(Subquery(links), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_recipe_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_recipe_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(condition=models.Q(('recipe_count__gt', 0)), fields=['user', '-name'], name='ingredient_assigned_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', '-recipe_count', '-name'], name='ingredient_user_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(condition=models.Q(('recipe_count__gt', 0)), fields=['user', '-name'], name='tag_assigned_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', '-recipe_count', '-name'], name='tag_user_recipe_count_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-17 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_recipe_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='replaced_derivatives',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
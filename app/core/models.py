@@ -4,6 +4,8 @@ Database models.
 import os
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.conf import settings
@@ -47,6 +49,22 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
+class RecipeQuerySet(models.QuerySet):
+    """QuerySet for Recipes"""
+
+    def for_user(self, user):
+        """Limit recipes to the given user."""
+        return self.filter(user=user)
+
+    def with_attrs(self, names=("tags", "ingredients")):
+        """Prefetch tags and ingredients used by the recipe serializers."""
+        models_by_name = {"tags": Tag, "ingredients": Ingredient}
+        return self.prefetch_related(*(
+            models.Prefetch(name, queryset=models_by_name[name].objects.order_by("-name"))
+            for name in names
+        ))
+
+
 class Recipe(models.Model):
     """Recipe Object"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -58,24 +76,120 @@ class Recipe(models.Model):
     tags = models.ManyToManyField("Tag")
     ingredients = models.ManyToManyField("Ingredient")
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
+    image_derivatives = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-id"], name="recipe_user_id_desc_idx"),
+            GinIndex(fields=["search_vector"], name="recipe_search_vector_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class Tag(models.Model):
+class RecipeCountMixin:
+    """Leave the maintained recipe count out of regular saves
+
+    The count is changed with F() updates as recipes are linked, so a
+    value loaded earlier must not be written back.
+    """
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None and not self._state.adding:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "recipe_count"
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class Tag(RecipeCountMixin, models.Model):
     """Tag Object"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"],
+                name="unique_tag_name_per_user",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-name"],
+                name="tag_assigned_name_idx",
+                condition=models.Q(recipe_count__gt=0),
+            ),
+            models.Index(
+                fields=["user", "-recipe_count", "-name"],
+                name="tag_user_recipe_count_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Ingredient(models.Model):
+class Ingredient(RecipeCountMixin, models.Model):
     """Ingredient Object"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "name"],
+                name="unique_ingredient_name_per_user",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["user", "-name"],
+                name="ingredient_assigned_name_idx",
+                condition=models.Q(recipe_count__gt=0),
+            ),
+            models.Index(
+                fields=["user", "-recipe_count", "-name"],
+                name="ingredient_user_count_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class ImageJob(models.Model):
+    """Queued image processing for a recipe"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending"
+        RUNNING = "running"
+        DONE = "done"
+        FAILED = "failed"
+
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="image_jobs")
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    # Derivatives of the previous image, removed once the job ran.
+    replaced_derivatives = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="imagejob_status_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe_id}: {self.status}"
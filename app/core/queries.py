@@ -0,0 +1,200 @@
+"""
+Slow query log and detection of repeated queries
+"""
+import json
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.deprecation import MiddlewareMixin
+
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "log", "strict")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?(?![\w\"])")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+# Frames of the execute wrappers and installed packages are skipped when
+# locating the code running a query.
+_WRAPPERS = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ("queries.py", "metrics.py")
+)
+_PACKAGES = (f"{os.sep}site-packages{os.sep}", f"{os.sep}dist-packages{os.sep}")
+
+_current = ContextVar("query_inspection", default=None)
+
+
+class RepeatedQueryError(AssertionError):
+    """A request ran the same query more often than allowed"""
+
+
+def _config():
+    """Return the query inspection settings."""
+    return settings.QUERY_INSPECTION
+
+
+def get_mode():
+    """Return the configured mode, one of `MODES`."""
+    mode = _config().get("MODE", "off")
+    if mode not in MODES:
+        raise ValueError(
+            f"QUERY_INSPECTION MODE must be one of {', '.join(MODES)}, not {mode!r}."
+        )
+    return mode
+
+
+@lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Return the shape of a query, with literals and parameters left out.
+
+    Lists of parameters and rows of VALUES collapse to `(...)`, so queries
+    differing only in their number of items share a shape.
+    """
+    shape = _STRING.sub("?", sql)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _LIST.sub("(...)", shape)
+    shape = _ROWS.sub("(...)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def caller():
+    """Return `path:line in function` of the project code running a query."""
+    base = str(settings.BASE_DIR)
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base)
+            and filename not in _WRAPPERS
+            and not any(part in filename for part in _PACKAGES)
+        ):
+            path = os.path.relpath(filename, base)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+class QueryTracker:
+    """Queries of one request or block by shape"""
+
+    def __init__(self, label, mode, threshold, slow_seconds):
+        self.label = label
+        self.mode = mode
+        self.threshold = threshold
+        self.slow_seconds = slow_seconds
+        self.counts = {}
+        self.reported = set()
+        self.allowed = 0
+
+    def record(self, sql, duration):
+        """Count a finished query and report it when slow or repeated."""
+        shape = fingerprint(sql)
+        count = self.counts.get(shape, 0) + 1
+        self.counts[shape] = count
+        if self.slow_seconds is not None and duration >= self.slow_seconds:
+            self._log("slow_query", shape, duration_ms=round(duration * 1000, 3))
+        if count > self.threshold and not self.allowed and shape not in self.reported:
+            self.reported.add(shape)
+            if self.mode == "strict":
+                raise RepeatedQueryError(
+                    f"{self.label} ran this query {count} times, more than the "
+                    f"{self.threshold} allowed, at {caller()}: {shape}"
+                )
+            self._log("repeated_query", shape, count=count, threshold=self.threshold)
+
+    def _log(self, event, shape, **fields):
+        """Write a structured record of the query."""
+        record = {
+            "event": event, "request": self.label, **fields,
+            "location": caller(), "query": shape,
+        }
+        logger.warning(json.dumps(record), extra={"query": record})
+
+
+def inspect_query(execute, sql, params, many, context):
+    """Execute wrapper reporting slow and repeated queries, see `inspect_queries()`."""
+    tracker = _current.get()
+    if tracker is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    tracker.record(sql, time.perf_counter() - start)
+    return result
+
+
+def install_query_hook(sender, connection, **kwargs):
+    """Inspect the queries of every connection, see `inspect_query()`."""
+    # Wrappers outlive reconnects of the same thread's connection.
+    if inspect_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(inspect_query)
+
+
+def _tracker(label, mode):
+    """Return a tracker for the mode, or None when it's off."""
+    mode = mode or get_mode()
+    if mode == "off":
+        return None
+    config = _config()
+    slow_ms = config.get("SLOW_QUERY_MS")
+    return QueryTracker(
+        label, mode, config.get("REPEAT_THRESHOLD", 10),
+        None if slow_ms is None else slow_ms / 1000,
+    )
+
+
+@contextmanager
+def inspect_queries(label="block", mode=None):
+    """Report slow and repeated queries run inside the block.
+
+    In strict mode a query shape repeated more than REPEAT_THRESHOLD
+    times raises `RepeatedQueryError`, in log mode it's logged once. Both
+    log queries slower than SLOW_QUERY_MS with the calling project code.
+    """
+    tracker = _tracker(label, mode)
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def allow_repeated_queries():
+    """Allow queries inside the block to repeat, such as deliberate loops."""
+    tracker = _current.get()
+    if tracker is None:
+        yield
+        return
+    tracker.allowed += 1
+    try:
+        yield
+    finally:
+        tracker.allowed -= 1
+
+
+class QueryInspectionMiddleware(MiddlewareMixin):
+    """Inspect the queries of each request, see `inspect_queries()`"""
+
+    def process_request(self, request):
+        request._query_tracker = _tracker(f"{request.method} {request.path}", None)
+        _current.set(request._query_tracker)
+
+    def process_response(self, request, response):
+        if getattr(request, "_query_tracker", None) is not None:
+            # The thread serves other requests next.
+            _current.set(None)
+        return response
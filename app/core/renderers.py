@@ -0,0 +1,57 @@
+"""
+JSON renderer with an optional faster encoder
+"""
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    # Dates and times are handed to the DRF encoder, which formats them
+    # differently from orjson.
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+# Encodes types orjson doesn't know, like the stdlib path does.
+_default = encoders.JSONEncoder().default
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """Render JSON with orjson when it is installed
+
+    The output is the same as DRF's renderer gives for compact UTF-8
+    JSON, including `\\u2028` and `\\u2029` escapes. Indented output, other
+    renderer settings and data orjson rejects, such as integers wider
+    than 64 bits, fall back to the stdlib encoder. NaN and infinite
+    floats are rendered as null.
+    """
+
+    def _use_orjson(self, accepted_media_type, renderer_context):
+        """Return whether orjson gives the output configured for DRF."""
+        return (
+            orjson is not None
+            and self.compact
+            and not self.ensure_ascii
+            and self.encoder_class is encoders.JSONEncoder
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if self._use_orjson(accepted_media_type, renderer_context or {}):
+            try:
+                ret = orjson.dumps(data, default=_default, option=OPTIONS)
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                # Like DRF, keep the output a strict subset of JavaScript.
+                return ret.replace(
+                    "\u2028".encode(), b"\\u2028",
+                ).replace("\u2029".encode(), b"\\u2029")
+        return super().render(data, accepted_media_type, renderer_context)
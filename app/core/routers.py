@@ -0,0 +1,125 @@
+"""
+Database router sending API reads to replicas
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.caches import is_database, is_process_local
+
+
+STICKY_KEY = "db:primary:{user_id}"
+
+_replica_alias = ContextVar("replica_alias", default=None)
+
+
+def _config():
+    """Return the replica settings."""
+    return settings.DATABASE_REPLICAS
+
+
+def replica_aliases():
+    """Return the database aliases of the replicas."""
+    return _config().get("ALIASES", [])
+
+
+def _cache():
+    """Return the cache remembering users who just wrote."""
+    return caches[_config().get("CACHE_ALIAS", "default")]
+
+
+def check_shared_cache():
+    """Refuse a sticky cache that other processes can't see.
+
+    A user's next request may reach another process, which must know
+    the user just wrote to read from the primary. A database cache would
+    send every replica read to the primary first to ask.
+    """
+    alias = _config().get("CACHE_ALIAS", "default")
+    if not replica_aliases():
+        return
+    if is_process_local(alias):
+        raise ImproperlyConfigured(
+            f'DATABASE_REPLICAS["CACHE_ALIAS"] is "{alias}", a process-local cache. '
+            "Use a cache shared between processes so users read their own writes."
+        )
+    if is_database(alias):
+        raise ImproperlyConfigured(
+            f'DATABASE_REPLICAS["CACHE_ALIAS"] is "{alias}", a database cache. '
+            "Use a cache outside the database so replica reads skip the primary."
+        )
+
+
+def stick_to_primary(user_id):
+    """Read the user's data from the primary until replicas caught up."""
+    seconds = _config().get("STICKY_SECONDS", 5)
+    if replica_aliases() and seconds > 0:
+        _cache().set(STICKY_KEY.format(user_id=user_id), True, seconds)
+
+
+def is_sticky(user_id):
+    """Return whether the user wrote within the sticky window."""
+    if not replica_aliases():
+        return False
+    return bool(_cache().get(STICKY_KEY.format(user_id=user_id)))
+
+
+def _choose_replica():
+    """Return a random replica alias, or None without replicas."""
+    aliases = replica_aliases()
+    return random.choice(aliases) if aliases else None
+
+
+def start_replica_reads():
+    """Send further reads in the current context to one random replica."""
+    _replica_alias.set(_choose_replica())
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Send reads inside the block to one random replica, or not."""
+    token = _replica_alias.set(_choose_replica() if enabled else None)
+    try:
+        yield
+    finally:
+        _replica_alias.reset(token)
+
+
+class ReplicaRouter:
+    """Route reads inside replica_reads blocks to the replica chosen for them
+
+    All reads of a request go to the same replica, so they see one
+    consistent state. Everything else goes to the primary, including
+    reads inside transactions, which must see the transaction's own
+    writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _replica_alias.get()
+        if alias is None or alias not in replica_aliases():
+            return None
+        if model._meta.app_label == "django_cache":
+            # Cache entries must be read back as soon as they're written.
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
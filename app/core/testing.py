@@ -0,0 +1,26 @@
+"""
+Test runner for the project
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class QueryInspectionRunner(DiscoverRunner):
+    """Run tests with queries inspected in QUERY_INSPECTION["TEST_MODE"]
+
+    Strict mode fails tests whose requests repeat a query shape, such as
+    queries of nested serializers or per-item lookups run in a loop.
+    Tests use the in-process caches of TEST_CACHES, which start empty.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        config = settings.QUERY_INSPECTION
+        settings.QUERY_INSPECTION = {**config, "MODE": config.get("TEST_MODE", config["MODE"])}
+        self._test_caches = override_settings(CACHES=settings.TEST_CACHES)
+        self._test_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._test_caches.disable()
+        super().teardown_test_environment(**kwargs)
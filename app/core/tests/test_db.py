@@ -0,0 +1,141 @@
+"""
+Tests for the PostgreSQL backend with health checks and pooling.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.utils import OperationalError
+from django.test import TestCase
+
+from core.backends.postgresql.base import DatabaseWrapper
+from core.backends.postgresql.pool import close_pool
+
+
+def make_wrapper(**settings):
+    """Create another connection to the test database with extra settings"""
+    return DatabaseWrapper({**connection.settings_dict, **settings}, connection.alias)
+
+
+def backend_pid(wrapper):
+    """Return the server process ID behind a connection"""
+    with wrapper.cursor() as cursor:
+        cursor.execute("SELECT pg_backend_pid()")
+        return cursor.fetchone()[0]
+
+
+def terminate(pid):
+    """Kill a server process as a failover or idle timeout would"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+
+class HealthCheckTests(TestCase):
+    """Test persistent connections are checked before reuse"""
+
+    def _connect(self, **settings):
+        wrapper = make_wrapper(CONN_MAX_AGE=60, POOL_SIZE=0, **settings)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_dead_connection_replaced(self):
+        """Test a connection killed between requests is reopened"""
+        wrapper = self._connect(CONN_HEALTH_CHECKS=True)
+        pid = backend_pid(wrapper)
+        wrapper.close_if_unusable_or_obsolete()
+        terminate(pid)
+
+        wrapper.close_if_unusable_or_obsolete()
+
+        self.assertNotEqual(backend_pid(wrapper), pid)
+
+    def test_checked_once_per_request(self):
+        """Test the check only runs on the first query of a request"""
+        wrapper = self._connect(CONN_HEALTH_CHECKS=True)
+        backend_pid(wrapper)
+        wrapper.close_if_unusable_or_obsolete()
+        backend_pid(wrapper)
+        terminate(wrapper.connection.get_backend_pid())
+
+        with self.assertRaises(OperationalError):
+            backend_pid(wrapper)
+
+    def test_without_checks(self):
+        """Test a dead connection fails the next request without checks"""
+        wrapper = self._connect(CONN_HEALTH_CHECKS=False)
+        pid = backend_pid(wrapper)
+        wrapper.close_if_unusable_or_obsolete()
+        terminate(pid)
+
+        with self.assertRaises(OperationalError):
+            backend_pid(wrapper)
+
+
+class PoolTests(TestCase):
+    """Test connections shared through the in-process pool"""
+
+    def _connect(self, **settings):
+        settings = {
+            "CONN_MAX_AGE": 0, "POOL_SIZE": 2, "POOL_TIMEOUT": 0.1,
+            "CONN_HEALTH_CHECKS": True, **settings,
+        }
+        wrapper = make_wrapper(**settings)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def setUp(self):
+        # Start from a pool of our own size even if the tests run pooled.
+        close_pool(connection.pool_key)
+        return super().setUp()
+
+    def tearDown(self):
+        close_pool(connection.pool_key)
+        return super().tearDown()
+
+    def test_connection_reused(self):
+        """Test a closed connection goes back to the pool for the next one"""
+        first = self._connect()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+
+        second = self._connect()
+        second.ensure_connection()
+
+        self.assertIs(second.connection, raw)
+        self.assertEqual(first.pool.idle, 0)
+
+    def test_exhausted(self):
+        """Test waiting for a connection times out when all are in use"""
+        for _ in range(2):
+            self._connect().ensure_connection()
+
+        with self.assertRaises(OperationalError):
+            self._connect().ensure_connection()
+
+    def test_dead_connection_skipped(self):
+        """Test idle connections that died are replaced"""
+        wrapper = self._connect()
+        pid = backend_pid(wrapper)
+        wrapper.close()
+        terminate(pid)
+
+        self.assertNotEqual(backend_pid(self._connect()), pid)
+
+    def test_transaction_rolled_back(self):
+        """Test a transaction left open is rolled back on return"""
+        wrapper = self._connect()
+        wrapper.set_autocommit(False)
+        with wrapper.cursor() as cursor:
+            cursor.execute("CREATE TEMPORARY TABLE pooled (id int)")
+        raw = wrapper.connection
+        wrapper.close()
+
+        other = self._connect()
+        with other.cursor() as cursor:
+            cursor.execute("SELECT to_regclass('pg_temp.pooled')")
+            self.assertIsNone(cursor.fetchone()[0])
+        self.assertIs(other.connection, raw)
+
+    def test_persistent_rejected(self):
+        """Test pooling can't be combined with persistent connections"""
+        with self.assertRaises(ImproperlyConfigured):
+            self._connect(CONN_MAX_AGE=60).ensure_connection()
@@ -0,0 +1,138 @@
+"""
+Tests for the JSON renderer and parser.
+"""
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.settings import api_settings
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from core.parsers import JSONParser
+from core.renderers import JSONRenderer
+
+
+SAMPLE = ReturnDict({
+    "id": 1,
+    "title": "Crème brûlée\u2028\u2029 \"quoted\"",
+    "price": "5.50",
+    "raw_price": Decimal("5.50"),
+    "ratio": 0.1,
+    "created": datetime.datetime(2021, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+    "naive": datetime.datetime(2021, 5, 1, 12, 30),
+    "day": datetime.date(2021, 5, 1),
+    "time": datetime.time(8, 15, 30, 500),
+    "duration": datetime.timedelta(minutes=90),
+    "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "lazy": gettext_lazy("This field is required."),
+    "errors": {"title": [ErrorDetail("Required.", code="required")]},
+    "names": ("a", "b"),
+    "ids": {1: "one"},
+    "nested": [{"id": 2, "tags": []}, None, True],
+}, serializer=None)
+
+
+class JSONRendererTests(TestCase):
+    """Test the renderer matches DRF's output"""
+
+    def _render_both(self, data, accepted_media_type=None, renderer_context=None):
+        """Render data with DRF's and our renderer"""
+        return (
+            renderers.JSONRenderer().render(data, accepted_media_type, renderer_context),
+            JSONRenderer().render(data, accepted_media_type, renderer_context),
+        )
+
+    def test_same_output(self):
+        """Test output is byte for byte the same"""
+        expected, rendered = self._render_both(SAMPLE)
+
+        self.assertEqual(rendered, expected)
+        self.assertIn(b'"price":"5.50"', rendered)
+        self.assertIn(b"\\u2028", rendered)
+
+    def test_indent_falls_back(self):
+        """Test indented output is rendered like DRF does"""
+        expected, rendered = self._render_both(SAMPLE, "application/json; indent=4")
+
+        self.assertEqual(rendered, expected)
+
+    def test_wide_integers_fall_back(self):
+        """Test integers orjson can't encode are rendered by the stdlib"""
+        expected, rendered = self._render_both({"id": 2 ** 70})
+
+        self.assertEqual(rendered, expected)
+
+    def test_unknown_types_raise(self):
+        """Test unsupported objects fail like before"""
+        with self.assertRaises(TypeError):
+            JSONRenderer().render({"obj": object()})
+
+    def test_none_renders_empty(self):
+        """Test no data renders an empty body"""
+        self.assertEqual(JSONRenderer().render(None), b"")
+
+    def test_default_renderer(self):
+        """Test the renderer and parser are the API defaults"""
+        self.assertIs(api_settings.DEFAULT_RENDERER_CLASSES[0], JSONRenderer)
+        self.assertIs(api_settings.DEFAULT_PARSER_CLASSES[0], JSONParser)
+
+    def test_without_orjson(self):
+        """Test the stdlib is used when orjson is not installed"""
+        with mock.patch("core.renderers.orjson", None):
+            expected, rendered = self._render_both(SAMPLE)
+
+        self.assertEqual(rendered, expected)
+
+
+class JSONParserTests(TestCase):
+    """Test the parser matches DRF's results"""
+
+    def _parse_both(self, body, encoding="utf-8"):
+        """Parse a body with DRF's and our parser"""
+        context = {"encoding": encoding}
+        return (
+            parsers.JSONParser().parse(io.BytesIO(body), parser_context=context),
+            JSONParser().parse(io.BytesIO(body), parser_context=context),
+        )
+
+    def test_same_result(self):
+        """Test valid JSON parses the same"""
+        body = '{"title": "Crème", "price": "5.50", "tags": [{"name": "a"}], "n": 1.5}'
+
+        expected, parsed = self._parse_both(body.encode())
+
+        self.assertEqual(parsed, expected)
+
+    def test_wide_integers_fall_back(self):
+        """Test integers orjson can't decode are parsed by the stdlib"""
+        expected, parsed = self._parse_both(b'{"id": 123456789012345678901234567890}')
+
+        self.assertEqual(parsed, expected)
+
+    def test_other_encoding(self):
+        """Test bodies in other charsets are decoded like before"""
+        expected, parsed = self._parse_both('{"title": "Crème"}'.encode("latin-1"), "latin-1")
+
+        self.assertEqual(parsed, {"title": "Crème"})
+        self.assertEqual(parsed, expected)
+
+    def test_invalid_json(self):
+        """Test invalid JSON gives the same error as before"""
+        with self.assertRaises(ParseError) as expected:
+            parsers.JSONParser().parse(io.BytesIO(b'{"title": '))
+        with self.assertRaises(ParseError) as raised:
+            JSONParser().parse(io.BytesIO(b'{"title": '))
+
+        self.assertEqual(str(raised.exception), str(expected.exception))
+
+    def test_nan_rejected(self):
+        """Test non-standard constants are rejected"""
+        with self.assertRaises(ParseError):
+            JSONParser().parse(io.BytesIO(b'{"price": NaN}'))
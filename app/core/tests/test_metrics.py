@@ -0,0 +1,196 @@
+"""
+Tests for request metrics.
+"""
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from core.metrics import Histogram, MetricsMiddleware, check_token, registry, view_label
+from core.models import Recipe
+from recipe.cache import stats
+from recipe.views import RecipeViewset
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+METRICS_URL = reverse("api-metrics")
+METRICS = {"ENABLED": True, "SERVER_TIMING": True, "TOKEN": ""}
+
+
+def create_recipe(user, **params):
+    """Create and return a sample recipe"""
+    defaults = {"title": "Curry", "time_minutes": 10, "price": Decimal("5.50")}
+    defaults.update(params)
+    return Recipe.objects.create(user=user, **defaults)
+
+
+def series(histogram, view):
+    """Return the recorded values of a view"""
+    return histogram.snapshot()[view]
+
+
+class HistogramTests(TestCase):
+    """Test histograms count values into buckets"""
+
+    def test_buckets(self):
+        """Test values are counted in inclusive, cumulative buckets"""
+        histogram = Histogram("sizes", "Sizes.", [1, 10])
+        for value in (0, 1, 5, 50):
+            histogram.observe("view", value)
+
+        recorded = series(histogram, "view")
+
+        self.assertEqual(recorded["buckets"], [(1, 2), (10, 3), (float("inf"), 4)])
+        self.assertEqual(recorded["count"], 4)
+        self.assertEqual(recorded["sum"], 56)
+
+    def test_render(self):
+        """Test histograms are rendered in the Prometheus text format"""
+        histogram = Histogram("sizes", "Sizes.", [1])
+        histogram.observe('a"b', 0.5)
+
+        text = histogram.render()
+
+        self.assertIn("# TYPE sizes histogram", text)
+        self.assertIn('sizes_bucket{view="a\\"b",le="1"} 1', text)
+        self.assertIn('sizes_bucket{view="a\\"b",le="+Inf"} 1', text)
+        self.assertIn('sizes_sum{view="a\\"b"} 0.5', text)
+
+    def test_view_label(self):
+        """Test views are labelled by class and action"""
+        view = RecipeViewset.as_view({"get": "list", "post": "create"})
+
+        self.assertEqual(view_label(view, "GET"), "RecipeViewset.list")
+        self.assertEqual(view_label(view, "HEAD"), "RecipeViewset.list")
+        self.assertEqual(view_label(view, "POST"), "RecipeViewset.create")
+
+
+@override_settings(API_METRICS=METRICS)
+class MetricsMiddlewareTests(TestCase):
+    """Test requests are recorded per view action"""
+
+    def setUp(self):
+        registry.reset()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def test_records_request(self):
+        """Test queries, timings and size are recorded for the action"""
+        create_recipe(self.user)
+
+        res = self.client.get(RECIPE_URL)
+
+        queries = series(registry.queries, "RecipeViewset.list")
+        self.assertEqual(queries["count"], 1)
+        self.assertGreater(queries["sum"], 0)
+        self.assertGreater(series(registry.db_duration, "RecipeViewset.list")["sum"], 0)
+        self.assertGreater(series(registry.serialize_duration, "RecipeViewset.list")["sum"], 0)
+        self.assertEqual(
+            series(registry.response_size, "RecipeViewset.list")["sum"], len(res.content),
+        )
+
+    def test_server_timing(self):
+        """Test timings are sent in a Server-Timing header"""
+        res = self.client.get(reverse("user:me"))
+
+        self.assertRegex(
+            res["Server-Timing"],
+            r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+        self.assertIn("ManageUserView.get", registry.duration.snapshot())
+
+    @override_settings(API_METRICS={**METRICS, "SERVER_TIMING": False})
+    def test_server_timing_disabled(self):
+        """Test the header is only sent when enabled"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertNotIn("Server-Timing", res)
+
+    @override_settings(API_METRICS={**METRICS, "ENABLED": False})
+    def test_disabled(self):
+        """Test nothing is recorded when disabled"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(registry.duration.snapshot(), {})
+        self.assertNotIn("Server-Timing", res)
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 404)
+
+    def test_queries_outside_requests(self):
+        """Test queries outside requests aren't counted"""
+        self.client.get(RECIPE_URL)
+        create_recipe(self.user)
+
+        self.assertEqual(series(registry.queries, "RecipeViewset.list")["count"], 1)
+
+    def test_endpoint(self):
+        """Test the metrics endpoint renders the histograms"""
+        self.client.get(RECIPE_URL)
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            'api_request_queries_count{view="RecipeViewset.list"} 1', res.content.decode(),
+        )
+
+    def test_endpoint_cache_stats(self):
+        """Test list cache hits and misses are exposed"""
+        stats.reset()
+        self.client.get(RECIPE_URL)
+        self.client.get(RECIPE_URL)
+
+        content = self.client.get(METRICS_URL).content.decode()
+
+        self.assertIn("# TYPE api_list_cache_requests_total counter", content)
+        self.assertIn('api_list_cache_requests_total{result="hit"} 1', content)
+        self.assertIn('api_list_cache_requests_total{result="miss"} 1', content)
+
+    @override_settings(API_METRICS={**METRICS, "TOKEN": "secret"})
+    def test_endpoint_token(self):
+        """Test scrapes must send the token when one is set"""
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 401)
+        res = self.client.get(METRICS_URL, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(DEBUG=False)
+    def test_token_required(self):
+        """Test metrics need a token with DEBUG off"""
+        with self.assertRaisesRegex(ImproperlyConfigured, "TOKEN"):
+            check_token()
+
+        with override_settings(API_METRICS={**METRICS, "TOKEN": "secret"}):
+            check_token()
+        with override_settings(API_METRICS={**METRICS, "ENABLED": False}):
+            check_token()
+
+
+# Async reads run on other threads with their own connections, which only
+# see committed rows.
+@override_settings(API_METRICS=METRICS, RECIPE_ASYNC={"READS": True, "THREADS": 2})
+class AsyncMetricsTests(TransactionTestCase):
+    """Test queries of async reads are counted for their request"""
+
+    def test_async_read(self):
+        """Test queries on the read pool count for the request"""
+        registry.reset()
+        user = get_user_model().objects.create(email="test@example.com", password="pass1234")
+        create_recipe(user)
+        view = RecipeViewset.as_view({"get": "list"})
+        request = APIRequestFactory().get(RECIPE_URL)
+        force_authenticate(request, user)
+        middleware = MetricsMiddleware(view)
+
+        res = async_to_sync(middleware)(request)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertGreater(series(registry.queries, "unmatched")["sum"], 0)
+        self.assertIn("Server-Timing", res)
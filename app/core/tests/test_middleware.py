@@ -0,0 +1,175 @@
+"""
+Tests for response compression.
+"""
+import gzip
+import zlib
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.middleware import CompressionMiddleware, choose_encoder, GzipEncoder
+from core.models import Recipe
+
+
+BODY = b'{"title": "Recipe"}' * 100
+
+
+class FakeBrotli:
+    """Stand-in for the brotli module"""
+
+    class Compressor:
+        def __init__(self, quality):
+            self.quality = quality
+
+        def process(self, data):
+            return data[:1]
+
+        def flush(self):
+            return b""
+
+        def finish(self):
+            return b"."
+
+
+def compressed(body=BODY, content_type="application/json", accept="gzip", **headers):
+    """Run a response with the body through the middleware"""
+    def get_response(request):
+        response = HttpResponse(body, content_type=content_type)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+    return CompressionMiddleware(get_response)(request)
+
+
+class CompressionMiddlewareTests(TestCase):
+    """Test responses are compressed when it pays off"""
+
+    def test_gzip(self):
+        """Test large JSON responses are gzipped"""
+        response = compressed(ETag='"abc"')
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_small_response_unchanged(self):
+        """Test responses below the minimum size are not compressed"""
+        response = compressed(body=b'{"id": 1}')
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, b'{"id": 1}')
+
+    def test_other_content_type_unchanged(self):
+        """Test images and other binary types are not compressed"""
+        response = compressed(content_type="image/webp")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_html_unchanged(self):
+        """Test HTML pages, which carry CSRF tokens, are not compressed"""
+        response = compressed(content_type="text/html; charset=utf-8")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, BODY)
+
+    def test_not_accepted(self):
+        """Test responses are not compressed for clients without support"""
+        for accept in ("", "identity", "gzip;q=0", "*;q=0"):
+            with self.subTest(accept=accept):
+                response = compressed(accept=accept)
+
+                self.assertFalse(response.has_header("Content-Encoding"))
+                self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_already_encoded_unchanged(self):
+        """Test encoded responses are not compressed again"""
+        response = compressed(**{"Content-Encoding": "deflate"})
+
+        self.assertEqual(response["Content-Encoding"], "deflate")
+        self.assertEqual(response.content, BODY)
+
+    def test_streaming(self):
+        """Test streaming responses are compressed chunk by chunk"""
+        chunks = [b'{"id": %d}\n' % i for i in range(3)]
+
+        def get_response(request):
+            return StreamingHttpResponse(iter(chunks), content_type="application/x-ndjson")
+
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        response = CompressionMiddleware(get_response)(request)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        decompressor = zlib.decompressobj(31)
+        first = next(iter(response.streaming_content))
+        self.assertEqual(decompressor.decompress(first), chunks[0])
+        rest = b"".join(response.streaming_content)
+        self.assertEqual(decompressor.decompress(rest), b"".join(chunks[1:]))
+
+    def test_negotiation(self):
+        """Test the client's preferred available encoding is chosen"""
+        with mock.patch("core.middleware.brotli", FakeBrotli):
+            cases = {
+                "gzip, deflate, br": "br",
+                "gzip;q=1.0, br;q=0.5": "gzip",
+                "br;q=0, gzip": "gzip",
+                "*": "br",
+                "deflate": None,
+            }
+            for accept, name in cases.items():
+                with self.subTest(accept=accept):
+                    encoder = choose_encoder(accept)
+                    self.assertEqual(encoder and encoder.name, name)
+
+            response = compressed(accept="br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response.content, b"{.")
+
+    def test_brotli_not_installed(self):
+        """Test gzip is used when brotli is not installed"""
+        with mock.patch("core.middleware.brotli", None):
+            self.assertIs(choose_encoder("br, gzip"), GzipEncoder)
+            self.assertIsNone(choose_encoder("br"))
+
+
+class CompressedApiTests(TestCase):
+    """Test API responses are compressed end to end"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        Recipe.objects.bulk_create(
+            Recipe(user=self.user, title=f"Recipe {i}", time_minutes=i, price=Decimal("5.50"))
+            for i in range(50)
+        )
+        return super().setUp()
+
+    def test_recipe_list(self):
+        """Test recipe lists decompress to the plain response"""
+        url = reverse("recipe:recipe-list")
+        plain = self.client.get(url)
+        res = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(res["Content-Encoding"], "gzip")
+        self.assertLess(len(res.content), len(plain.content) / 4)
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+
+    def test_export_streamed(self):
+        """Test exports stay streaming when compressed"""
+        res = self.client.get(reverse("recipe:recipe-export"), HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertTrue(res.streaming)
+        content = gzip.decompress(b"".join(res.streaming_content))
+        self.assertEqual(len(content.splitlines()), 50)
@@ -0,0 +1,156 @@
+"""
+Tests for the slow query log and repeated query detection.
+"""
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+from core.queries import (
+    RepeatedQueryError,
+    allow_repeated_queries,
+    fingerprint,
+    inspect_queries,
+)
+from recipe.views import RecipeViewset
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+INSPECTION = {"MODE": "strict", "REPEAT_THRESHOLD": 3, "SLOW_QUERY_MS": None}
+
+
+def create_recipes(user, count):
+    """Create recipes with a tag and an ingredient each"""
+    for i in range(count):
+        recipe = Recipe.objects.create(
+            user=user, title=f"Recipe {i}", time_minutes=10, price=Decimal("5.50"),
+        )
+        recipe.tags.add(Tag.objects.create(user=user, name=f"Tag {i}"))
+        recipe.ingredients.add(Ingredient.objects.create(user=user, name=f"Ingredient {i}"))
+
+
+def load(user, count):
+    """Look up the user's recipes one by one"""
+    for recipe_id in Recipe.objects.filter(user=user).values_list("id", flat=True)[:count]:
+        Recipe.objects.get(pk=recipe_id)
+
+
+class FingerprintTests(TestCase):
+    """Test queries are reduced to their shape"""
+
+    def test_literals(self):
+        """Test literals and placeholders are left out"""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE a = 'it''s' AND b = 42 AND \"c2\" = %s"),
+            'SELECT * FROM t WHERE a = ? AND b = ? AND "c2" = ?',
+        )
+
+    def test_lists(self):
+        """Test lists of any length share a shape"""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s,\n %s)"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s)"),
+        )
+        self.assertEqual(
+            fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)"),
+            "INSERT INTO t (a, b) VALUES (...)",
+        )
+
+
+@override_settings(QUERY_INSPECTION=INSPECTION)
+class InspectQueriesTests(TestCase):
+    """Test repeated and slow queries are reported"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        create_recipes(self.user, 5)
+        return super().setUp()
+
+    def test_strict(self):
+        """Test strict mode raises once a shape repeats too often"""
+        with self.assertRaisesRegex(RepeatedQueryError, "4 times.*test_queries.py:\\d+ in load"):
+            with inspect_queries():
+                load(self.user, 5)
+
+    def test_below_threshold(self):
+        """Test queries may repeat up to the threshold"""
+        with inspect_queries() as tracker:
+            load(self.user, 3)
+
+        self.assertEqual(max(tracker.counts.values()), 3)
+
+    def test_allowed(self):
+        """Test deliberate loops can repeat queries"""
+        with inspect_queries(), allow_repeated_queries():
+            load(self.user, 5)
+
+    def test_log(self):
+        """Test log mode writes one record per repeated shape"""
+        with self.assertLogs("core.queries", "WARNING") as logs:
+            with inspect_queries("GET /recipes/", mode="log"):
+                load(self.user, 5)
+
+        self.assertEqual(len(logs.records), 1)
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["event"], "repeated_query")
+        self.assertEqual(record["request"], "GET /recipes/")
+        self.assertEqual(record["count"], 4)
+        self.assertRegex(record["location"], r"^core/tests/test_queries.py:\d+ in load$")
+        self.assertEqual(logs.records[0].query, record)
+
+    @override_settings(QUERY_INSPECTION={**INSPECTION, "MODE": "log", "SLOW_QUERY_MS": 0})
+    def test_slow(self):
+        """Test queries slower than the limit are logged"""
+        with self.assertLogs("core.queries", "WARNING") as logs:
+            with inspect_queries():
+                Recipe.objects.count()
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["event"], "slow_query")
+        self.assertIn("duration_ms", record)
+        self.assertRegex(record["query"], r'^SELECT COUNT\(\*\) AS "__count" FROM "core_recipe"')
+
+    @override_settings(QUERY_INSPECTION={**INSPECTION, "MODE": "off"})
+    def test_off(self):
+        """Test nothing is inspected when off"""
+        with inspect_queries() as tracker:
+            load(self.user, 5)
+
+        self.assertIsNone(tracker)
+
+
+@override_settings(QUERY_INSPECTION=INSPECTION)
+class QueryInspectionMiddlewareTests(TestCase):
+    """Test requests repeating queries fail in strict mode"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        create_recipes(self.user, 5)
+        return super().setUp()
+
+    def test_list(self):
+        """Test recipe lists read tags and ingredients for all recipes at once"""
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data["results"]), 5)
+
+    def test_nested_fields_per_recipe(self):
+        """Test nested fields read per recipe fail the request"""
+        def get_queryset(viewset):
+            return Recipe.objects.filter(user=self.user).order_by("-id")
+
+        with mock.patch.object(RecipeViewset, "get_queryset", get_queryset):
+            with self.assertRaisesRegex(RepeatedQueryError, f"GET {RECIPE_URL}"):
+                self.client.get(RECIPE_URL)
@@ -0,0 +1,203 @@
+"""
+Tests for routing reads to replicas.
+"""
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Recipe
+from core.routers import (
+    ReplicaRouter,
+    check_shared_cache,
+    is_sticky,
+    replica_reads,
+    start_replica_reads,
+    stick_to_primary,
+)
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+REPLICAS = {"ALIASES": ["replica0", "replica1"], "STICKY_SECONDS": 5, "CACHE_ALIAS": "default"}
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaRouterTests(SimpleTestCase):
+    """Test the router's choice of database"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        cache.clear()
+        return super().setUp()
+
+    def test_reads_outside_block(self):
+        """Test reads go to the primary by default"""
+        self.assertIsNone(self.router.db_for_read(Recipe))
+
+    def test_reads_in_block(self):
+        """Test reads inside replica_reads go to a replica"""
+        with replica_reads():
+            self.assertIn(self.router.db_for_read(Recipe), REPLICAS["ALIASES"])
+
+            with replica_reads(False):
+                self.assertIsNone(self.router.db_for_read(Recipe))
+
+    def test_one_replica_per_context(self):
+        """Test every read of a request goes to the replica chosen at its start"""
+        with replica_reads(False):
+            with mock.patch("core.routers.random.choice", return_value="replica1") as choice:
+                start_replica_reads()
+                choices = {self.router.db_for_read(Recipe) for _ in range(5)}
+
+        self.assertEqual(choices, {"replica1"})
+        choice.assert_called_once_with(REPLICAS["ALIASES"])
+        self.assertIsNone(self.router.db_for_read(Recipe))
+
+    @override_settings(DATABASE_REPLICAS={**REPLICAS, "ALIASES": []})
+    def test_no_replicas(self):
+        """Test reads stay on the primary without replicas"""
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(Recipe))
+
+    def test_cache_reads(self):
+        """Test database cache entries are read from the primary"""
+        model = DatabaseCache("api_cache", {}).cache_model_class
+
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(model))
+
+    def test_writes_and_migrations(self):
+        """Test writes and migrations only go to the primary"""
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(Recipe), "default")
+        self.assertFalse(self.router.allow_migrate("replica0", "core"))
+        self.assertIsNone(self.router.allow_migrate("default", "core"))
+
+    def test_sticky(self):
+        """Test users are sticky for a while after writing"""
+        stick_to_primary(1)
+
+        self.assertTrue(is_sticky(1))
+        self.assertFalse(is_sticky(2))
+
+    @override_settings(DATABASE_REPLICAS={**REPLICAS, "STICKY_SECONDS": 0})
+    def test_sticky_disabled(self):
+        """Test stickiness can be turned off"""
+        stick_to_primary(1)
+
+        self.assertFalse(is_sticky(1))
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }})
+    def test_process_local_cache(self):
+        """Test replicas need a sticky cache shared between processes"""
+        with self.assertRaisesRegex(ImproperlyConfigured, "CACHE_ALIAS"):
+            check_shared_cache()
+
+        with override_settings(DATABASE_REPLICAS={**REPLICAS, "ALIASES": []}):
+            check_shared_cache()
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "api_cache",
+    }})
+    def test_database_cache(self):
+        """Test replicas need a sticky cache outside the database"""
+        with self.assertRaisesRegex(ImproperlyConfigured, "database cache"):
+            check_shared_cache()
+
+        with override_settings(DATABASE_REPLICAS={**REPLICAS, "ALIASES": []}):
+            check_shared_cache()
+
+
+@override_settings(DATABASE_REPLICAS=REPLICAS)
+class ReplicaReadApiTests(TransactionTestCase):
+    """Test recipe APIs read from replicas"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        Recipe.objects.create(
+            user=self.user, title="Curry", time_minutes=10, price=Decimal("5.50"),
+        )
+        cache.clear()
+        return super().setUp()
+
+    def _choices(self, method, url, data=None):
+        """Send a request and return the router's choices for its reads
+
+        The replicas don't exist, so reads run on the primary whatever
+        the router chose.
+        """
+        choices = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            choices.append(db_for_read(router, model, **hints))
+            return None
+
+        with mock.patch.object(ReplicaRouter, "db_for_read", autospec=True, side_effect=record):
+            getattr(self.client, method)(url, data, format="json")
+        return choices
+
+    def test_safe_requests_use_replicas(self):
+        """Test lists and details read from replicas"""
+        recipe = Recipe.objects.get()
+
+        for url in (
+            RECIPE_URL,
+            reverse("recipe:recipe-detail", args=[recipe.id]),
+            reverse("recipe:tag-list"),
+        ):
+            with self.subTest(url=url):
+                self.assertIn("replica", " ".join(map(str, self._choices("get", url))))
+
+    def test_read_your_writes(self):
+        """Test users read from the primary right after writing"""
+        choices = self._choices(
+            "post", RECIPE_URL, {"title": "Soup", "time_minutes": 5, "price": "2.00"},
+        )
+
+        self.assertEqual(set(choices), {None})
+        self.assertEqual(set(self._choices("get", RECIPE_URL)), {None})
+
+        cache.clear()
+        self.assertIn("replica", " ".join(map(str, self._choices("get", RECIPE_URL))))
+
+    def test_reads_in_transactions(self):
+        """Test reads inside a transaction stay on the primary"""
+        router = ReplicaRouter()
+
+        with replica_reads(), transaction.atomic():
+            self.assertIsNone(router.db_for_read(Recipe))
+
+
+@skipUnless("replica0" in connections, "No replica configured, see DB_REPLICA_HOSTS.")
+class ConfiguredReplicaTests(TransactionTestCase):
+    """Test reads reach the configured replica connection"""
+    databases = "__all__"
+
+    def test_list_queries_replica(self):
+        """Test recipe lists query the replica"""
+        client = APIClient()
+        user = get_user_model().objects.create(email="test@example.com", password="pass1234")
+        client.force_authenticate(user)
+
+        with override_settings(DATABASE_REPLICAS={**REPLICAS, "ALIASES": ["replica0"]}):
+            with CaptureQueriesContext(connections["replica0"]) as ctx:
+                client.get(RECIPE_URL)
+
+        self.assertTrue(any("core_recipe" in query["sql"] for query in ctx.captured_queries))
@@ -1,3 +1,26 @@
-from django.shortcuts import render
+"""
+Views for operating the API
+"""
+import secrets
 
-# Create your views here.
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from core.metrics import registry
+
+
+@require_GET
+def metrics(request):
+    """Expose request metrics in the Prometheus text format"""
+    config = settings.API_METRICS
+    if not config["ENABLED"]:
+        raise Http404
+    token = config.get("TOKEN")
+    if token and not secrets.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}",
+    ):
+        return HttpResponse(status=401)
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
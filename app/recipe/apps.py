@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class RecipeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipe'
+
+    def ready(self):
+        from core.metrics import registry
+        from recipe import signals  # noqa: F401
+        from recipe.cache import stats
+
+        registry.register(stats)
@@ -0,0 +1,85 @@
+"""
+Async read paths for recipe APIs under ASGI
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+
+# Actions run on the read pool. Exports are written out before the view
+# returns under ASGI, see RecipeViewset.export.
+ASYNC_ACTIONS = ("list", "retrieve", "export")
+
+_executor = None
+
+
+def get_executor():
+    """Return the thread pool that runs read requests."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.RECIPE_ASYNC.get("THREADS", 16),
+            thread_name_prefix="recipe-read",
+        )
+    return _executor
+
+
+def use_async_reads():
+    """Return whether viewsets serve reads from an async view."""
+    return settings.RECIPE_ASYNC.get("READS", False)
+
+
+def database_sync_to_async(func):
+    """Wrap func to run on the read pool with its own database connection.
+
+    Django 3.2 has no async ORM and runs sync views of all requests on one
+    shared thread under ASGI. Reads go to a bounded pool instead, which
+    also caps the number of database connections they hold. Connections
+    past their CONN_MAX_AGE are closed around each call, as the request
+    signals only do that on the shared thread.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False, executor=get_executor())
+
+
+class AsyncReadMixin:
+    """Serve list, retrieve and export requests from an async view
+
+    Enabled by RECIPE_ASYNC["READS"], which the ASGI entrypoint turns on.
+    Other actions run on the shared thread like any sync view, so writes
+    keep Django's thread-sensitive guarantees.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not use_async_reads():
+            return view
+
+        def read(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                # Render here rather than on the shared thread.
+                response.render()
+            return response
+
+        read_async = database_sync_to_async(read)
+        view_sync = sync_to_async(view, thread_sensitive=True)
+
+        async def async_view(request, *args, **kwargs):
+            method = "get" if request.method == "HEAD" else request.method.lower()
+            if actions.get(method) in ASYNC_ACTIONS:
+                return await read_async(request, *args, **kwargs)
+            return await view_sync(request, *args, **kwargs)
+
+        # Keep cls, actions and initkwargs for routers and schema generation.
+        return update_wrapper(async_view, view)
@@ -0,0 +1,100 @@
+"""
+Batched create, update and delete of recipes
+"""
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+
+from core.models import Recipe
+from recipe.bulk import create_recipes, delete_recipes, update_recipes
+from recipe.cache import bump_version
+
+
+NOT_APPLIED = {
+    "status": status.HTTP_424_FAILED_DEPENDENCY,
+    "errors": {"detail": "Not applied because another operation failed."},
+}
+
+
+def _validate(operations, user, serializer_class, context):
+    """Check every operation, returning results and the planned writes."""
+    recipes = Recipe.objects.for_user(user).in_bulk(
+        [operation["id"] for operation in operations if "id" in operation]
+    )
+    serializers = {
+        "create": serializer_class(context=context),
+        "update": serializer_class(context=context, partial=True),
+    }
+    results, planned, seen = [], [], set()
+    for operation in operations:
+        op = operation["op"]
+        recipe = None
+        if op != "create":
+            recipe = recipes.get(operation["id"])
+            if recipe is None:
+                results.append({
+                    "status": status.HTTP_404_NOT_FOUND,
+                    "errors": {"detail": "Not found."},
+                })
+                continue
+            if recipe.pk in seen:
+                results.append({
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": {"id": ["A recipe can only be changed once per batch."]},
+                })
+                continue
+            seen.add(recipe.pk)
+
+        data = None
+        if op != "delete":
+            try:
+                data = serializers[op].run_validation(operation["data"])
+            except ValidationError as exc:
+                results.append({"status": status.HTTP_400_BAD_REQUEST, "errors": exc.detail})
+                continue
+        results.append(None)
+        planned.append((len(results) - 1, op, recipe, data))
+    return results, planned, serializers
+
+
+def run_batch(operations, user, serializer_class, context):
+    """Apply operations in one transaction if all of them are valid.
+
+    Returns the response status and one result per operation. Creates
+    and updates go through the serializer's validation and are written
+    with a few set-based statements for the whole batch.
+    """
+    results, planned, serializers = _validate(operations, user, serializer_class, context)
+    if any(result is not None for result in results):
+        return status.HTTP_400_BAD_REQUEST, [
+            result if result is not None else NOT_APPLIED for result in results
+        ]
+
+    by_op = {"create": [], "update": [], "delete": []}
+    for item in planned:
+        by_op[item[1]].append(item)
+
+    with transaction.atomic():
+        created_ids = create_recipes(
+            serializers["create"], user, [data for _, _, _, data in by_op["create"]],
+        )
+        update_recipes(
+            serializers["update"],
+            [recipe for _, _, recipe, _ in by_op["update"]],
+            [data for _, _, _, data in by_op["update"]],
+        )
+        delete_recipes([recipe.pk for _, _, recipe, _ in by_op["delete"]])
+        bump_version(user.pk)
+
+    written = dict(zip((index for index, *_ in by_op["create"]), created_ids))
+    written.update((index, recipe.pk) for index, _, recipe, _ in by_op["update"])
+    recipes = Recipe.objects.with_attrs().in_bulk(list(written.values()))
+    for index, op, _, _ in planned:
+        if op == "delete":
+            results[index] = {"status": status.HTTP_204_NO_CONTENT}
+            continue
+        results[index] = {
+            "status": status.HTTP_201_CREATED if op == "create" else status.HTTP_200_OK,
+            "data": serializer_class(recipes[written[index]], context=context).data,
+        }
+    return status.HTTP_200_OK, results
@@ -0,0 +1,169 @@
+"""
+Set-based writes of recipes with their tags and ingredients
+"""
+from collections import Counter
+
+from django.db import connections, router
+from django.utils import timezone
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.counters import add_counts, links_removed
+from recipe.search import set_search_vectors, update_search_vectors
+
+
+ATTRS = (
+    ("tags", Tag, "tag"),
+    ("ingredients", Ingredient, "ingredient"),
+)
+
+
+def insert_values(model, fields, values):
+    """Insert rows of column values in one statement and return their IDs.
+
+    Each column is sent as a single array and expanded with unnest, which
+    avoids building and compiling a model instance per row. Rows are
+    inserted in order, so sorting the returned IDs matches them to values.
+    """
+    if not values:
+        return []
+    connection = connections[router.db_for_write(model)]
+    columns = [[] for _ in fields]
+    for row in values:
+        for column, field, value in zip(columns, fields, row):
+            column.append(field.get_db_prep_save(value, connection))
+
+    qn = connection.ops.quote_name
+    names = ", ".join(qn(field.column) for field in fields)
+    arrays = ", ".join(f"%s::{field.db_type(connection)}[]" for field in fields)
+    aliases = ", ".join(f"c{i}" for i in range(len(fields)))
+    pk = qn(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {qn(model._meta.db_table)} ({names}) "
+            f"SELECT {aliases} FROM unnest({arrays}) WITH ORDINALITY "
+            f"AS t({aliases}, n) ORDER BY n RETURNING {pk}",
+            columns,
+        )
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def resolve_attrs(serializer, rows):
+    """Fetch or create the tags and ingredients named in rows, by name."""
+    attrs = {}
+    for field, model, _ in ATTRS:
+        items = [item for row in rows for item in row.get(field, [])]
+        attrs[field] = {
+            obj.name: obj for obj in serializer._resolve_attrs(model, items)
+        }
+    return attrs
+
+
+def link_attrs(recipe_ids, rows, attrs):
+    """Link recipes to the tags and ingredients named in their rows."""
+    for field, model, fk_name in ATTRS:
+        through = getattr(Recipe, field).through
+        links = {
+            (recipe_id, attrs[field][item["name"]].pk)
+            for recipe_id, row in zip(recipe_ids, rows)
+            for item in row.get(field, [])
+        }
+        insert_values(
+            through,
+            [through._meta.get_field("recipe"), through._meta.get_field(fk_name)],
+            links,
+        )
+        add_counts(model, Counter(obj_id for _, obj_id in links))
+
+
+def unlink_attrs(through, fk_name, recipe_ids):
+    """Delete the links of recipes and count them per tag or ingredient."""
+    connection = connections[router.db_for_write(through)]
+    qn = connection.ops.quote_name
+    column = through._meta.get_field(fk_name).column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {qn(through._meta.db_table)} "
+            f"WHERE {qn(through._meta.get_field('recipe').column)} = ANY(%s) "
+            f"RETURNING {qn(column)}",
+            [list(recipe_ids)],
+        )
+        return Counter(row[0] for row in cursor.fetchall())
+
+
+def create_recipes(serializer, user, rows):
+    """Create recipes from validated rows and return their IDs in order.
+
+    Signals aren't sent, so callers invalidate the owner's cache.
+    """
+    attrs = resolve_attrs(serializer, rows)
+    defaults = {"user": user.pk, "updated_at": timezone.now()}
+    fields = [field for field in Recipe._meta.concrete_fields if not field.primary_key]
+    recipe_ids = insert_values(Recipe, fields, [
+        [
+            row.get(field.name, defaults.get(field.name, field.get_default()))
+            for field in fields
+        ]
+        for row in rows
+    ])
+    link_attrs(recipe_ids, rows, attrs)
+    set_search_vectors({
+        recipe_id: tuple(
+            list(dict.fromkeys(item["name"] for item in row.get(field, [])))
+            for field, _, _ in ATTRS
+        )
+        for recipe_id, row in zip(recipe_ids, rows)
+    })
+    return recipe_ids
+
+
+def update_recipes(serializer, recipes, rows):
+    """Apply validated partial rows to recipes.
+
+    Tags and ingredients present in a row replace the recipe's current
+    ones. Signals aren't sent, so callers invalidate the owner's cache.
+    """
+    if not recipes:
+        return
+    attrs = resolve_attrs(serializer, rows)
+    attr_fields = {field for field, _, _ in ATTRS}
+    fields = {"updated_at"}
+    now = timezone.now()
+    for recipe, row in zip(recipes, rows):
+        for key, value in row.items():
+            if key not in attr_fields:
+                setattr(recipe, key, value)
+                fields.add(key)
+        recipe.updated_at = now
+    Recipe.objects.bulk_update(recipes, sorted(fields))
+
+    for field, model, fk_name in ATTRS:
+        replaced = [
+            (recipe.pk, row) for recipe, row in zip(recipes, rows) if field in row
+        ]
+        if not replaced:
+            continue
+        removed = unlink_attrs(
+            getattr(Recipe, field).through,
+            fk_name,
+            [recipe_id for recipe_id, _ in replaced],
+        )
+        add_counts(model, {pk: -count for pk, count in removed.items()})
+        link_attrs(
+            [recipe_id for recipe_id, _ in replaced],
+            [{field: row[field]} for _, row in replaced],
+            attrs,
+        )
+    update_search_vectors(Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes]))
+
+
+def delete_recipes(recipe_ids):
+    """Delete recipes with a few statements however many there are.
+
+    Their links are removed and uncounted per tag and ingredient first,
+    so the delete signals have no counts left to change per recipe.
+    """
+    for field, model, fk_name in ATTRS:
+        removed = unlink_attrs(getattr(Recipe, field).through, fk_name, recipe_ids)
+        add_counts(model, {pk: -count for pk, count in removed.items()})
+    with links_removed(recipe_ids):
+        Recipe.objects.filter(pk__in=recipe_ids).delete()
@@ -0,0 +1,139 @@
+"""
+Per-user response cache for recipe APIs
+"""
+import hashlib
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from core.caches import is_database
+from core.routers import stick_to_primary
+
+
+VERSION_KEY = "recipe:version:{user_id}"
+LIST_KEY = "recipe:list:{user_id}:{version}:{view}:{query}"
+
+
+def get_cache():
+    """Return the cache backend configured for recipe responses."""
+    return caches[settings.RECIPE_CACHE.get("ALIAS", "default")]
+
+
+def get_version(user_id):
+    """Return the current cache version for the user."""
+    cache = get_cache()
+    key = VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    """Invalidate all cached responses of the user.
+
+    The version is replaced once the surrounding transaction commits, so
+    a read racing the write can't keep rows from before the commit under
+    the new version. Caches outside the database also get the new version
+    right away, which reads inside the writing transaction see; a
+    database cache would only apply it with the transaction. The user
+    reads from the primary until replicas caught up with the write.
+    """
+    def bump():
+        get_cache().set(VERSION_KEY.format(user_id=user_id), uuid.uuid4().hex, None)
+
+    def commit():
+        bump()
+        stick_to_primary(user_id)
+
+    if not is_database(settings.RECIPE_CACHE.get("ALIAS", "default")):
+        bump()
+    transaction.on_commit(commit)
+
+
+def list_cache_key(request, view_name):
+    """Build the cache key of a list response for the request."""
+    query = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return LIST_KEY.format(
+        user_id=request.user.pk,
+        version=request.cache_version,
+        view=view_name,
+        query=query,
+    )
+
+
+class CacheStats:
+    """Thread-safe hit and miss counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        """Count a cache hit or miss."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        """Return the current counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset(self):
+        """Reset the counters to zero."""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def render(self):
+        """Return the counters in the Prometheus text format."""
+        counts = self.snapshot()
+        return "\n".join([
+            "# HELP api_list_cache_requests_total List responses looked up in the cache.",
+            "# TYPE api_list_cache_requests_total counter",
+            f'api_list_cache_requests_total{{result="hit"}} {counts["hits"]}',
+            f'api_list_cache_requests_total{{result="miss"}} {counts["misses"]}',
+        ])
+
+
+stats = CacheStats()
+
+
+class CacheVersionMixin:
+    """Read the user's cache version once per list or detail read
+
+    Stored as request.cache_version for list cache keys and ETags.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in ("list", "retrieve"):
+            request.cache_version = get_version(request.user.pk)
+
+
+class CachedListMixin(CacheVersionMixin):
+    """Serve list responses from the per-user cache"""
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = list_cache_key(request, self.basename)
+        data = cache.get(key)
+        if data is not None:
+            stats.record(hit=True)
+            return Response(data)
+
+        stats.record(hit=False)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RECIPE_CACHE.get("TIMEOUT", 300))
+        return response
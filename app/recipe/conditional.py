@@ -0,0 +1,88 @@
+"""
+Conditional GET support for recipe APIs
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from recipe.cache import CacheVersionMixin
+
+
+class ConditionalGetMixin(CacheVersionMixin):
+    """Answer repeated reads with 304 Not Modified
+
+    The ETag is derived from the per-user cache version, so a matching
+    If-None-Match is answered without touching the database.
+    """
+
+    def get_etag(self, request):
+        """Return the ETag of the current representation for the user."""
+        parts = [
+            request.cache_version,
+            request.get_full_path(),
+            request.META.get("HTTP_ACCEPT", ""),
+        ]
+        return quote_etag(hashlib.md5(":".join(parts).encode()).hexdigest())
+
+    def get_last_modified(self, request):
+        """Return the modification timestamp of the requested object."""
+        if "HTTP_IF_MODIFIED_SINCE" not in request.META:
+            return None
+        if "HTTP_IF_NONE_MATCH" in request.META:
+            return None
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        updated_at = (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        return int(updated_at.timestamp()) if updated_at else None
+
+    def _not_modified(self, request, etag, last_modified=None):
+        """Return a 304 response if the client copy is still current."""
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if response is not None:
+            response["ETag"] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        not_modified = self._not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            response["ETag"] = etag
+        return response
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """Answer repeated list and detail reads with 304 Not Modified
+
+    Only for viewsets with a retrieve action, as the mixin would add
+    one to viewsets without.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        not_modified = self._not_modified(
+            request, etag, self.get_last_modified(request),
+        )
+        if not_modified is not None:
+            return not_modified
+
+        instance = self.get_object()
+        serializer = self.get_serializer(instance)
+        response = Response(serializer.data)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(instance.updated_at.timestamp())
+        return response
@@ -0,0 +1,101 @@
+"""
+Recipe counts of tags and ingredients
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connections, router
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.cache import bump_version
+
+
+ATTRS = (
+    ("tags", Tag),
+    ("ingredients", Ingredient),
+)
+
+_unlinked_recipe_ids = ContextVar("unlinked_recipe_ids", default=frozenset())
+
+
+def recipe_count(recipe_model, field):
+    """Return an expression counting the recipes of each tag or ingredient."""
+    m2m = recipe_model._meta.get_field(field)
+    fk_name = m2m.m2m_reverse_field_name()
+    links = (
+        m2m.remote_field.through.objects.filter(**{fk_name: OuterRef("pk")})
+        .values(fk_name)
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(links), 0)
+
+
+def shift_counts(queryset, delta):
+    """Change the recipe count of the tags or ingredients by delta.
+
+    Counts stop at zero, so a count that drifted too low can't make
+    removing a recipe fail. reconcile_counts repairs drifted counts.
+    """
+    if delta:
+        queryset.update(recipe_count=Greatest(F("recipe_count") + delta, 0))
+
+
+def add_counts(model, deltas):
+    """Change recipe counts by a delta per tag or ingredient ID in one statement."""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET recipe_count = GREATEST(recipe_count + d.delta, 0) "
+            f"FROM unnest(%s::bigint[], %s::integer[]) AS d(id, delta) "
+            f"WHERE {table}.{qn(model._meta.pk.column)} = d.id",
+            [list(deltas), list(deltas.values())],
+        )
+
+
+@contextmanager
+def links_removed(recipe_ids):
+    """Mark recipes whose links were already removed and uncounted.
+
+    Deleting them inside the block doesn't touch the counts again.
+    """
+    token = _unlinked_recipe_ids.set(_unlinked_recipe_ids.get() | set(recipe_ids))
+    try:
+        yield
+    finally:
+        _unlinked_recipe_ids.reset(token)
+
+
+def has_links(recipe):
+    """Return whether the recipe may still have counted links."""
+    return recipe.pk not in _unlinked_recipe_ids.get()
+
+
+def reconcile_counts():
+    """Recount recipes of tags and ingredients whose counts drifted.
+
+    Returns the number of corrected rows per model. Owners of corrected
+    rows get their cached responses invalidated.
+    """
+    fixed = {}
+    for field, model in ATTRS:
+        stale = (
+            model.objects.annotate(actual=recipe_count(Recipe, field))
+            .exclude(recipe_count=F("actual"))
+            .values_list("pk", "user_id")
+        )
+        rows = list(stale)
+        model.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+            recipe_count=recipe_count(Recipe, field),
+        )
+        for user_id in {user_id for _, user_id in rows}:
+            bump_version(user_id)
+        fixed[model] = len(rows)
+    return fixed
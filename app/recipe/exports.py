@@ -0,0 +1,64 @@
+"""
+Streaming export of recipes
+"""
+import tempfile
+from functools import partial
+from itertools import islice
+
+from django.conf import settings
+
+from recipe.fast import ATTRS, attr_maps
+
+
+FIELDS = ["id", "title", "description", "time_minutes", "price", "link"]
+
+
+def export_rows(queryset, chunk_size=None):
+    """Yield batches of recipe rows with nested tags and ingredients.
+
+    Recipes are read through a server-side cursor and their tags and
+    ingredients fetched per batch, so memory use doesn't depend on how
+    many recipes there are.
+    """
+    chunk_size = chunk_size or settings.RECIPE_EXPORT["CHUNK_SIZE"]
+    recipes = queryset.values(*FIELDS).iterator(chunk_size=chunk_size)
+    while True:
+        batch = list(islice(recipes, chunk_size))
+        if not batch:
+            return
+        attrs = attr_maps(queryset.model, [row["id"] for row in batch])
+        for row in batch:
+            row["price"] = str(row["price"])
+            for field, _ in ATTRS:
+                row[field] = attrs[field].get(row["id"], [])
+        yield batch
+
+
+def stream(renderer, queryset, chunk_size=None):
+    """Yield the encoded export, one batch of recipes at a time."""
+    header = renderer.header(FIELDS + [field for field, _ in ATTRS])
+    if header:
+        yield header
+    for batch in export_rows(queryset, chunk_size):
+        yield renderer.render_rows(batch)
+
+
+def spool(chunks, charset, max_size=None):
+    """Write the encoded chunks to a temporary file and return it with its size.
+
+    The file is kept in memory up to max_size bytes and moved to disk
+    past that.
+    """
+    max_size = settings.RECIPE_EXPORT["SPOOL_MAX_SIZE"] if max_size is None else max_size
+    buffer = tempfile.SpooledTemporaryFile(max_size=max_size)
+    for chunk in chunks:
+        buffer.write(chunk.encode(charset))
+    size = buffer.tell()
+    buffer.seek(0)
+    return buffer, size
+
+
+def read_blocks(file, block_size=64 * 1024):
+    """Yield the contents of the file in blocks and close it."""
+    with file:
+        yield from iter(partial(file.read, block_size), b"")
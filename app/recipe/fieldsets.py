@@ -0,0 +1,64 @@
+"""
+Sparse fieldsets for recipe APIs
+"""
+from rest_framework.exceptions import ValidationError
+
+
+# Model fields read by serializer fields not named like one.
+COLUMNS = {
+    "tags": [],
+    "ingredients": [],
+    "thumbnail": ["image_derivatives"],
+    "image_derivatives": ["image_derivatives"],
+}
+ATTRS = ("tags", "ingredients")
+
+
+def _names(query_params, param):
+    """Return the comma separated names of a query parameter.
+
+    A parameter without names, e.g. `?fields=`, counts as absent.
+    """
+    value = query_params.get(param, "")
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    return names or None
+
+
+def _check(param, names, allowed):
+    """Reject names that aren't among the allowed fields."""
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise ValidationError({param: f"Unknown fields: {', '.join(unknown)}."})
+
+
+def select_fields(query_params, default, available):
+    """Return the fields selected by `fields`, `exclude` and `expand`.
+
+    Responses hold the default fields unless `fields` names the ones to
+    return. `expand` adds available fields that are not returned by
+    default and `exclude` removes fields. The result keeps the order of
+    `available`.
+    """
+    fields = _names(query_params, "fields")
+    exclude = _names(query_params, "exclude") or []
+    expand = _names(query_params, "expand") or []
+    _check("fields", fields or [], available)
+    _check("exclude", exclude, available)
+    _check("expand", expand, [name for name in available if name not in default])
+
+    selected = set(default if fields is None else fields) | set(expand)
+    selected.difference_update(exclude)
+    return [name for name in available if name in selected]
+
+
+def columns(fields):
+    """Return the model fields needed to serialize the fields."""
+    needed = {"id"}
+    for name in fields:
+        needed.update(COLUMNS.get(name, [name]))
+    return sorted(needed)
+
+
+def attrs(fields):
+    """Return the related objects to prefetch for the fields."""
+    return tuple(name for name in ATTRS if name in fields)
@@ -0,0 +1,75 @@
+"""
+Filters for recipe APIs
+"""
+from django.db.models import Count, Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from core.models import Recipe
+from recipe.search import search
+
+
+class RecipeAttrFilterBackend(BaseFilterBackend):
+    """Filter recipes by tag and ingredient IDs using semi-joins
+
+    `?tags=1,2` matches recipes having any of the tags. Adding
+    `tags_match=all` only matches recipes having all of them. The same
+    applies to `ingredients` and `ingredients_match`.
+    """
+    attrs = {
+        "tags": "tag_id",
+        "ingredients": "ingredient_id",
+    }
+
+    def _params_to_ints(self, param, value):
+        """Convert a comma separated list of IDs to a set of integers."""
+        try:
+            return {int(str_id) for str_id in value.split(",")}
+        except ValueError:
+            raise ValidationError({param: "Expected a comma separated list of IDs."})
+
+    def _match_all(self, request, param):
+        """Return whether all IDs must match for the parameter."""
+        match = request.query_params.get(f"{param}_match", "any")
+        if match not in ("any", "all"):
+            raise ValidationError({f"{param}_match": "Expected 'any' or 'all'."})
+        return match == "all"
+
+    def filter_queryset(self, request, queryset, view):
+        for param, fk_name in self.attrs.items():
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            ids = self._params_to_ints(param, value)
+            through = getattr(Recipe, param).through.objects.filter(
+                **{f"{fk_name}__in": ids}
+            )
+            if self._match_all(request, param):
+                matching = (
+                    through.values("recipe_id")
+                    .annotate(matched=Count(fk_name))
+                    .filter(matched=len(ids))
+                    .values("recipe_id")
+                )
+                queryset = queryset.filter(id__in=matching)
+            else:
+                queryset = queryset.filter(
+                    Exists(through.filter(recipe_id=OuterRef("pk")))
+                )
+        return queryset
+
+
+class RecipeSearchFilterBackend(BaseFilterBackend):
+    """Full-text search over recipe titles, descriptions, tags and ingredients
+
+    `?search=` accepts web search syntax: quoted phrases, `or` and `-word`
+    to exclude. Matches are annotated with a `rank` that pagination uses
+    to order results by relevance.
+    """
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, "").strip()
+        if not text:
+            return queryset
+        return search(queryset, text)
@@ -0,0 +1,201 @@
+"""
+Image derivative pipeline for recipe images
+"""
+import io
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image
+
+from core.models import ImageJob, Recipe
+
+
+EXTENSIONS = {"jpeg": "jpg", "webp": "webp"}
+
+
+def _config():
+    """Return the image pipeline settings."""
+    return settings.RECIPE_IMAGES
+
+
+def _formats():
+    """Return the configured formats Pillow can write."""
+    Image.init()
+    return [fmt for fmt in _config()["FORMATS"] if fmt.upper() in Image.SAVE]
+
+
+def _encode(img, fmt, width):
+    """Resize an image to width and encode it in the given format."""
+    resized = img.copy()
+    target = min(width, img.width)
+    resized.thumbnail((target, max(round(img.height * target / img.width), 1)))
+    if fmt == "jpeg" and resized.mode != "RGB":
+        resized = resized.convert("RGB")
+    buffer = io.BytesIO()
+    resized.save(buffer, format=fmt.upper(), quality=_config()["QUALITY"])
+    return ContentFile(buffer.getvalue())
+
+
+def generate_derivatives(recipe, replaced=None):
+    """Write resized copies of the recipe image and record their names.
+
+    Files of the recipe's previous derivatives and the replaced ones are
+    removed afterwards.
+    """
+    storage = recipe.image.storage
+    old = [recipe.image_derivatives, replaced]
+    derivatives = {}
+    if recipe.image:
+        base = os.path.splitext(recipe.image.name)[0]
+        with recipe.image.open("rb") as image_file, Image.open(image_file) as img:
+            img.load()
+            for fmt in _formats():
+                derivatives[fmt] = {
+                    str(width): storage.save(
+                        f"{base}-{width}.{EXTENSIONS.get(fmt, fmt)}",
+                        _encode(img, fmt, width),
+                    )
+                    for width in _config()["WIDTHS"]
+                }
+
+    recipe.image_derivatives = derivatives
+    recipe.save(update_fields=["image_derivatives", "updated_at"])
+
+    for names in old:
+        delete_files(names)
+
+
+def delete_files(derivatives):
+    """Remove the files of derivatives by format and width."""
+    storage = Recipe._meta.get_field("image").storage
+    for names in (derivatives or {}).values():
+        for name in names.values():
+            storage.delete(name)
+
+
+def delete_derivatives(recipe):
+    """Remove derivative files of the recipe image."""
+    delete_files(recipe.image_derivatives)
+
+
+def derivative_urls(recipe, request=None):
+    """Return derivative URLs by format and width."""
+    return _urls(recipe.image_derivatives, request)
+
+
+def _urls(derivatives, request=None):
+    """Return URLs of the derivative names by format and width."""
+    storage = Recipe._meta.get_field("image").storage
+    urls = {}
+    for fmt, names in (derivatives or {}).items():
+        urls[fmt] = {}
+        for width, name in names.items():
+            url = storage.url(name)
+            urls[fmt][width] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+def thumbnail_url(recipe, request=None):
+    """Return the URL of the smallest derivative in the preferred format."""
+    return smallest_url(recipe.image_derivatives, request)
+
+
+def smallest_url(derivatives, request=None):
+    """Return the URL of the smallest of the derivatives in the preferred format."""
+    if not derivatives:
+        return None
+    urls = _urls(derivatives, request)
+    for fmt in _config()["FORMATS"]:
+        if urls.get(fmt):
+            return urls[fmt][min(urls[fmt], key=int)]
+    return None
+
+
+def run_job(job):
+    """Process a claimed job and record the outcome."""
+    try:
+        generate_derivatives(job.recipe, job.replaced_derivatives)
+    except Exception as exc:
+        failed = job.attempts >= _config()["MAX_ATTEMPTS"]
+        job.status = ImageJob.Status.FAILED if failed else ImageJob.Status.PENDING
+        job.error = str(exc)
+    else:
+        job.status = ImageJob.Status.DONE
+        job.error = ""
+        job.replaced_derivatives = {}
+    # The recipe, and with it the job, may have been deleted meanwhile.
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=job.status,
+        error=job.error,
+        replaced_derivatives=job.replaced_derivatives,
+        updated_at=timezone.now(),
+    )
+
+
+def _stale(now):
+    """Return a filter for running jobs whose worker stopped responding."""
+    limit = now - timedelta(seconds=_config()["STALE_SECONDS"])
+    return Q(status=ImageJob.Status.RUNNING, updated_at__lt=limit)
+
+
+def claim_jobs(limit):
+    """Mark up to limit pending jobs as running and return them.
+
+    Jobs left running for longer than STALE_SECONDS, such as those of a
+    worker that was killed, are claimed again until they run out of
+    attempts.
+    """
+    now = timezone.now()
+    max_attempts = _config()["MAX_ATTEMPTS"]
+    with transaction.atomic():
+        ImageJob.objects.filter(_stale(now), attempts__gte=max_attempts).update(
+            status=ImageJob.Status.FAILED,
+            error="Timed out while running.",
+            updated_at=now,
+        )
+        jobs = list(
+            ImageJob.objects.select_for_update(skip_locked=True, of=("self",))
+            .select_related("recipe")
+            .filter(Q(status=ImageJob.Status.PENDING) | _stale(now))
+            .order_by("id")[:limit]
+        )
+        ImageJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            status=ImageJob.Status.RUNNING,
+            attempts=F("attempts") + 1,
+            updated_at=now,
+        )
+    for job in jobs:
+        job.attempts += 1
+    return jobs
+
+
+def process_pending(limit=10):
+    """Process up to limit pending jobs and return how many ran."""
+    jobs = claim_jobs(limit)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+def enqueue_derivatives(recipe):
+    """Queue derivative generation for the recipe image.
+
+    Derivatives of the previous image move from the recipe to the job, so
+    the recipe never lists thumbnails of another picture.
+    """
+    job = ImageJob.objects.create(
+        recipe=recipe, replaced_derivatives=recipe.image_derivatives or {},
+    )
+    if recipe.image_derivatives:
+        recipe.image_derivatives = {}
+        recipe.save(update_fields=["image_derivatives", "updated_at"])
+    if _config()["PIPELINE"] == "sync":
+        job.status = ImageJob.Status.RUNNING
+        job.attempts = 1
+        run_job(job)
+    return job
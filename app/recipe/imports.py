@@ -0,0 +1,54 @@
+"""
+Bulk import of recipes
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from recipe.bulk import create_recipes
+from recipe.cache import bump_version
+from recipe.parsers import InvalidRow
+
+
+def _config():
+    """Return the import settings."""
+    return settings.RECIPE_IMPORT
+
+
+def _validate(serializer, batch):
+    """Validate a batch of rows, returning valid data and row errors."""
+    valid, errors = [], []
+    for number, row in batch:
+        if isinstance(row, InvalidRow):
+            errors.append({"row": number, "errors": {"non_field_errors": [row.error]}})
+            continue
+        try:
+            valid.append(serializer.run_validation(row))
+        except ValidationError as exc:
+            errors.append({"row": number, "errors": exc.detail})
+    return valid, errors
+
+
+def import_recipes(rows, serializer, user):
+    """Validate and insert rows in batches, each in its own transaction.
+
+    Returns how many recipes were created and the errors of rejected rows,
+    numbered from 1 in input order.
+    """
+    config = _config()
+    report = {"created": 0, "failed": 0, "errors": []}
+    numbered = enumerate(rows, start=1)
+    while True:
+        batch = list(islice(numbered, config["BATCH_SIZE"]))
+        if not batch:
+            return report
+
+        valid, errors = _validate(serializer, batch)
+        if valid:
+            with transaction.atomic():
+                report["created"] += len(create_recipes(serializer, user, valid))
+                bump_version(user.pk)
+        report["failed"] += len(errors)
+        report["errors"] += errors[:config["MAX_ERRORS"] - len(report["errors"])]
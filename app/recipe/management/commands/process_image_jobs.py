@@ -0,0 +1,33 @@
+'''
+Django command to process queued recipe image jobs.
+'''
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipe.images import process_pending
+
+
+class Command(BaseCommand):
+    '''Django command to generate recipe image derivatives.'''
+    help = "Work through pending image jobs, polling for new ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=10)
+        parser.add_argument("--sleep", type=float, default=1.0)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once no pending jobs are left.",
+        )
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        while True:
+            processed = process_pending(options["batch"])
+            if processed:
+                self.stdout.write(f"Processed {processed} image jobs")
+            elif options["once"]:
+                break
+            else:
+                time.sleep(options["sleep"])
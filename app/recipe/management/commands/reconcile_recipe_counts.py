@@ -0,0 +1,19 @@
+'''
+Django command to rebuild the recipe counts of tags and ingredients.
+'''
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipe.counters import reconcile_counts
+
+
+class Command(BaseCommand):
+    '''Django command to correct drifted recipe counts.'''
+    help = "Recount the recipes of tags and ingredients and fix wrong counts."
+
+    def handle(self, *args, **options):
+        '''Entrypoint for command'''
+        with transaction.atomic():
+            fixed = reconcile_counts()
+        for model, count in fixed.items():
+            self.stdout.write(f"Fixed {count} {model._meta.verbose_name_plural}")
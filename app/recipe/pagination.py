@@ -0,0 +1,137 @@
+"""
+Pagination for recipe APIs
+"""
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import CursorPagination, _reverse_ordering
+
+
+class KeysetCursorPagination(CursorPagination):
+    """Cursor pagination positioned on every ordering field
+
+    DRF only filters on the first ordering field and skips rows tied on
+    it with an OFFSET, which gets slower the more rows share a value.
+    Positions here hold the values of all ordering fields, which together
+    must be unique, so every page starts right after the previous one.
+    """
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for order in ordering:
+            field_name = order.lstrip("-")
+            if isinstance(instance, dict):
+                values.append(instance[field_name])
+            else:
+                values.append(getattr(instance, field_name))
+        return json.dumps(values)
+
+    def _position_filter(self, position, reverse):
+        """Return a filter for the rows following the position."""
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        condition, equal = Q(), {}
+        for order, value in zip(self.ordering, values):
+            field_name = order.lstrip("-")
+            # Test for: (cursor reversed) XOR (field descending)
+            lookup = "lt" if reverse != order.startswith("-") else "gt"
+            condition |= Q(**equal, **{f"{field_name}__{lookup}": value})
+            equal[field_name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            (offset, reverse, current_position) = (0, False, None)
+        else:
+            (offset, reverse, current_position) = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self._position_filter(current_position, reverse))
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # Positions are unique, so offsets only come from hand-made cursors.
+        results = list(queryset[offset:offset + self.page_size + 1])
+        self.page = list(results[:self.page_size])
+
+        if len(results) > len(self.page):
+            has_following_position = True
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+        else:
+            has_following_position = False
+            following_position = None
+
+        if reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = (current_position is not None) or (offset > 0)
+            self.has_previous = has_following_position
+            if self.has_next:
+                self.next_position = current_position
+            if self.has_previous:
+                self.previous_position = following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = (current_position is not None) or (offset > 0)
+            if self.has_next:
+                self.next_position = following_position
+            if self.has_previous:
+                self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+
+class RecipeCursorPagination(KeysetCursorPagination):
+    """Keyset pagination for Recipes, newest first"""
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = "-id"
+
+    def get_ordering(self, request, queryset, view):
+        """Order search results by relevance, newest first among ties."""
+        if "rank" in queryset.query.annotations:
+            return ("-rank", "-id")
+        return super().get_ordering(request, queryset, view)
+
+
+class RecipeAttrCursorPagination(RecipeCursorPagination):
+    """Keyset pagination for Tags and Ingredients, ordered by name
+
+    Names are unique per user, so they break ties in recipe counts.
+    """
+    ordering = "-name"
+    ordering_param = "ordering"
+
+    def get_ordering(self, request, queryset, view):
+        """Order by number of recipes when asked to, by name among ties."""
+        ordering = request.query_params.get(self.ordering_param, self.ordering)
+        if ordering == "-recipe_count":
+            return ("-recipe_count", "-name")
+        if ordering != self.ordering:
+            raise ValidationError(
+                {self.ordering_param: "Expected '-name' or '-recipe_count'."}
+            )
+        return (self.ordering,)
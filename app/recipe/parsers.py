@@ -0,0 +1,85 @@
+"""
+Streaming parsers for bulk recipe imports
+"""
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+
+# Separates tag and ingredient names inside a CSV cell.
+CSV_LIST_SEPARATOR = ";"
+CSV_LIST_FIELDS = ("tags", "ingredients")
+
+
+class InvalidRow:
+    """Placeholder for a record that could not be decoded"""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class NDJSONParser(BaseParser):
+    """Parse newline delimited JSON lazily, one recipe per line
+
+    The parsed data is a generator, so the body is read as rows are
+    consumed instead of being loaded into memory up front.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        return self._rows(stream, encoding)
+
+    def _rows(self, stream, encoding):
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line.decode(encoding))
+            except ValueError as exc:
+                yield InvalidRow(f"Invalid JSON: {exc}")
+
+
+class CSVParser(BaseParser):
+    """Parse CSV with a header row lazily, one recipe per record
+
+    Empty cells are left out so model defaults apply, and the `tags` and
+    `ingredients` columns hold names separated by semicolons.
+    """
+    media_type = "text/csv"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        return self._rows(stream, encoding)
+
+    def _rows(self, stream, encoding):
+        reader = csv.DictReader(line.decode(encoding) for line in stream)
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except UnicodeDecodeError as exc:
+                # The reader can't resume after its input failed.
+                yield InvalidRow(f"Invalid CSV: {exc}. Remaining rows were skipped.")
+                return
+            except csv.Error as exc:
+                yield InvalidRow(f"Invalid CSV: {exc}")
+                continue
+            if None in record:
+                yield InvalidRow("Invalid CSV: more values than columns.")
+                continue
+
+            row = {key: value for key, value in record.items() if value}
+            for field in CSV_LIST_FIELDS:
+                if field in row:
+                    row[field] = [
+                        {"name": name.strip()}
+                        for name in row[field].split(CSV_LIST_SEPARATOR)
+                        if name.strip()
+                    ]
+            yield row
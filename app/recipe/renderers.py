@@ -0,0 +1,68 @@
+"""
+Renderers for recipe exports
+"""
+import csv
+import io
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+from recipe.parsers import CSV_LIST_FIELDS, CSV_LIST_SEPARATOR
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render rows as newline delimited JSON"""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def header(self, fields):
+        """NDJSON has no header."""
+        return ""
+
+    def render_rows(self, rows):
+        """Encode a batch of rows."""
+        return "".join(json.dumps(row) + "\n" for row in rows)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return self.render_rows(rows).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """Render rows as CSV in the layout the import accepts
+
+    Tag and ingredient names are joined with semicolons.
+    """
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def header(self, fields):
+        """Encode the header row."""
+        return self._write([fields])
+
+    def render_rows(self, rows):
+        """Encode a batch of rows without header."""
+        return self._write(
+            [self._flatten(row).values() for row in rows]
+        )
+
+    def _flatten(self, row):
+        """Join nested names into a single cell."""
+        row = dict(row)
+        for field in CSV_LIST_FIELDS:
+            if field in row:
+                row[field] = CSV_LIST_SEPARATOR.join(item["name"] for item in row[field])
+        return row
+
+    def _write(self, rows):
+        out = io.StringIO()
+        csv.writer(out).writerows(rows)
+        return out.getvalue()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        if not rows:
+            return b""
+        return (self.header(rows[0].keys()) + self.render_rows(rows)).encode(self.charset)
@@ -0,0 +1,25 @@
+"""
+Replica reads for recipe APIs
+"""
+from rest_framework.permissions import SAFE_METHODS
+
+from core.routers import is_sticky, replica_reads, start_replica_reads
+
+
+class ReplicaReadMixin:
+    """Serve safe requests from replicas unless the user just wrote
+
+    Writes mark their user sticky through recipe.cache.bump_version, so
+    users read their own writes from the primary until replicas caught up.
+    Authentication runs before the choice is made and always reads from
+    the primary.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in SAFE_METHODS and not is_sticky(request.user.pk):
+            start_replica_reads()
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(False):
+            return super().dispatch(request, *args, **kwargs)
@@ -0,0 +1,122 @@
+"""
+Full-text search for recipes
+"""
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, router
+from django.db.models import (
+    F,
+    FloatField,
+    OuterRef,
+    Subquery,
+    TextField,
+    Value,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Coalesce
+from django.db.models.sql import UpdateQuery
+
+
+def _config():
+    """Return the text search configuration name."""
+    return settings.RECIPE_SEARCH["CONFIG"]
+
+
+def _names(recipe_model, field):
+    """Subquery joining the names of a recipe's tags or ingredients."""
+    m2m = recipe_model._meta.get_field(field)
+    target = m2m.m2m_reverse_field_name()
+    return Coalesce(
+        Subquery(
+            m2m.remote_field.through.objects.filter(recipe=OuterRef("pk"))
+            .values("recipe")
+            .annotate(names=StringAgg(f"{target}__name", delimiter=" "))
+            .values("names")
+        ),
+        Value(""),
+    )
+
+
+def _weighted(title, tags, ingredients, description):
+    """Combine the searchable texts of a recipe, most relevant first."""
+    config = _config()
+    return (
+        SearchVector(title, weight="A", config=config)
+        + SearchVector(tags, weight="B", config=config)
+        + SearchVector(ingredients, weight="C", config=config)
+        + SearchVector(description, weight="D", config=config)
+    )
+
+
+def search_vector():
+    """Expression computing a recipe's weighted search vector in the database.
+
+    Title ranks above tag names, which rank above ingredient names and the
+    description.
+    """
+    from core.models import Recipe
+
+    return _weighted(
+        "title",
+        _names(Recipe, "tags"),
+        _names(Recipe, "ingredients"),
+        "description",
+    )
+
+
+def update_search_vectors(queryset):
+    """Recompute the search vector of every recipe in the queryset."""
+    return queryset.update(search_vector=search_vector())
+
+
+def set_search_vectors(names):
+    """Set the vectors of recipes from tag and ingredient names known up front.
+
+    names maps recipe IDs to (tag names, ingredient names). Unlike
+    update_search_vectors this needs no correlated subqueries, whose plans
+    degrade while the tables grow faster than their statistics, as they do
+    during a bulk import.
+    """
+    from core.models import Recipe
+
+    if not names:
+        return
+    using = router.db_for_write(Recipe)
+    connection = connections[using]
+    query = UpdateQuery(Recipe)
+    compiler = query.get_compiler(using)
+    expression = _weighted(
+        F("title"),
+        RawSQL("t.tags", [], output_field=TextField()),
+        RawSQL("t.ingredients", [], output_field=TextField()),
+        F("description"),
+    ).resolve_expression(query, allow_joins=False, for_save=True)
+    sql, params = compiler.compile(expression)
+
+    qn = connection.ops.quote_name
+    table = qn(Recipe._meta.db_table)
+    pk = qn(Recipe._meta.pk.column)
+    ids = list(names)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET {qn('search_vector')} = {sql} "
+            f"FROM unnest(%s::{Recipe._meta.pk.rel_db_type(connection)}[], "
+            f"%s::text[], %s::text[]) AS t(id, tags, ingredients) "
+            f"WHERE {table}.{pk} = t.id",
+            [
+                *params,
+                ids,
+                [" ".join(names[recipe_id][0]) for recipe_id in ids],
+                [" ".join(names[recipe_id][1]) for recipe_id in ids],
+            ],
+        )
+
+
+def search(queryset, text):
+    """Filter recipes matching text and annotate them with a rank."""
+    query = SearchQuery(text, search_type="websearch", config=_config())
+    # Ranks are cast to double precision so cursor positions round-trip.
+    return queryset.filter(search_vector=query).annotate(
+        rank=Cast(SearchRank(F("search_vector"), query), FloatField()),
+    )
@@ -1,12 +1,36 @@
 """
 Serializer for recipe APIs
 """
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 
+from core.metrics import ProfiledSerializerMixin
 from core.models import Recipe, Tag, Ingredient
-
-
-class IngredientSerializer(serializers.ModelSerializer):
+from recipe.fast import attr_maps
+from recipe.images import derivative_urls, smallest_url, thumbnail_url
+
+
+class UniqueNameMixin:
+    """Reject renaming an object to a name the user already uses"""
+
+    def validate_name(self, value):
+        """Check the name is unique for the owner of the instance"""
+        if self.instance is not None:
+            duplicate = type(self.instance).objects.filter(
+                user=self.instance.user_id,
+                name=value,
+            ).exclude(pk=self.instance.pk)
+            if duplicate.exists():
+                raise serializers.ValidationError(
+                    "An entry with this name already exists."
+                )
+        return value
+
+
+class IngredientSerializer(ProfiledSerializerMixin,
+                           UniqueNameMixin,
+                           serializers.ModelSerializer):
     """Serializer for Ingredients"""
 
     class Meta:
@@ -15,7 +39,7 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ["id"]
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(ProfiledSerializerMixin, UniqueNameMixin, serializers.ModelSerializer):
     """Serializer for Tags"""
 
     class Meta:
@@ -24,58 +48,104 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ["id",]
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Limit the fields to those named by the `fields` argument"""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class IngredientDetailSerializer(IngredientSerializer):
+    """Serializer for ingredient views, with the number of recipes"""
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ["recipe_count"]
+        read_only_fields = ["id", "recipe_count"]
+
+
+class TagDetailSerializer(TagSerializer):
+    """Serializer for tag views, with the number of recipes"""
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ["recipe_count"]
+        read_only_fields = ["id", "recipe_count"]
+
+
+class RecipeSerializer(ProfiledSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for Recipes"""
 
     tags = TagSerializer(many=True, required=False)
     ingredients = IngredientSerializer(many=True, required=False)
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
-        fields = ["id", "title", "time_minutes", "price", "link", "tags", "ingredients"]
+        fields = [
+            "id", "title", "time_minutes", "price", "link", "tags", "ingredients", "thumbnail",
+        ]
         read_only_fields = ["id"]
 
-    def _get_or_create_tags(self, tags, recipe):
-        """Handle getting or creating Tags as needed"""
-        auth_user = self.context["request"].user
+    def get_thumbnail(self, recipe) -> str:
+        """Return the URL of the smallest image derivative"""
+        return thumbnail_url(recipe, self.context.get("request"))
 
-        for tag in tags:
-            tag_obj, created = Tag.objects.get_or_create(
-                user=auth_user,
-                **tag,
+    def _resolve_attrs(self, model, items):
+        """Fetch or create the named objects for the user in bulk"""
+        auth_user = self.context["request"].user
+        names = list(dict.fromkeys(item["name"] for item in items))
+        if not names:
+            return []
+
+        objs = {
+            obj.name: obj
+            for obj in model.objects.filter(user=auth_user, name__in=names)
+        }
+        missing = [name for name in names if name not in objs]
+        if missing:
+            # Rows created concurrently are skipped by the unique constraint
+            # and picked up by the second lookup.
+            model.objects.bulk_create(
+                [model(user=auth_user, name=name) for name in missing],
+                ignore_conflicts=True,
             )
-            recipe.tags.add(tag_obj)
+            objs.update(
+                (obj.name, obj)
+                for obj in model.objects.filter(user=auth_user, name__in=missing)
+            )
+        return [objs[name] for name in names]
 
-    def _get_or_create_ingredient(self, ingredients: dict, recipe: Recipe):
-        """handle getting or creating Tags as needed"""
-        auth_user = self.context["request"].user
+    def _get_or_create_tags(self, tags, recipe):
+        """Handle getting or creating Tags as needed"""
+        recipe.tags.set(self._resolve_attrs(Tag, tags))
 
-        for ingredient in ingredients:
-            ingredient_obj, created = Ingredient.objects.get_or_create(
-                user=auth_user,
-                **ingredient,
-            )
-            recipe.ingredients.add(ingredient_obj)
+    def _get_or_create_ingredient(self, ingredients: dict, recipe: Recipe):
+        """Handle getting or creating Ingredients as needed"""
+        recipe.ingredients.set(self._resolve_attrs(Ingredient, ingredients))
 
+    @transaction.atomic
     def create(self, validated_data: dict):
         """Create recipe"""
-        print(">>> CREATE called with validated_data:", validated_data)
         tags = validated_data.pop("tags", [])
         ingredients = validated_data.pop("ingredients", [])
         recipe = Recipe.objects.create(**validated_data)
-        self._get_or_create_tags(tags, recipe)
-        self._get_or_create_ingredient(ingredients, recipe)
+        if tags:
+            self._get_or_create_tags(tags, recipe)
+        if ingredients:
+            self._get_or_create_ingredient(ingredients, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance: Recipe, validated_data: dict):
         tags = validated_data.pop("tags", None)
         ingredients = validated_data.pop("ingredients", None)
         if tags is not None:
-            instance.tags.clear()
             self._get_or_create_tags(tags, instance)
 
         if ingredients is not None:
-            instance.ingredients.clear()
             self._get_or_create_ingredient(ingredients, instance)
 
         for attr, value in validated_data.items():
@@ -85,18 +155,94 @@ class RecipeSerializer(serializers.ModelSerializer):
         return instance
 
 
-class RecipeDetailSerializer(RecipeSerializer):
+class FastRecipeListSerializer(ProfiledSerializerMixin, serializers.ListSerializer):
+    """Serialize rows of `recipe.fast.recipe_rows()` without field machinery
+
+    The output is the same as `RecipeSerializer(many=True)` gives for the
+    recipes, with tags and ingredients fetched for the whole page at once.
+    """
+
+    def to_representation(self, data):
+        rows = list(data)
+        attrs = attr_maps(Recipe, [row["id"] for row in rows])
+        tags, ingredients = attrs["tags"], attrs["ingredients"]
+        price = self.child.fields["price"].to_representation
+        request = self.context.get("request")
+        return [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "time_minutes": row["time_minutes"],
+                "price": price(row["price"]),
+                "link": row["link"],
+                "tags": tags.get(row["id"], []),
+                "ingredients": ingredients.get(row["id"], []),
+                "thumbnail": smallest_url(row["image_derivatives"], request),
+            }
+            for row in rows
+        ]
+
+
+class FastRecipeSerializer(RecipeSerializer):
+    """Serializer for recipe lists read as plain rows"""
+
+    class Meta(RecipeSerializer.Meta):
+        list_serializer_class = FastRecipeListSerializer
+
+
+class ImageDerivativesMixin(serializers.Serializer):
+    """Expose URLs of resized recipe images"""
+
+    image_derivatives = serializers.SerializerMethodField()
+
+    def get_image_derivatives(self, recipe) -> dict:
+        """Return derivative URLs by format and width"""
+        return derivative_urls(recipe, self.context.get("request"))
+
+
+class RecipeDetailSerializer(ImageDerivativesMixin, RecipeSerializer):
     """Serializer for recipe detail view"""
 
     class Meta(RecipeSerializer.Meta):
-        fields = RecipeSerializer.Meta.fields + ["description", "image"]
+        fields = RecipeSerializer.Meta.fields + ["description", "image", "image_derivatives"]
 
 
-class RecipeImageSerializer(serializers.ModelSerializer):
+class RecipeImageSerializer(ProfiledSerializerMixin,
+                            ImageDerivativesMixin,
+                            serializers.ModelSerializer):
     """Serializer for uploading images to recipes"""
 
     class Meta:
         model = Recipe
-        fields = ["id", "image"]
+        fields = ["id", "image", "image_derivatives"]
         read_only_fields = ["id"]
         extra_kwargs = {"image": {"required": True}}
+
+
+class RecipeBatchOperationSerializer(serializers.Serializer):
+    """Serializer for one operation of a recipe batch"""
+
+    op = serializers.ChoiceField(choices=["create", "update", "delete"])
+    id = serializers.IntegerField(required=False)
+    data = serializers.DictField(required=False, default=dict)
+
+    def validate(self, attrs):
+        """Require the recipe ID for updates and deletes"""
+        if attrs["op"] != "create" and "id" not in attrs:
+            raise serializers.ValidationError({"id": "This field is required."})
+        return attrs
+
+
+class RecipeBatchSerializer(serializers.Serializer):
+    """Serializer for a batch of recipe operations"""
+
+    operations = RecipeBatchOperationSerializer(many=True, allow_empty=False)
+
+    def validate_operations(self, value):
+        """Limit the number of operations per batch"""
+        limit = settings.RECIPE_BATCH["MAX_OPERATIONS"]
+        if len(value) > limit:
+            raise serializers.ValidationError(
+                f"Ensure this field has no more than {limit} operations."
+            )
+        return value
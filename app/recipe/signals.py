@@ -0,0 +1,152 @@
+"""
+Signal handlers for recipe APIs
+"""
+from django.db.models.signals import (
+    post_save,
+    post_delete,
+    pre_delete,
+    m2m_changed,
+)
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import ImageJob, Recipe, Tag, Ingredient
+from recipe.cache import bump_version
+from recipe.counters import ATTRS, has_links, shift_counts
+from recipe.images import delete_derivatives, delete_files
+from recipe.search import search_vector, update_search_vectors
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_on_write(sender, instance, **kwargs):
+    """Invalidate cached responses of the owner"""
+    bump_version(instance.user_id)
+
+
+def _touch(queryset):
+    """Bump updated_at and recompute the search vector of recipes."""
+    queryset.update(updated_at=timezone.now(), search_vector=search_vector())
+
+
+@receiver(post_save, sender=Recipe)
+def update_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Recompute the search vector when searchable recipe text changes"""
+    if update_fields is not None and not {"title", "description"} & set(update_fields):
+        return
+    update_search_vectors(Recipe.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def invalidate_on_m2m_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate cached responses when tags or ingredients change"""
+    field = "tags" if sender is Recipe.tags.through else "ingredients"
+    if reverse and action == "pre_clear":
+        # The affected recipes are only known before the rows are removed.
+        instance._cleared_recipe_ids = list(
+            Recipe.objects.filter(**{field: instance}).values_list("pk", flat=True)
+        )
+        return
+    if not action.startswith("post_"):
+        return
+
+    if not reverse:
+        _touch(Recipe.objects.filter(pk=instance.pk))
+    elif action == "post_clear":
+        recipe_ids = instance.__dict__.pop("_cleared_recipe_ids", [])
+        _touch(Recipe.objects.filter(pk__in=recipe_ids))
+    elif pk_set:
+        _touch(Recipe.objects.filter(pk__in=pk_set))
+    bump_version(instance.user_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+def touch_recipes_on_attr_change(sender, instance, created=False, **kwargs):
+    """Mark recipes as modified when one of their tags or ingredients is"""
+    if created:
+        return
+    field = "tags" if sender is Tag else "ingredients"
+    _touch(Recipe.objects.filter(**{field: instance}))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+def collect_recipes_on_attr_delete(sender, instance, **kwargs):
+    """Remember the recipes of a tag or ingredient about to be deleted"""
+    field = "tags" if sender is Tag else "ingredients"
+    instance._deleted_recipe_ids = list(
+        Recipe.objects.filter(**{field: instance}).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+def touch_recipes_on_attr_delete(sender, instance, **kwargs):
+    """Mark recipes as modified once a tag or ingredient is gone"""
+    recipe_ids = instance.__dict__.pop("_deleted_recipe_ids", [])
+    _touch(Recipe.objects.filter(pk__in=recipe_ids))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def count_recipes_on_m2m_change(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Keep the recipe counts of tags and ingredients up to date"""
+    is_tags = sender is Recipe.tags.through
+    fk_name = "tag" if is_tags else "ingredient"
+    attr_model = Tag if is_tags else Ingredient
+    source, target = (fk_name, "recipe") if reverse else ("recipe", fk_name)
+    stash = f"_unlinked_{fk_name}_{target}_ids"
+
+    if action in ("pre_remove", "pre_clear"):
+        # Only links that exist are removed, so they are looked up first.
+        links = sender.objects.filter(**{source: instance})
+        if pk_set is not None:
+            links = links.filter(**{f"{target}_id__in": pk_set})
+        instance.__dict__[stash] = list(links.values_list(f"{target}_id", flat=True))
+        return
+    if action == "post_add":
+        ids, delta = pk_set, 1
+    elif action in ("post_remove", "post_clear"):
+        ids, delta = instance.__dict__.pop(stash, []), -1
+    else:
+        return
+
+    if not ids:
+        return
+    if reverse:
+        shift_counts(attr_model.objects.filter(pk=instance.pk), delta * len(ids))
+    else:
+        shift_counts(attr_model.objects.filter(pk__in=ids), delta)
+
+
+@receiver(pre_delete, sender=Recipe)
+def uncount_deleted_recipe(sender, instance, **kwargs):
+    """Decrement the recipe counts of the tags and ingredients of a recipe
+
+    Bulk deletes remove and uncount the links of all recipes beforehand.
+    """
+    if not has_links(instance):
+        return
+    for field, model in ATTRS:
+        shift_counts(model.objects.filter(recipe=instance), -1)
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_image_derivatives(sender, instance, **kwargs):
+    """Remove derivative files once the recipe is deleted for good"""
+    if instance.image_derivatives:
+        transaction.on_commit(lambda: delete_derivatives(instance))
+
+
+@receiver(post_delete, sender=ImageJob)
+def delete_replaced_derivatives(sender, instance, **kwargs):
+    """Remove derivative files a deleted job didn't get to replace"""
+    if instance.replaced_derivatives:
+        transaction.on_commit(lambda: delete_files(instance.replaced_derivatives))
@@ -0,0 +1,182 @@
+"""
+Tests for async read paths of recipe APIs.
+"""
+import asyncio
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.models import Recipe, Tag
+from recipe.views import RecipeViewset, TagViewset
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+EXPORT_URL = reverse("recipe:recipe-export")
+ASYNC_READS = {"READS": True, "THREADS": 2}
+
+
+# Reads run on other threads with their own connections, which only see
+# committed rows.
+@override_settings(RECIPE_ASYNC=ASYNC_READS)
+class AsyncReadTests(TransactionTestCase):
+    """Test viewsets serve reads from async views"""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user, title="Curry", time_minutes=10, price=Decimal("5.50"),
+        )
+        return super().setUp()
+
+    def _call(self, view, request, **kwargs):
+        """Authenticate the request and run the async view to completion"""
+        force_authenticate(request, self.user)
+        return async_to_sync(view)(request, **kwargs)
+
+    @override_settings(RECIPE_ASYNC={"READS": False})
+    def test_sync_view_when_disabled(self):
+        """Test viewsets keep sync views unless async reads are enabled"""
+        view = RecipeViewset.as_view({"get": "list"})
+
+        self.assertFalse(asyncio.iscoroutinefunction(view))
+
+    def test_list_on_read_pool(self):
+        """Test lists run and render on the read pool"""
+        view = RecipeViewset.as_view({"get": "list", "post": "create"})
+        threads = []
+        get_queryset = RecipeViewset.get_queryset
+
+        def record(viewset):
+            threads.append(threading.current_thread().name)
+            return get_queryset(viewset)
+
+        with mock.patch.object(RecipeViewset, "get_queryset", autospec=True, side_effect=record):
+            res = self._call(view, self.factory.get(RECIPE_URL))
+
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        self.assertIs(view.cls, RecipeViewset)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_rendered)
+        self.assertEqual(res.data["results"][0]["title"], "Curry")
+        self.assertTrue(threads[0].startswith("recipe-read"))
+
+    def test_retrieve(self):
+        """Test detail reads return the recipe"""
+        view = RecipeViewset.as_view({"get": "retrieve"})
+        url = reverse("recipe:recipe-detail", args=[self.recipe.id])
+
+        res = self._call(view, self.factory.get(url), pk=self.recipe.id)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["id"], self.recipe.id)
+
+    def test_attr_list(self):
+        """Test tag lists are served too"""
+        Tag.objects.create(user=self.user, name="Dinner")
+        view = TagViewset.as_view({"get": "list"})
+
+        res = self._call(view, self.factory.get(reverse("recipe:tag-list")))
+
+        self.assertEqual([tag["name"] for tag in res.data["results"]], ["Dinner"])
+
+    def test_writes_stay_sync(self):
+        """Test writes through the async view still work"""
+        view = RecipeViewset.as_view({"get": "list", "post": "create"})
+
+        res = self._call(view, self.factory.post(
+            RECIPE_URL,
+            {"title": "Soup", "time_minutes": 5, "price": "2.00"},
+            format="json",
+        ))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Recipe.objects.filter(title="Soup").exists())
+
+
+def asgi_get(path, query="", headers=()):
+    """Send a GET request through the ASGI handler and return the messages it sent"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), *headers],
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 0),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    async_to_sync(ASGIHandler())(scope, receive, send)
+    return messages
+
+
+@override_settings(RECIPE_ASYNC=ASYNC_READS)
+class AsgiExportTests(TransactionTestCase):
+    """Test exports under the ASGI handler"""
+    databases = "__all__"
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        token = Token.objects.create(user=self.user)
+        self.headers = [(b"authorization", f"Token {token.key}".encode())]
+        Recipe.objects.bulk_create(
+            Recipe(user=self.user, title=f"Recipe {i}", time_minutes=i, price=Decimal("5.50"))
+            for i in range(5)
+        )
+        return super().setUp()
+
+    def _export(self, query):
+        """Export through the ASGI handler and return the headers and body"""
+        messages = asgi_get(EXPORT_URL, query, self.headers)
+        start, *body = messages
+        self.assertEqual(start["status"], status.HTTP_200_OK)
+        return dict(start["headers"]), b"".join(message.get("body", b"") for message in body)
+
+    def test_export(self):
+        """Test exports are read before the response is sent"""
+        headers, content = self._export("format=csv")
+
+        rows = content.decode().splitlines()
+        self.assertEqual(len(rows), 6)
+        self.assertTrue(rows[0].startswith("id,title"))
+        self.assertEqual(int(headers[b"Content-Length"]), len(content))
+
+    @override_settings(RECIPE_EXPORT={"CHUNK_SIZE": 2, "SPOOL_MAX_SIZE": 1})
+    def test_spooled_to_disk(self):
+        """Test exports larger than the spool size are written to disk"""
+        _, content = self._export("format=ndjson")
+
+        self.assertEqual(len(content.decode().splitlines()), 5)
+
+    @override_settings(RECIPE_ASYNC={"READS": False})
+    def test_sync_view(self):
+        """Test exports work without async reads too"""
+        _, content = self._export("format=ndjson")
+
+        self.assertEqual(len(content.decode().splitlines()), 5)
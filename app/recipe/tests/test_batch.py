@@ -0,0 +1,187 @@
+"""
+Tests for batched recipe operations.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.search import search
+
+
+BATCH_URL = reverse("recipe:recipe-batch")
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def create_user(email="test@example.com", password="TestPass1234"):
+    """Helper function to create a user"""
+    return get_user_model().objects.create(email=email, password=password)
+
+
+def create_recipe(user, title="Sample Recipe", **params):
+    """Helper function to create a recipe"""
+    defaults = {"time_minutes": 10, "price": Decimal("5.50")}
+    defaults.update(params)
+    return Recipe.objects.create(user=user, title=title, **defaults)
+
+
+class RecipeBatchTests(TestCase):
+    """Test the batch endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def _batch(self, *operations):
+        """Post operations to the batch endpoint"""
+        return self.client.post(BATCH_URL, {"operations": operations}, format="json")
+
+    def test_mixed_operations(self):
+        """Test creates, updates and deletes are applied together"""
+        tag = Tag.objects.create(user=self.user, name="Old")
+        updated = create_recipe(self.user, title="Before")
+        updated.tags.add(tag)
+        deleted = create_recipe(self.user, title="Gone")
+
+        res = self._batch(
+            {"op": "create", "data": {
+                "title": "New", "time_minutes": 5, "price": "2.00",
+                "tags": [{"name": "Fresh"}],
+            }},
+            {"op": "update", "id": updated.id, "data": {
+                "title": "After", "tags": [{"name": "Fresh"}],
+            }},
+            {"op": "delete", "id": deleted.id},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.data["results"]
+        self.assertEqual([result["status"] for result in results], [201, 200, 204])
+        self.assertEqual(results[0]["data"]["title"], "New")
+        self.assertEqual(results[0]["data"]["tags"][0]["name"], "Fresh")
+        self.assertEqual(results[1]["data"]["title"], "After")
+
+        updated.refresh_from_db()
+        self.assertEqual(updated.title, "After")
+        self.assertEqual(updated.time_minutes, 10)
+        self.assertEqual(list(updated.tags.values_list("name", flat=True)), ["Fresh"])
+        self.assertFalse(Recipe.objects.filter(id=deleted.id).exists())
+        self.assertEqual(Tag.objects.filter(user=self.user, name="Fresh").count(), 1)
+
+    def test_invalid_operation_rolls_back(self):
+        """Test nothing is applied when one operation fails"""
+        recipe = create_recipe(self.user)
+
+        res = self._batch(
+            {"op": "delete", "id": recipe.id},
+            {"op": "create", "data": {"title": "No price", "time_minutes": 5}},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        results = res.data["results"]
+        self.assertEqual(results[0]["status"], status.HTTP_424_FAILED_DEPENDENCY)
+        self.assertEqual(results[1]["status"], status.HTTP_400_BAD_REQUEST)
+        self.assertIn("price", results[1]["errors"])
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_other_users_recipe_not_found(self):
+        """Test recipes of other users can't be changed"""
+        recipe = create_recipe(create_user(email="other@example.com"))
+
+        res = self._batch({"op": "delete", "id": recipe.id})
+
+        self.assertEqual(res.data["results"][0]["status"], status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Recipe.objects.filter(id=recipe.id).exists())
+
+    def test_recipe_changed_once(self):
+        """Test a recipe can't appear twice in a batch"""
+        recipe = create_recipe(self.user)
+
+        res = self._batch(
+            {"op": "update", "id": recipe.id, "data": {"title": "A"}},
+            {"op": "delete", "id": recipe.id},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("id", res.data["results"][1]["errors"])
+
+    def test_id_required(self):
+        """Test updates and deletes need an ID"""
+        res = self._batch({"op": "delete"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(RECIPE_BATCH={"MAX_OPERATIONS": 2})
+    def test_operation_limit(self):
+        """Test batches over the limit are rejected"""
+        res = self._batch(*({"op": "delete", "id": 1} for _ in range(3)))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("operations", res.data)
+
+    def test_queries_independent_of_batch_size(self):
+        """Test writes are set-based instead of per operation"""
+        def count_queries(size):
+            recipes = [create_recipe(self.user) for _ in range(size)]
+            operations = [
+                {"op": "update", "id": recipe.id, "data": {
+                    "title": "Updated", "ingredients": [{"name": f"Salt {size}"}],
+                }}
+                for recipe in recipes
+            ] + [
+                {"op": "create", "data": {
+                    "title": "Created", "time_minutes": 1, "price": "1.00",
+                    "tags": [{"name": f"Batch {size}"}],
+                }}
+                for _ in range(size)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                res = self._batch(*operations)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(10))
+
+    def test_deletes_set_based(self):
+        """Test deletes uncount tags and ingredients for all recipes at once"""
+        tag = Tag.objects.create(user=self.user, name="Shared")
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        kept = create_recipe(self.user, title="Kept")
+        kept.tags.add(tag)
+
+        def count_queries(size):
+            recipes = [create_recipe(self.user) for _ in range(size)]
+            for recipe in recipes:
+                recipe.tags.add(tag)
+                recipe.ingredients.add(ingredient)
+            with CaptureQueriesContext(connection) as ctx:
+                res = self._batch(*({"op": "delete", "id": recipe.id} for recipe in recipes))
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(12))
+        self.assertEqual(list(Recipe.objects.all()), [kept])
+        tag.refresh_from_db()
+        ingredient.refresh_from_db()
+        self.assertEqual(tag.recipe_count, 1)
+        self.assertEqual(ingredient.recipe_count, 0)
+
+    def test_search_and_cache_updated(self):
+        """Test batched writes are searchable and invalidate cached lists"""
+        recipe = create_recipe(self.user, title="Chili")
+        self.client.get(RECIPE_URL)
+
+        self._batch({"op": "update", "id": recipe.id, "data": {"title": "Chowder"}})
+
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.data["results"][0]["title"], "Chowder")
+        self.assertEqual(search(Recipe.objects.all(), "chowder").count(), 1)
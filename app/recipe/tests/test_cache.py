@@ -0,0 +1,233 @@
+"""
+Tests for the per-user response cache.
+"""
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag
+from recipe.cache import VERSION_KEY, bump_version, get_version, stats
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+
+
+def create_user(email="test@example.com", password="TestPass1234"):
+    """Helper function to create a user"""
+    return get_user_model().objects.create(email=email, password=password)
+
+
+def create_recipe(user, title="Sample Recipe"):
+    """Helper function to create a recipe"""
+    return Recipe.objects.create(
+        user=user,
+        title=title,
+        time_minutes=10,
+        price=Decimal("5.50"),
+    )
+
+
+class ListCacheTests(TestCase):
+    """Test list responses are cached and invalidated per user"""
+
+    def setUp(self):
+        cache.clear()
+        stats.reset()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def _titles(self):
+        """List recipes and return their titles"""
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [item["title"] for item in res.data["results"]]
+
+    def test_repeated_list_is_served_from_cache(self):
+        """Test a repeated list request doesn't hit the database"""
+        create_recipe(self.user)
+        first = self.client.get(RECIPE_URL)
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = self.client.get(RECIPE_URL)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(stats.snapshot(), {"hits": 1, "misses": 1})
+
+    def test_version_read_once(self):
+        """Test the ETag and cache key share one version read"""
+        with mock.patch("recipe.cache.get_version", wraps=get_version) as spy:
+            self.client.get(RECIPE_URL)
+            self.client.get(RECIPE_URL)
+
+        self.assertEqual(spy.call_count, 2)
+        self.assertEqual(stats.snapshot(), {"hits": 1, "misses": 1})
+
+    def test_query_string_is_part_of_key(self):
+        """Test different query parameters are cached separately"""
+        self.client.get(RECIPE_URL)
+        self.client.get(RECIPE_URL, {"page_size": 1})
+
+        self.assertEqual(stats.snapshot(), {"hits": 0, "misses": 2})
+
+    def test_create_invalidates(self):
+        """Test saving a recipe invalidates the list"""
+        self.assertEqual(self._titles(), [])
+
+        create_recipe(self.user, title="New Recipe")
+
+        self.assertEqual(self._titles(), ["New Recipe"])
+
+    def test_delete_invalidates(self):
+        """Test deleting a recipe invalidates the list"""
+        recipe = create_recipe(self.user)
+        self.assertEqual(len(self._titles()), 1)
+
+        recipe.delete()
+
+        self.assertEqual(self._titles(), [])
+
+    def test_tag_change_invalidates(self):
+        """Test renaming or assigning tags invalidates the recipe list"""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        self.client.get(RECIPE_URL)
+
+        recipe.tags.add(tag)
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.data["results"][0]["tags"][0]["name"], "Dinner")
+
+        tag.name = "Supper"
+        tag.save()
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(res.data["results"][0]["tags"][0]["name"], "Supper")
+
+    def test_tag_list_invalidated_by_assignment(self):
+        """Test assigned_only tag lists see newly assigned tags"""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        res = self.client.get(TAGS_URL, {"assigned_only": 1})
+        self.assertEqual(res.data["results"], [])
+
+        recipe.tags.add(tag)
+
+        res = self.client.get(TAGS_URL, {"assigned_only": 1})
+        self.assertEqual(len(res.data["results"]), 1)
+
+    def test_cache_is_per_user(self):
+        """Test users never see each other's cached lists"""
+        other = create_user(email="other@example.com")
+        create_recipe(other, title="Other Recipe")
+        other_client = APIClient()
+        other_client.force_authenticate(other)
+        other_client.get(RECIPE_URL)
+
+        self.assertEqual(self._titles(), [])
+
+    def test_write_through_api_invalidates(self):
+        """Test a POST invalidates the cached list"""
+        self._titles()
+        payload = {"title": "Posted", "time_minutes": 5, "price": "1.00"}
+
+        self.client.post(RECIPE_URL, payload)
+
+        self.assertEqual(self._titles(), ["Posted"])
+
+
+class FileCacheTests(TestCase):
+    """Test the cache works with a file based backend"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": self.cache_dir,
+            }
+        })
+        self.settings_override.enable()
+        stats.reset()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.cache_dir)
+        return super().tearDown()
+
+    def test_hit_and_invalidate(self):
+        """Test hits are served and writes invalidate"""
+        create_recipe(self.user, title="First")
+        self.client.get(RECIPE_URL)
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(stats.snapshot(), {"hits": 1, "misses": 1})
+        self.assertEqual(len(res.data["results"]), 1)
+
+        create_recipe(self.user, title="Second")
+        res = self.client.get(RECIPE_URL)
+
+        self.assertEqual(len(res.data["results"]), 2)
+
+
+class DatabaseCacheTests(TestCase):
+    """Test the cache works with the database backend shared by processes"""
+
+    def setUp(self):
+        self.settings_override = override_settings(CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "test_api_cache",
+            }
+        })
+        self.settings_override.enable()
+        call_command("createcachetable")
+        stats.reset()
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        return super().tearDown()
+
+    def test_invalidated_by_other_process(self):
+        """Test versions bumped through another cache instance invalidate"""
+        create_recipe(self.user, title="First")
+        self.client.get(RECIPE_URL)
+        self.client.get(RECIPE_URL)
+        self.assertEqual(stats.snapshot(), {"hits": 1, "misses": 1})
+
+        other = DatabaseCache("test_api_cache", {})
+        other.set(VERSION_KEY.format(user_id=self.user.id), "bumped", None)
+        self.client.get(RECIPE_URL)
+
+        self.assertEqual(stats.snapshot(), {"hits": 1, "misses": 2})
+
+    def test_bumped_on_commit(self):
+        """Test versions are only written when the transaction commits"""
+        version = get_version(self.user.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_version(self.user.id)
+            self.assertEqual(get_version(self.user.id), version)
+
+        self.assertNotEqual(get_version(self.user.id), version)
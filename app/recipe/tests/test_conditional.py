@@ -0,0 +1,159 @@
+"""
+Tests for conditional GET on recipe APIs.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+
+
+def detail_url(recipe_id):
+    """Get detail url for recipe"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def create_recipe(user, title="Sample Recipe"):
+    """Helper function to create a recipe"""
+    return Recipe.objects.create(
+        user=user,
+        title=title,
+        time_minutes=10,
+        price=Decimal("5.50"),
+    )
+
+
+class ConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified handling"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com",
+            password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = create_recipe(self.user)
+        return super().setUp()
+
+    def test_list_not_modified_without_queries(self):
+        """Test a matching If-None-Match on a list returns 304 without DB access"""
+        res = self.client.get(RECIPE_URL)
+        etag = res["ETag"]
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], etag)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_etag_changes_after_write(self):
+        """Test writes change the ETag so clients get fresh data"""
+        etag = self.client.get(RECIPE_URL)["ETag"]
+
+        create_recipe(self.user, title="Another")
+        res = self.client.get(RECIPE_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(res["ETag"], etag)
+        self.assertEqual(len(res.data["results"]), 2)
+
+    def test_etag_depends_on_query(self):
+        """Test different query strings don't share an ETag"""
+        etag = self.client.get(RECIPE_URL)["ETag"]
+
+        res = self.client.get(RECIPE_URL, {"page_size": 1}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_not_modified(self):
+        """Test a matching If-None-Match on a recipe returns 304"""
+        url = detail_url(self.recipe.id)
+        res = self.client.get(url)
+        self.assertIn("Last-Modified", res)
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, HTTP_IF_NONE_MATCH=res["ETag"])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_detail_if_modified_since(self):
+        """Test If-Modified-Since is answered from updated_at"""
+        url = detail_url(self.recipe.id)
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Recipe.objects.filter(id=self.recipe.id).update(
+            updated_at=timezone.now() + timedelta(minutes=1),
+        )
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_other_users_recipe_not_found(self):
+        """Test conditional headers don't leak other users' recipes"""
+        other = get_user_model().objects.create(email="other@example.com")
+        recipe = create_recipe(other)
+
+        res = self.client.get(
+            detail_url(recipe.id),
+            HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tag_changes_touch_recipe(self):
+        """Test assigning or renaming a tag updates the recipe timestamp"""
+        past = timezone.now() - timedelta(days=1)
+        Recipe.objects.filter(id=self.recipe.id).update(updated_at=past)
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+
+        self.recipe.tags.add(tag)
+        self.recipe.refresh_from_db()
+        self.assertGreater(self.recipe.updated_at, past)
+
+        Recipe.objects.filter(id=self.recipe.id).update(updated_at=past)
+        tag.name = "Supper"
+        tag.save()
+        self.recipe.refresh_from_db()
+        self.assertGreater(self.recipe.updated_at, past)
+
+    def test_tag_list_not_modified(self):
+        """Test tag lists support If-None-Match"""
+        Tag.objects.create(user=self.user, name="Dinner")
+        etag = self.client.get(TAGS_URL)["ETag"]
+
+        res = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_no_attr_detail_reads(self):
+        """Test tags and ingredients keep their write-only detail routes"""
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+
+        for url in (
+            reverse("recipe:tag-detail", args=[tag.id]),
+            reverse("recipe:ingredient-detail", args=[tag.id]),
+        ):
+            with self.subTest(url=url):
+                res = self.client.get(url)
+
+                self.assertEqual(res.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -0,0 +1,218 @@
+"""
+Tests for recipe counts of tags and ingredients.
+"""
+import json
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+BATCH_URL = reverse("recipe:recipe-batch")
+IMPORT_URL = reverse("recipe:recipe-bulk-import")
+
+
+def detail_url(recipe_id):
+    """Get detail url for recipe"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def create_recipe(user, title="Sample Recipe"):
+    """Helper function to create a recipe"""
+    return Recipe.objects.create(
+        user=user, title=title, time_minutes=10, price=Decimal("5.50"),
+    )
+
+
+class RecipeCountTests(TestCase):
+    """Test recipe counts follow changes to recipes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def assertCounts(self, model, **counts):
+        """Assert the recipe counts of objects by name"""
+        self.assertEqual(
+            dict(model.objects.filter(name__in=counts).values_list("name", "recipe_count")),
+            counts,
+        )
+
+    def test_create_and_update(self):
+        """Test counts change as recipes are created and edited"""
+        payload = {
+            "title": "Curry", "time_minutes": 30, "price": "7.50",
+            "tags": [{"name": "Dinner"}, {"name": "Spicy"}],
+            "ingredients": [{"name": "Rice"}],
+        }
+        res = self.client.post(RECIPE_URL, payload, format="json")
+        self.client.post(RECIPE_URL, {**payload, "tags": [{"name": "Dinner"}]}, format="json")
+
+        self.assertCounts(Tag, Dinner=2, Spicy=1)
+        self.assertCounts(Ingredient, Rice=2)
+
+        self.client.patch(detail_url(res.data["id"]), {"tags": [{"name": "Lunch"}]}, format="json")
+
+        self.assertCounts(Tag, Dinner=1, Spicy=0, Lunch=1)
+
+    def test_delete_recipe(self):
+        """Test deleting a recipe decrements its tags and ingredients"""
+        recipe = create_recipe(self.user)
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        recipe.tags.add(tag)
+        recipe.ingredients.add(Ingredient.objects.create(user=self.user, name="Salt"))
+
+        self.client.delete(detail_url(recipe.id))
+
+        self.assertCounts(Tag, Dinner=0)
+        self.assertCounts(Ingredient, Salt=0)
+
+    def test_delete_with_drifted_count(self):
+        """Test a count that drifted to zero doesn't block deletes"""
+        recipe = create_recipe(self.user)
+        recipe.tags.add(Tag.objects.create(user=self.user, name="Dinner"))
+        Tag.objects.update(recipe_count=0)
+
+        res = self.client.delete(detail_url(recipe.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertCounts(Tag, Dinner=0)
+
+    def test_reverse_changes(self):
+        """Test changes from the tag side are counted once per link"""
+        recipes = [create_recipe(self.user, title=f"R{i}") for i in range(3)]
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+
+        tag.recipe_set.add(*recipes)
+        tag.recipe_set.add(recipes[0])
+        self.assertCounts(Tag, Dinner=3)
+
+        tag.recipe_set.remove(recipes[0], create_recipe(self.user))
+        self.assertCounts(Tag, Dinner=2)
+
+        tag.recipe_set.clear()
+        self.assertCounts(Tag, Dinner=0)
+
+    def test_remove_unlinked(self):
+        """Test removing tags a recipe doesn't have leaves counts alone"""
+        recipe = create_recipe(self.user)
+        linked = Tag.objects.create(user=self.user, name="Linked")
+        other = Tag.objects.create(user=self.user, name="Other")
+        create_recipe(self.user).tags.add(other)
+        recipe.tags.add(linked)
+
+        recipe.tags.remove(linked, other)
+
+        self.assertCounts(Tag, Linked=0, Other=1)
+
+    def test_stale_instance_keeps_count(self):
+        """Test saving a tag loaded earlier doesn't overwrite its count"""
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        create_recipe(self.user).tags.add(tag)
+
+        tag.name = "Supper"
+        tag.save()
+
+        self.assertCounts(Tag, Supper=1)
+
+    def test_import_and_batch(self):
+        """Test set-based writes maintain counts"""
+        rows = [
+            {"title": f"R{i}", "time_minutes": 5, "price": "1.00", "tags": [{"name": "Bulk"}]}
+            for i in range(3)
+        ]
+        self.client.post(
+            IMPORT_URL,
+            "\n".join(json.dumps(row) for row in rows),
+            content_type="application/x-ndjson",
+        )
+        self.assertCounts(Tag, Bulk=3)
+
+        first, second, _ = Recipe.objects.order_by("id")
+        self.client.post(BATCH_URL, {"operations": [
+            {"op": "update", "id": first.id, "data": {"tags": [{"name": "Batch"}]}},
+            {"op": "delete", "id": second.id},
+            {"op": "create", "data": {
+                "title": "New", "time_minutes": 1, "price": "1.00",
+                "tags": [{"name": "Batch"}, {"name": "Bulk"}],
+            }},
+        ]}, format="json")
+
+        self.assertCounts(Tag, Bulk=2, Batch=2)
+
+
+class RecipeCountApiTests(TestCase):
+    """Test tag and ingredient lists use the counts"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def test_counts_listed_and_ordered(self):
+        """Test tags list their counts and can be ordered by them"""
+        recipes = [create_recipe(self.user, title=f"R{i}") for i in range(3)]
+        for name, count in (("A", 1), ("B", 3), ("C", 0)):
+            Tag.objects.create(user=self.user, name=name).recipe_set.add(*recipes[:count])
+
+        res = self.client.get(TAGS_URL, {"ordering": "-recipe_count"})
+
+        self.assertEqual(
+            [(tag["name"], tag["recipe_count"]) for tag in res.data["results"]],
+            [("B", 3), ("A", 1), ("C", 0)],
+        )
+
+    def test_invalid_ordering(self):
+        """Test unknown orderings are rejected"""
+        res = self.client.get(TAGS_URL, {"ordering": "id"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_assigned_only_without_join(self):
+        """Test assigned_only reads the count instead of joining recipes"""
+        Tag.objects.create(user=self.user, name="Unused")
+        create_recipe(self.user).tags.add(Tag.objects.create(user=self.user, name="Used"))
+
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(TAGS_URL, {"assigned_only": 1})
+
+        self.assertEqual([tag["name"] for tag in res.data["results"]], ["Used"])
+        tag_query = next(
+            query["sql"] for query in ctx.captured_queries if "core_tag" in query["sql"]
+        )
+        self.assertNotIn("JOIN", tag_query)
+        self.assertNotIn("DISTINCT", tag_query)
+
+    def test_reconcile_command(self):
+        """Test the reconcile command fixes drifted counts"""
+        tag = Tag.objects.create(user=self.user, name="Dinner")
+        create_recipe(self.user).tags.add(tag)
+        self.client.get(TAGS_URL)
+        Tag.objects.update(recipe_count=7)
+        out = StringIO()
+
+        call_command("reconcile_recipe_counts", stdout=out)
+
+        self.assertIn("Fixed 1 tags", out.getvalue())
+        self.assertIn("Fixed 0 ingredients", out.getvalue())
+        res = self.client.get(TAGS_URL)
+        self.assertEqual(res.data["results"][0]["recipe_count"], 1)
@@ -0,0 +1,152 @@
+"""
+Tests for streaming recipe export.
+"""
+import csv
+import io
+import json
+import tracemalloc
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.exports import export_rows
+
+
+EXPORT_URL = reverse("recipe:recipe-export")
+IMPORT_URL = reverse("recipe:recipe-bulk-import")
+
+
+def create_user(email="test@example.com", password="TestPass1234"):
+    """Helper function to create a user"""
+    return get_user_model().objects.create(email=email, password=password)
+
+
+def create_recipes(user, count):
+    """Helper function to create recipes in bulk"""
+    Recipe.objects.bulk_create(
+        Recipe(
+            user=user,
+            title=f"Recipe {i}",
+            description="x" * 200,
+            time_minutes=i,
+            price=Decimal("5.50"),
+        )
+        for i in range(count)
+    )
+
+
+class RecipeExportTests(TestCase):
+    """Test exporting recipes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def _content(self, res):
+        """Consume a streaming response"""
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        return b"".join(res.streaming_content).decode()
+
+    def test_export_ndjson(self):
+        """Test recipes are exported with nested tags and ingredients"""
+        recipe = Recipe.objects.create(
+            user=self.user,
+            title="Curry",
+            time_minutes=30,
+            price=Decimal("7.50"),
+            description="Hot",
+        )
+        tag = Tag.objects.create(user=self.user, name="Spicy")
+        ingredient = Ingredient.objects.create(user=self.user, name="Rice")
+        recipe.tags.add(tag)
+        recipe.ingredients.add(ingredient)
+        create_recipes(create_user(email="other@example.com"), 2)
+
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res["Content-Type"], "application/x-ndjson; charset=utf-8")
+        rows = [json.loads(line) for line in self._content(res).splitlines()]
+        self.assertEqual(rows, [{
+            "id": recipe.id,
+            "title": "Curry",
+            "description": "Hot",
+            "time_minutes": 30,
+            "price": "7.50",
+            "link": "",
+            "tags": [{"id": tag.id, "name": "Spicy"}],
+            "ingredients": [{"id": ingredient.id, "name": "Rice"}],
+        }])
+
+    def test_export_csv(self):
+        """Test the CSV export selected by format can be imported again"""
+        recipe = Recipe.objects.create(
+            user=self.user, title="Pasta", time_minutes=15, price=Decimal("4.00"),
+        )
+        recipe.tags.add(
+            Tag.objects.create(user=self.user, name="Quick"),
+            Tag.objects.create(user=self.user, name="Dinner"),
+        )
+
+        res = self.client.get(EXPORT_URL, {"format": "csv"})
+
+        self.assertIn('filename="recipes.csv"', res["Content-Disposition"])
+        content = self._content(res)
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(rows[0]["tags"], "Quick;Dinner")
+
+        self.client.post(IMPORT_URL, content, content_type="text/csv")
+        copy = Recipe.objects.exclude(pk=recipe.pk).get()
+        self.assertEqual(copy.title, "Pasta")
+        self.assertEqual(copy.tags.count(), 2)
+
+    def test_export_applies_filters(self):
+        """Test filters of the list endpoint apply to the export"""
+        create_recipes(self.user, 3)
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        Recipe.objects.get(title="Recipe 1").tags.add(tag)
+
+        res = self.client.get(EXPORT_URL, {"tags": tag.id})
+
+        rows = [json.loads(line) for line in self._content(res).splitlines()]
+        self.assertEqual([row["title"] for row in rows], ["Recipe 1"])
+
+    def test_queries_per_chunk(self):
+        """Test tags and ingredients are fetched once per chunk"""
+        create_recipes(self.user, 25)
+        queryset = Recipe.objects.filter(user=self.user).order_by("-id")
+
+        with CaptureQueriesContext(connection) as ctx:
+            batches = list(export_rows(queryset, chunk_size=10))
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        # One recipe query plus tags and ingredients for each of 3 chunks.
+        self.assertEqual(len(ctx.captured_queries), 1 + 3 * 2)
+
+    def test_memory_does_not_grow_with_rows(self):
+        """Test peak memory stays flat as the number of recipes grows"""
+        def peak(count):
+            Recipe.objects.all().delete()
+            create_recipes(self.user, count)
+            res = self.client.get(EXPORT_URL)
+            tracemalloc.start()
+            for _ in res.streaming_content:
+                pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak
+
+        small = peak(2000)
+        large = peak(8000)
+
+        self.assertLess(large, small * 1.5)
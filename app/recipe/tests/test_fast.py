@@ -0,0 +1,136 @@
+"""
+Tests for the fast recipe list serializer.
+"""
+from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+FAST = {**settings.RECIPE_SERIALIZERS, "FAST_LIST": True}
+SLOW = {**settings.RECIPE_SERIALIZERS, "FAST_LIST": False}
+
+
+def create_user(email="test@example.com", password="TestPass1234"):
+    """Helper function to create a user"""
+    return get_user_model().objects.create(email=email, password=password)
+
+
+def create_recipe(user, title="Sample Recipe", **params):
+    """Helper function to create a recipe"""
+    defaults = {"time_minutes": 10, "price": Decimal("5.50")}
+    defaults.update(params)
+    return Recipe.objects.create(user=user, title=title, **defaults)
+
+
+class FastRecipeListTests(TestCase):
+    """Test the fast list gives the same bytes as the serializers"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def _get(self, fast, params=None):
+        """List recipes with or without the fast serializer"""
+        cache.clear()
+        with override_settings(RECIPE_SERIALIZERS=FAST if fast else SLOW):
+            res = self.client.get(RECIPE_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def assertSameContent(self, params=None):
+        """Assert both paths render the same response body"""
+        slow = self._get(False, params)
+        fast = self._get(True, params)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_empty_list(self):
+        """Test an empty list is the same"""
+        self.assertSameContent()
+
+    def test_fields_and_attrs(self):
+        """Test scalar fields, tags and ingredients are the same"""
+        tags = [Tag.objects.create(user=self.user, name=name) for name in ("b", "a", "c")]
+        salt = Ingredient.objects.create(user=self.user, name="Salt")
+        first = create_recipe(
+            self.user,
+            title="Ünïcode \"quoted\"  ",
+            price=Decimal("7"),
+            link="https://example.com/r?a=1&b=2",
+        )
+        first.tags.add(*tags)
+        first.ingredients.add(salt)
+        second = create_recipe(self.user, title="Plain", price=Decimal("0.5"))
+        second.tags.add(tags[1])
+        create_recipe(create_user(email="other@example.com"), title="Hidden")
+
+        res = self.assertSameContent()
+
+        results = res.json()["results"]
+        self.assertEqual(len(results), 2)
+        self.assertEqual([tag["name"] for tag in results[1]["tags"]], ["c", "b", "a"])
+        self.assertEqual(results[1]["price"], "7.00")
+
+    def test_thumbnail(self):
+        """Test thumbnails are built from image derivatives the same way"""
+        create_recipe(
+            self.user,
+            image="uploads/recipe/photo.jpg",
+            image_derivatives={
+                "jpeg": {"160": "uploads/recipe/photo-160.jpg"},
+                "webp": {
+                    "480": "uploads/recipe/photo-480.webp",
+                    "160": "uploads/recipe/photo-160.webp",
+                },
+            },
+        )
+        create_recipe(self.user, image_derivatives={"jpeg": {}})
+
+        res = self.assertSameContent()
+
+        results = res.json()["results"]
+        self.assertIsNone(results[0]["thumbnail"])
+        self.assertTrue(results[1]["thumbnail"].endswith("photo-160.webp"))
+
+    def test_filters_search_and_pages(self):
+        """Test filtered, searched and later pages are the same"""
+        tag = Tag.objects.create(user=self.user, name="Soup")
+        for i in range(5):
+            recipe = create_recipe(self.user, title=f"Tomato soup {i}")
+            if i % 2:
+                recipe.tags.add(tag)
+
+        self.assertSameContent({"tags": tag.id})
+        self.assertSameContent({"search": "tomato"})
+        first = self.assertSameContent({"page_size": 2})
+        self.assertSameContent(parse_qs(urlparse(first.json()["next"]).query))
+
+    @override_settings(RECIPE_SERIALIZERS=FAST)
+    def test_query_count_is_constant(self):
+        """Test the fast list fetches tags and ingredients once per page"""
+        def count_queries(size):
+            for _ in range(size):
+                create_recipe(self.user).tags.add(
+                    Tag.objects.create(user=self.user, name=f"Tag {Tag.objects.count()}")
+                )
+            cache.clear()
+            with CaptureQueriesContext(connection) as ctx:
+                self.client.get(RECIPE_URL)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(count_queries(2), count_queries(20))
@@ -0,0 +1,153 @@
+"""
+Tests for sparse fieldsets on recipe APIs.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def detail_url(recipe_id):
+    """Get detail url for recipe"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def create_recipe(user, title="Sample Recipe", **params):
+    """Helper function to create a recipe with a tag and an ingredient"""
+    defaults = {"time_minutes": 10, "price": Decimal("5.50"), "description": "Long " * 50}
+    defaults.update(params)
+    recipe = Recipe.objects.create(user=user, title=title, **defaults)
+    recipe.tags.add(Tag.objects.get_or_create(user=user, name="Dinner")[0])
+    recipe.ingredients.add(Ingredient.objects.get_or_create(user=user, name="Salt")[0])
+    return recipe
+
+
+class SparseFieldsetTests(TestCase):
+    """Test fields, exclude and expand query parameters"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com", password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def _get(self, url, params=None):
+        """GET the url and return the response and query count"""
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res, len(ctx.captured_queries)
+
+    def test_fields_trim_payload_and_queries(self):
+        """Test selecting fields shrinks the payload and skips prefetches"""
+        for i in range(5):
+            create_recipe(self.user, title=f"Recipe {i}")
+
+        full, full_queries = self._get(RECIPE_URL)
+        sparse, sparse_queries = self._get(RECIPE_URL, {"fields": "id,title"})
+
+        self.assertEqual(list(sparse.data["results"][0]), ["id", "title"])
+        self.assertLess(len(sparse.content), len(full.content) / 2)
+        # Tags and ingredients are no longer prefetched.
+        self.assertEqual(sparse_queries, full_queries - 2)
+
+    def test_columns_are_deferred(self):
+        """Test only the columns of selected fields are read"""
+        create_recipe(self.user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(RECIPE_URL, {"fields": "id,title"})
+
+        recipe_query = next(
+            query["sql"] for query in ctx.captured_queries
+            if query["sql"].startswith('SELECT "core_recipe"."id"')
+        )
+        self.assertNotIn('"core_recipe"."description"', recipe_query)
+        self.assertNotIn('"core_recipe"."search_vector"', recipe_query)
+        self.assertNotIn('"core_recipe"."price"', recipe_query)
+
+    def test_exclude(self):
+        """Test excluded fields are left out"""
+        create_recipe(self.user)
+
+        res, _ = self._get(RECIPE_URL, {"exclude": "tags,ingredients,thumbnail"})
+
+        self.assertEqual(
+            list(res.data["results"][0]), ["id", "title", "time_minutes", "price", "link"],
+        )
+
+    def test_empty_fields(self):
+        """Test an empty fields parameter returns the default fields"""
+        create_recipe(self.user)
+
+        full, _ = self._get(RECIPE_URL)
+        res, _ = self._get(RECIPE_URL, {"fields": ""})
+
+        self.assertEqual(res.data["results"], full.data["results"])
+        self.assertTrue(res.data["results"][0])
+
+    def test_expand_list(self):
+        """Test detail fields can be added to list results"""
+        recipe = create_recipe(self.user)
+
+        res, _ = self._get(RECIPE_URL, {"expand": "description", "fields": "title"})
+
+        self.assertEqual(res.data["results"][0], {
+            "title": recipe.title, "description": recipe.description,
+        })
+
+    def test_detail_fields(self):
+        """Test detail responses can be trimmed too"""
+        recipe = create_recipe(self.user)
+
+        full, full_queries = self._get(detail_url(recipe.id))
+        res, queries = self._get(detail_url(recipe.id), {"exclude": "description,tags"})
+
+        self.assertNotIn("description", res.data)
+        self.assertNotIn("tags", res.data)
+        self.assertIn("ingredients", res.data)
+        self.assertIn("Last-Modified", res)
+        self.assertEqual(queries, full_queries - 1)
+
+    def test_unknown_fields_rejected(self):
+        """Test unknown or unexpandable fields return an error"""
+        for params in ({"fields": "title,secret"}, {"exclude": "user"}, {"expand": "title"}):
+            with self.subTest(params=params):
+                res = self.client.get(RECIPE_URL, params)
+
+                self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(next(iter(params)), res.data)
+
+    def test_writes_ignore_fields(self):
+        """Test the parameters don't limit what can be written"""
+        res = self.client.post(
+            f"{RECIPE_URL}?fields=id",
+            {"title": "New", "time_minutes": 5, "price": "2.00"},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data["title"], "New")
+
+    @override_settings(RECIPE_SERIALIZERS={**settings.RECIPE_SERIALIZERS, "FAST_LIST": True})
+    def test_fast_list_with_fields(self):
+        """Test selected fields apply when the fast list is enabled"""
+        create_recipe(self.user)
+
+        res, _ = self._get(RECIPE_URL, {"fields": "title"})
+
+        self.assertEqual(list(res.data["results"][0]), ["title"])
@@ -0,0 +1,128 @@
+"""
+Tests for recipe filter backend.
+"""
+from decimal import Decimal
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.filters import RecipeAttrFilterBackend
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def create_recipe(user, title, tags=(), ingredients=()):
+    """Helper function to create a recipe with tags and ingredients"""
+    recipe = Recipe.objects.create(
+        user=user,
+        title=title,
+        time_minutes=10,
+        price=Decimal("5.50"),
+    )
+    recipe.tags.add(*tags)
+    recipe.ingredients.add(*ingredients)
+    return recipe
+
+
+class RecipeAttrFilterTests(TestCase):
+    """Test filtering recipes by tags and ingredients"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com",
+            password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.vegan = Tag.objects.create(user=self.user, name="Vegan")
+        self.quick = Tag.objects.create(user=self.user, name="Quick")
+        self.salt = Ingredient.objects.create(user=self.user, name="Salt")
+        self.both = create_recipe(
+            self.user, "Both", tags=[self.vegan, self.quick], ingredients=[self.salt],
+        )
+        self.vegan_only = create_recipe(self.user, "Vegan", tags=[self.vegan])
+        self.untagged = create_recipe(self.user, "Untagged")
+        return super().setUp()
+
+    def _filter(self, query_string):
+        """Apply the filter backend to the user's recipes"""
+        request = Request(APIRequestFactory().get(f"/{query_string}"))
+        queryset = Recipe.objects.filter(user=self.user).order_by("-id")
+        return RecipeAttrFilterBackend().filter_queryset(request, queryset, None)
+
+    def _ids(self, res):
+        """Return the recipe ids of a list response"""
+        return [item["id"] for item in res.data["results"]]
+
+    def assertNoDedupe(self, queryset):
+        """Assert neither the SQL nor the query plan deduplicates rows"""
+        self.assertNotIn("DISTINCT", str(queryset.query).upper())
+        for line in queryset.explain().splitlines():
+            self.assertNotIn("DISTINCT", line.upper())
+            self.assertFalse(line.strip().startswith("Unique"), line)
+
+    def test_filter_any_tag_returns_each_recipe_once(self):
+        """Test recipes matching several tags are listed once"""
+        params = {"tags": f"{self.vegan.id},{self.quick.id}"}
+        res = self.client.get(RECIPE_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(res), [self.vegan_only.id, self.both.id])
+
+    def test_filter_all_tags(self):
+        """Test tags_match=all only returns recipes having every tag"""
+        params = {
+            "tags": f"{self.vegan.id},{self.quick.id}",
+            "tags_match": "all",
+        }
+        res = self.client.get(RECIPE_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(res), [self.both.id])
+
+    def test_filter_tags_and_ingredients(self):
+        """Test combining tag and ingredient filters"""
+        params = {
+            "tags": f"{self.vegan.id}",
+            "ingredients": f"{self.salt.id}",
+        }
+        res = self.client.get(RECIPE_URL, params)
+
+        self.assertEqual(self._ids(res), [self.both.id])
+
+    def test_filter_invalid_ids_error(self):
+        """Test non-numeric IDs return a bad request"""
+        res = self.client.get(RECIPE_URL, {"tags": "1,abc"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_invalid_match_error(self):
+        """Test an unknown match mode returns a bad request"""
+        params = {"tags": f"{self.vegan.id}", "tags_match": "some"}
+        res = self.client.get(RECIPE_URL, params)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_any_filter_plan_has_no_distinct(self):
+        """Test the any-match filter is planned without deduplication"""
+        queryset = self._filter(f"?tags={self.vegan.id},{self.quick.id}")
+
+        self.assertNoDedupe(queryset)
+        self.assertIn("EXISTS", str(queryset.query).upper())
+
+    def test_all_filter_plan_has_no_distinct(self):
+        """Test the all-match filter is planned without deduplication"""
+        queryset = self._filter(
+            f"?tags={self.vegan.id},{self.quick.id}&tags_match=all"
+            f"&ingredients={self.salt.id}&ingredients_match=all"
+        )
+
+        self.assertNoDedupe(queryset)
+        self.assertEqual(list(queryset), [self.both])
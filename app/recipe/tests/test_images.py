@@ -0,0 +1,253 @@
+"""
+Tests for recipe image derivatives.
+"""
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import ImageJob, Recipe
+from recipe.images import delete_derivatives, process_pending
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def detail_url(recipe_id):
+    """Get detail url for recipe"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def image_upload_url(recipe_id):
+    """Get image upload url for recipe"""
+    return reverse("recipe:recipe-upload-image", args=[recipe_id])
+
+
+class ImageDerivativeTests(TestCase):
+    """Test resized copies of uploaded images"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com",
+            password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Sample Recipe",
+            time_minutes=10,
+            price=Decimal("5.50"),
+        )
+        return super().setUp()
+
+    def tearDown(self):
+        if Recipe.objects.filter(pk=self.recipe.pk).exists():
+            self.recipe.refresh_from_db()
+        delete_derivatives(self.recipe)
+        self.recipe.image.delete()
+        return super().tearDown()
+
+    def _upload(self, size=(1200, 600)):
+        """Upload an image of the given size"""
+        with tempfile.NamedTemporaryFile(suffix=".png") as image_file:
+            Image.new("RGBA", size).save(image_file, format="PNG")
+            image_file.seek(0)
+            res = self.client.post(
+                image_upload_url(self.recipe.id),
+                {"image": image_file},
+                format="multipart",
+            )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res
+
+    def test_upload_queues_job(self):
+        """Test uploading an image queues work instead of resizing inline"""
+        res = self._upload()
+
+        self.assertEqual(res.data["image_derivatives"], {})
+        job = ImageJob.objects.get(recipe=self.recipe)
+        self.assertEqual(job.status, ImageJob.Status.PENDING)
+
+    def test_process_pending_creates_derivatives(self):
+        """Test the worker writes every configured width and format"""
+        self._upload()
+
+        self.assertEqual(process_pending(), 1)
+
+        self.recipe.refresh_from_db()
+        derivatives = self.recipe.image_derivatives
+        self.assertEqual(set(derivatives), {"webp", "jpeg"})
+        for fmt, names in derivatives.items():
+            self.assertEqual(set(names), {"160", "480", "960"})
+            path = self.recipe.image.storage.path(names["160"])
+            with Image.open(path) as img:
+                self.assertEqual(img.size, (160, 80))
+                self.assertEqual(img.format, fmt.upper())
+        job = ImageJob.objects.get(recipe=self.recipe)
+        self.assertEqual(job.status, ImageJob.Status.DONE)
+
+    def test_serializers_expose_urls(self):
+        """Test list responses carry a thumbnail and detail all derivatives"""
+        self._upload()
+        process_pending()
+
+        res = self.client.get(RECIPE_URL)
+        thumbnail = res.data["results"][0]["thumbnail"]
+        self.assertTrue(thumbnail.startswith("http://testserver/"))
+        self.assertTrue(thumbnail.endswith("-160.webp"))
+
+        res = self.client.get(detail_url(self.recipe.id))
+        self.assertEqual(res.data["image_derivatives"]["webp"]["160"], thumbnail)
+        self.assertIn("960", res.data["image_derivatives"]["jpeg"])
+
+    def test_small_image_not_upscaled(self):
+        """Test derivatives never exceed the original width"""
+        self._upload(size=(100, 50))
+        process_pending()
+
+        self.recipe.refresh_from_db()
+        name = self.recipe.image_derivatives["jpeg"]["960"]
+        with Image.open(self.recipe.image.storage.path(name)) as img:
+            self.assertEqual(img.size, (100, 50))
+
+    def test_reupload_replaces_derivatives(self):
+        """Test old derivative files are removed after a new upload"""
+        self._upload()
+        process_pending()
+        self.recipe.refresh_from_db()
+        old_name = self.recipe.image_derivatives["webp"]["160"]
+        old_image = self.recipe.image.name
+
+        res = self._upload()
+
+        self.assertEqual(res.data["image_derivatives"], {})
+        self.assertIsNone(self.client.get(RECIPE_URL).data["results"][0]["thumbnail"])
+        self.assertTrue(self.recipe.image.storage.exists(old_name))
+        process_pending()
+
+        self.recipe.image.storage.delete(old_image)
+        self.assertFalse(self.recipe.image.storage.exists(old_name))
+        self.recipe.refresh_from_db()
+        self.assertNotIn(old_name, self.recipe.image_derivatives["webp"].values())
+
+    def test_pending_job_deleted_with_recipe(self):
+        """Test derivatives a pending job would replace are removed with it"""
+        self._upload()
+        process_pending()
+        self.recipe.refresh_from_db()
+        storage = self.recipe.image.storage
+        names = [name for widths in self.recipe.image_derivatives.values()
+                 for name in widths.values()]
+        old_image = self.recipe.image.name
+        self._upload()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(detail_url(self.recipe.id))
+
+        self.assertFalse(any(storage.exists(name) for name in names))
+        storage.delete(old_image)
+        self.recipe.image.delete(save=False)
+        self.recipe.image_derivatives = {}
+
+    @patch("recipe.images.generate_derivatives", side_effect=OSError("broken"))
+    def test_failed_job_retried_then_failed(self, mock_generate):
+        """Test failing jobs are retried up to MAX_ATTEMPTS"""
+        job = ImageJob.objects.create(recipe=self.recipe)
+
+        for _ in range(3):
+            process_pending()
+
+        job.refresh_from_db()
+        self.assertEqual(mock_generate.call_count, 3)
+        self.assertEqual(job.status, ImageJob.Status.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertEqual(job.error, "broken")
+        self.assertEqual(process_pending(), 0)
+
+    def test_stale_running_job_reclaimed(self):
+        """Test jobs of a stopped worker are picked up again"""
+        self._upload()
+        job = ImageJob.objects.get(recipe=self.recipe)
+        ImageJob.objects.filter(pk=job.pk).update(
+            status=ImageJob.Status.RUNNING, attempts=1,
+            updated_at=timezone.now() - timedelta(minutes=5),
+        )
+        self.assertEqual(process_pending(), 0)
+
+        ImageJob.objects.filter(pk=job.pk).update(
+            updated_at=timezone.now() - timedelta(minutes=11),
+        )
+        self.assertEqual(process_pending(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.Status.DONE)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_job_out_of_attempts_failed(self):
+        """Test stale jobs that used up their attempts fail"""
+        job = ImageJob.objects.create(recipe=self.recipe)
+        ImageJob.objects.filter(pk=job.pk).update(
+            status=ImageJob.Status.RUNNING, attempts=3,
+            updated_at=timezone.now() - timedelta(hours=1),
+        )
+
+        self.assertEqual(process_pending(), 0)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImageJob.Status.FAILED)
+        self.assertEqual(job.error, "Timed out while running.")
+
+    def test_delete_removes_derivatives(self):
+        """Test derivative files are removed with their recipe"""
+        self._upload()
+        process_pending()
+        self.recipe.refresh_from_db()
+        storage = self.recipe.image.storage
+        names = [name for widths in self.recipe.image_derivatives.values()
+                 for name in widths.values()]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(detail_url(self.recipe.id))
+
+        self.assertFalse(any(storage.exists(name) for name in names))
+        self.recipe.image.delete(save=False)
+        self.recipe.image_derivatives = {}
+
+    def test_process_image_jobs_command(self):
+        """Test the worker command drains the queue with --once"""
+        self._upload()
+        out = StringIO()
+
+        call_command("process_image_jobs", once=True, stdout=out)
+
+        self.assertIn("Processed 1 image jobs", out.getvalue())
+        self.assertFalse(
+            ImageJob.objects.filter(status=ImageJob.Status.PENDING).exists()
+        )
+
+    def test_sync_pipeline(self):
+        """Test the sync pipeline returns derivatives with the upload"""
+        images = {
+            **settings.RECIPE_IMAGES,
+            "WIDTHS": [160],
+            "FORMATS": ["jpeg"],
+            "PIPELINE": "sync",
+        }
+        with override_settings(RECIPE_IMAGES=images):
+            res = self._upload()
+
+        self.assertEqual(list(res.data["image_derivatives"]["jpeg"]), ["160"])
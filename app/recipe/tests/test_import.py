@@ -0,0 +1,187 @@
+"""
+Tests for bulk recipe import.
+"""
+import json
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.search import search, update_search_vectors
+
+
+IMPORT_URL = reverse("recipe:recipe-bulk-import")
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def create_user(email="test@example.com", password="TestPass1234"):
+    """Helper function to create a user"""
+    return get_user_model().objects.create(email=email, password=password)
+
+
+def ndjson(*rows):
+    """Encode rows as newline delimited JSON"""
+    return "\n".join(
+        row if isinstance(row, str) else json.dumps(row) for row in rows
+    ) + "\n"
+
+
+class RecipeImportTests(TestCase):
+    """Test importing recipes in bulk"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def _import(self, body, content_type="application/x-ndjson"):
+        """Post an import body and return the report"""
+        res = self.client.post(IMPORT_URL, body, content_type=content_type)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_import_ndjson(self):
+        """Test recipes with tags and ingredients are imported"""
+        existing = Tag.objects.create(user=self.user, name="Dinner")
+        body = ndjson(
+            {
+                "title": "Curry",
+                "time_minutes": 30,
+                "price": "7.50",
+                "description": "Hot",
+                "tags": [{"name": "Dinner"}, {"name": "Spicy"}],
+                "ingredients": [{"name": "Rice"}],
+            },
+            {"title": "Toast", "time_minutes": 2, "price": "1.00"},
+        )
+
+        report = self._import(body)
+
+        self.assertEqual(report, {"created": 2, "failed": 0, "errors": []})
+        curry = Recipe.objects.get(title="Curry")
+        self.assertEqual(curry.user, self.user)
+        self.assertEqual(curry.price, Decimal("7.50"))
+        self.assertEqual(curry.description, "Hot")
+        self.assertEqual(
+            sorted(curry.tags.values_list("name", flat=True)), ["Dinner", "Spicy"],
+        )
+        self.assertIn(existing, curry.tags.all())
+        self.assertEqual(list(curry.ingredients.values_list("name", flat=True)), ["Rice"])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 2)
+
+    def test_import_csv(self):
+        """Test CSV rows are imported with semicolon separated names"""
+        body = (
+            "title,time_minutes,price,link,tags,ingredients\n"
+            'Pasta,15,4.00,,Quick; Dinner,"Flour;Egg"\n'
+            "Salad,5,3.00,https://example.com,,\n"
+        )
+
+        report = self._import(body, content_type="text/csv")
+
+        self.assertEqual(report["created"], 2)
+        pasta = Recipe.objects.get(title="Pasta")
+        self.assertEqual(
+            sorted(pasta.tags.values_list("name", flat=True)), ["Dinner", "Quick"],
+        )
+        self.assertEqual(pasta.ingredients.count(), 2)
+        self.assertEqual(Recipe.objects.get(title="Salad").link, "https://example.com")
+
+    def test_reports_row_errors(self):
+        """Test invalid rows are reported and valid rows still imported"""
+        body = ndjson(
+            {"title": "Good", "time_minutes": 5, "price": "1.00"},
+            {"title": "No price", "time_minutes": 5},
+            "{not json",
+            [1, 2],
+            {"title": "Also good", "time_minutes": 5, "price": "2.00"},
+        )
+
+        report = self._import(body)
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["failed"], 3)
+        self.assertEqual([error["row"] for error in report["errors"]], [2, 3, 4])
+        self.assertIn("price", report["errors"][0]["errors"])
+        self.assertEqual(
+            set(Recipe.objects.values_list("title", flat=True)), {"Good", "Also good"},
+        )
+
+    @override_settings(RECIPE_IMPORT={**settings.RECIPE_IMPORT, "BATCH_SIZE": 2})
+    def test_import_in_batches(self):
+        """Test rows spanning several batches are all imported"""
+        tag = {"name": "Batch"}
+        body = ndjson(*(
+            {"title": f"R{i}", "time_minutes": i, "price": "1.00", "tags": [tag]}
+            for i in range(5)
+        ))
+
+        report = self._import(body)
+
+        self.assertEqual(report["created"], 5)
+        self.assertEqual(Tag.objects.get(name="Batch").recipe_set.count(), 5)
+
+    @override_settings(RECIPE_IMPORT={**settings.RECIPE_IMPORT, "MAX_ERRORS": 2})
+    def test_errors_are_capped(self):
+        """Test only the first errors are listed but all are counted"""
+        body = ndjson(*({"title": "Bad"} for _ in range(4)))
+
+        report = self._import(body)
+
+        self.assertEqual(report["failed"], 4)
+        self.assertEqual(len(report["errors"]), 2)
+
+    def test_duplicate_names_in_row(self):
+        """Test a name repeated within a row is linked once"""
+        body = ndjson({
+            "title": "Soup",
+            "time_minutes": 5,
+            "price": "1.00",
+            "ingredients": [{"name": "Salt"}, {"name": "Salt"}],
+        })
+
+        self._import(body)
+
+        self.assertEqual(Recipe.objects.get().ingredients.count(), 1)
+        self.assertEqual(Ingredient.objects.count(), 1)
+
+    def test_import_is_searchable_and_invalidates_cache(self):
+        """Test imported recipes are indexed and listed right away"""
+        self.client.get(RECIPE_URL)
+
+        self._import(ndjson({"title": "Goulash", "time_minutes": 5, "price": "1.00"}))
+
+        res = self.client.get(RECIPE_URL)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(search(Recipe.objects.all(), "goulash").count(), 1)
+
+    def test_search_vector_matches_incremental_update(self):
+        """Test imported vectors equal the ones kept up to date by signals"""
+        self._import(ndjson({
+            "title": "Goulash",
+            "description": "Slow cooked",
+            "time_minutes": 5,
+            "price": "1.00",
+            "tags": [{"name": "Hungarian"}],
+            "ingredients": [{"name": "Paprika"}],
+        }))
+        imported = Recipe.objects.values_list("search_vector", flat=True).get()
+
+        update_search_vectors(Recipe.objects.all())
+
+        self.assertEqual(
+            Recipe.objects.values_list("search_vector", flat=True).get(), imported,
+        )
+
+    def test_unsupported_media_type(self):
+        """Test JSON bodies are rejected"""
+        res = self.client.post(IMPORT_URL, {"title": "X"}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
@@ -12,7 +12,7 @@ from rest_framework import status
 
 from core.models import Ingredient, Recipe
 
-from recipe.serializers import IngredientSerializer
+from recipe.serializers import IngredientDetailSerializer
 
 
 INGREDIENTS_URL = reverse("recipe:ingredient-list")
@@ -64,10 +64,10 @@ class PrivateIngredientsTests(TestCase):
         res = self.client.get(INGREDIENTS_URL)
 
         ingredients = Ingredient.objects.all().order_by("-name")
-        serializer = IngredientSerializer(ingredients, many=True)
+        serializer = IngredientDetailSerializer(ingredients, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_ingredients_limited_to_user(self):
         """Test list of ingredients is limited to authenticated user"""
@@ -78,9 +78,9 @@ class PrivateIngredientsTests(TestCase):
         res = self.client.get(INGREDIENTS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["name"], ingredient.name)
-        self.assertEqual(res.data[0]["id"], ingredient.id)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["name"], ingredient.name)
+        self.assertEqual(res.data["results"][0]["id"], ingredient.id)
 
     def test_upgrade_ingrediant(self):
         """Test upgrading ingredient"""
@@ -123,10 +123,11 @@ class PrivateIngredientsTests(TestCase):
 
         res = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
 
-        s1 = IngredientSerializer(in1)
-        s2 = IngredientSerializer(in2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        in1.refresh_from_db()
+        s1 = IngredientDetailSerializer(in1)
+        s2 = IngredientDetailSerializer(in2)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertNotIn(s2.data, res.data["results"])
 
     def test_filtered_ingredient_unique(self):
         """Test filtered ingredients returns a unique list."""
@@ -149,4 +150,4 @@ class PrivateIngredientsTests(TestCase):
 
         res = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
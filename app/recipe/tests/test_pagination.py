@@ -0,0 +1,134 @@
+"""
+Tests for cursor pagination of recipe APIs.
+"""
+import base64
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+
+
+def create_user(email="test@example.com", password="TestPass1234"):
+    """Helper function to create a user"""
+    return get_user_model().objects.create(email=email, password=password)
+
+
+class PaginationTests(TestCase):
+    """Test paging through recipes and tags"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        self.recipes = [
+            Recipe.objects.create(
+                user=self.user,
+                title=f"Sample Recipe {i}",
+                time_minutes=10,
+                price=Decimal("5.50"),
+            )
+            for i in range(12)
+        ]
+        return super().setUp()
+
+    def _read_all_pages(self, url, params):
+        """Follow next links and return results and per-page query counts"""
+        results, query_counts = [], []
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            query_counts.append(ctx.captured_queries)
+            results.extend(res.data["results"])
+            url, params = res.data["next"], None
+        return results, query_counts
+
+    def test_recipes_paginated_newest_first(self):
+        """Test paging through recipes returns each recipe once in order"""
+        results, _ = self._read_all_pages(RECIPE_URL, {"page_size": 5})
+
+        expected = [recipe.id for recipe in reversed(self.recipes)]
+        self.assertEqual([item["id"] for item in results], expected)
+
+    def test_page_cost_is_stable(self):
+        """Test deep pages cost the same queries and never COUNT(*)"""
+        _, query_counts = self._read_all_pages(RECIPE_URL, {"page_size": 3})
+
+        self.assertEqual(len({len(queries) for queries in query_counts}), 1)
+        for queries in query_counts:
+            for query in queries:
+                self.assertNotIn("COUNT(", query["sql"].upper())
+
+    def test_oversized_page_size_is_clamped(self):
+        """Test an oversized page_size is clamped instead of rejected"""
+        res = self.client.get(RECIPE_URL, {"page_size": 100000})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), len(self.recipes))
+        self.assertIsNone(res.data["next"])
+
+    def test_tags_paginated_by_name(self):
+        """Test paging through tags follows the name ordering"""
+        for name in ["Apple", "Banana", "Cherry", "Date", "Elder"]:
+            Tag.objects.create(user=self.user, name=name)
+
+        results, _ = self._read_all_pages(TAGS_URL, {"page_size": 2})
+
+        self.assertEqual(
+            [item["name"] for item in results],
+            ["Elder", "Date", "Cherry", "Banana", "Apple"],
+        )
+
+    def test_tags_paginated_by_tied_counts(self):
+        """Test tags with equal recipe counts are paged by name without OFFSET"""
+        for i, name in enumerate(["Apple", "Banana", "Cherry", "Date", "Elder", "Fig"]):
+            tag = Tag.objects.create(user=self.user, name=name)
+            tag.recipe_set.add(*self.recipes[:i % 2])
+
+        results, query_counts = self._read_all_pages(
+            TAGS_URL, {"ordering": "-recipe_count", "page_size": 2},
+        )
+
+        self.assertEqual(
+            [item["name"] for item in results],
+            ["Fig", "Date", "Banana", "Elder", "Cherry", "Apple"],
+        )
+        for queries in query_counts:
+            for query in queries:
+                self.assertNotIn("OFFSET", query["sql"].upper())
+
+    def test_previous_pages(self):
+        """Test previous links walk back through tied positions"""
+        for name in ["Apple", "Banana", "Cherry", "Date", "Elder"]:
+            Tag.objects.create(user=self.user, name=name)
+        params = {"ordering": "-recipe_count", "page_size": 2}
+        res = self.client.get(TAGS_URL, params)
+        res = self.client.get(res.data["next"])
+        res = self.client.get(res.data["next"])
+
+        res = self.client.get(res.data["previous"])
+
+        self.assertEqual([item["name"] for item in res.data["results"]], ["Cherry", "Banana"])
+        res = self.client.get(res.data["previous"])
+        self.assertEqual([item["name"] for item in res.data["results"]], ["Elder", "Date"])
+        self.assertIsNone(res.data["previous"])
+
+    def test_invalid_cursor(self):
+        """Test malformed cursor positions are rejected"""
+        for position in ["p=nope", "p=%5B%22x%22%5D", "p=%5B1%2C2%5D"]:
+            cursor = base64.b64encode(position.encode()).decode()
+            res = self.client.get(RECIPE_URL, {"cursor": cursor})
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
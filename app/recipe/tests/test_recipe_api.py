@@ -92,7 +92,7 @@ class PrivateRecipeTests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_recipe_list_is_limited_to_user(self):
         """Test recipe list is limited to authenticated user"""
@@ -110,7 +110,7 @@ class PrivateRecipeTests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data["results"])
 
     def test_get_recipe_detail(self):
         """Test get recipe detail"""
@@ -407,9 +407,9 @@ class PrivateRecipeTests(TestCase):
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
 
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertIn(s2.data, res.data["results"])
+        self.assertNotIn(s3.data, res.data["results"])
 
     def test_filter_recipe_by_ingredients(self):
         """Test filtering recipes by ingredients"""
@@ -428,9 +428,9 @@ class PrivateRecipeTests(TestCase):
         s2 = RecipeSerializer(r2)
         s3 = RecipeSerializer(r3)
 
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertIn(s2.data, res.data["results"])
+        self.assertNotIn(s3.data, res.data["results"])
 
 
 class ImageUploadTests(TestCase):
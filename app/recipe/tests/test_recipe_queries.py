@@ -0,0 +1,175 @@
+"""
+Query count regression tests for recipe API.
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def detail_url(recipe_id):
+    """Get detail url for recipe"""
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+def create_recipes(user, count, tags=(), ingredients=()):
+    """Helper function to create recipes with tags and ingredients"""
+    recipes = []
+    for i in range(count):
+        recipe = Recipe.objects.create(
+            user=user,
+            title=f"Sample Recipe {i}",
+            time_minutes=10,
+            price=Decimal("5.50"),
+        )
+        recipe.tags.add(*tags)
+        recipe.ingredients.add(*ingredients)
+        recipes.append(recipe)
+    return recipes
+
+
+class RecipeQueryCountTests(TestCase):
+    """Test query counts don't grow with the number of recipes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com",
+            password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        self.tags = [
+            Tag.objects.create(user=self.user, name=f"Tag {i}")
+            for i in range(3)
+        ]
+        self.ingredients = [
+            Ingredient.objects.create(user=self.user, name=f"Ingredient {i}")
+            for i in range(3)
+        ]
+        return super().setUp()
+
+    def _count_queries(self, url, params=None):
+        """Return the number of queries needed to GET the url"""
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        """Test listing recipes uses a fixed number of queries"""
+        create_recipes(self.user, 2, self.tags, self.ingredients)
+        small = self._count_queries(RECIPE_URL)
+
+        create_recipes(self.user, 20, self.tags, self.ingredients)
+        large = self._count_queries(RECIPE_URL)
+
+        self.assertEqual(small, large)
+
+    def test_filter_query_count_is_constant(self):
+        """Test filtering recipes uses a fixed number of queries"""
+        params = {
+            "tags": f"{self.tags[0].id}",
+            "ingredients": f"{self.ingredients[0].id}",
+        }
+        create_recipes(self.user, 2, self.tags, self.ingredients)
+        small = self._count_queries(RECIPE_URL, params)
+
+        create_recipes(self.user, 20, self.tags, self.ingredients)
+        large = self._count_queries(RECIPE_URL, params)
+
+        self.assertEqual(small, large)
+
+    def test_detail_prefetches_tags_and_ingredients(self):
+        """Test retrieving a recipe loads tags and ingredients in bulk"""
+        recipe = create_recipes(self.user, 1)[0]
+        without_attrs = self._count_queries(detail_url(recipe.id))
+
+        recipe.tags.add(*self.tags)
+        recipe.ingredients.add(*self.ingredients)
+        with_attrs = self._count_queries(detail_url(recipe.id))
+
+        self.assertEqual(without_attrs, with_attrs)
+
+
+class RecipeWriteQueryCountTests(TestCase):
+    """Test nested tags and ingredients are resolved in bulk"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create(
+            email="test@example.com",
+            password="TestPass1234",
+        )
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def _create_with_attrs(self, count):
+        """Create a recipe with count tags and ingredients and count queries"""
+        payload = {
+            "title": f"Recipe with {count} items",
+            "time_minutes": 30,
+            "price": Decimal("2.50"),
+            "tags": [{"name": f"Tag {i}"} for i in range(count)],
+            "ingredients": [{"name": f"Ingredient {i}"} for i in range(count)],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(RECIPE_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        return len(ctx.captured_queries)
+
+    def test_create_query_count_is_constant(self):
+        """Test creating a recipe doesn't run queries per nested item"""
+        small = self._create_with_attrs(2)
+        large = self._create_with_attrs(30)
+
+        self.assertEqual(small, large)
+
+    def test_create_with_duplicate_names(self):
+        """Test repeated names in a payload resolve to a single object"""
+        payload = {
+            "title": "Soup",
+            "time_minutes": 30,
+            "price": Decimal("2.50"),
+            "tags": [{"name": "Dinner"}, {"name": "Dinner"}],
+        }
+        res = self.client.post(RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        recipe = Recipe.objects.get(id=res.data["id"])
+        self.assertEqual(recipe.tags.count(), 1)
+
+    def test_create_with_concurrently_created_tag(self):
+        """Test a tag created between lookup and insert is reused"""
+        real_bulk_create = Tag.objects.bulk_create
+        concurrent = {}
+
+        def racing_bulk_create(objs, **kwargs):
+            concurrent["tag"] = Tag.objects.create(user=self.user, name="Lunch")
+            return real_bulk_create(objs, **kwargs)
+
+        payload = {
+            "title": "Salad",
+            "time_minutes": 10,
+            "price": Decimal("3.00"),
+            "tags": [{"name": "Lunch"}],
+        }
+        with patch.object(Tag.objects, "bulk_create", racing_bulk_create):
+            res = self.client.post(RECIPE_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+        recipe = Recipe.objects.get(id=res.data["id"])
+        self.assertEqual(list(recipe.tags.all()), [concurrent["tag"]])
@@ -0,0 +1,179 @@
+"""
+Tests for full-text recipe search.
+"""
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import Recipe, Tag, Ingredient
+from recipe.search import search
+
+
+RECIPE_URL = reverse("recipe:recipe-list")
+
+
+def create_user(email="test@example.com", password="TestPass1234"):
+    """Helper function to create a user"""
+    return get_user_model().objects.create(email=email, password=password)
+
+
+def create_recipe(user, title, description="", tags=(), ingredients=()):
+    """Helper function to create a recipe with tags and ingredients"""
+    recipe = Recipe.objects.create(
+        user=user,
+        title=title,
+        description=description,
+        time_minutes=10,
+        price=Decimal("5.50"),
+    )
+    recipe.tags.add(*tags)
+    recipe.ingredients.add(*ingredients)
+    return recipe
+
+
+class RecipeSearchTests(TestCase):
+    """Test searching recipes through the API"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user()
+        self.client.force_authenticate(self.user)
+        return super().setUp()
+
+    def _search(self, text, **params):
+        """Search recipes and return the titles in result order"""
+        res = self.client.get(RECIPE_URL, {"search": text, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [item["title"] for item in res.data["results"]]
+
+    def test_search_matches_all_text_fields(self):
+        """Test title, description, tag and ingredient names are searched"""
+        tag = Tag.objects.create(user=self.user, name="Breakfast")
+        ingredient = Ingredient.objects.create(user=self.user, name="Paprika")
+        create_recipe(self.user, "Omelette")
+        create_recipe(self.user, "Stew", description="Slow cooked omelette filling")
+        create_recipe(self.user, "Pancakes", tags=[tag])
+        create_recipe(self.user, "Goulash", ingredients=[ingredient])
+
+        self.assertEqual(set(self._search("omelette")), {"Omelette", "Stew"})
+        self.assertEqual(self._search("breakfast"), ["Pancakes"])
+        self.assertEqual(self._search("paprika"), ["Goulash"])
+
+    def test_search_stems_words(self):
+        """Test inflected forms of a word match each other"""
+        create_recipe(self.user, "Baked potatoes")
+
+        self.assertEqual(self._search("baking potato"), ["Baked potatoes"])
+
+    def test_results_ordered_by_rank(self):
+        """Test title matches rank above description matches"""
+        create_recipe(self.user, "Lasagne", description="Layers of curry paste")
+        create_recipe(self.user, "Green curry")
+
+        self.assertEqual(self._search("curry"), ["Green curry", "Lasagne"])
+
+    def test_websearch_syntax(self):
+        """Test phrases and exclusions are supported"""
+        create_recipe(self.user, "Chicken soup")
+        create_recipe(self.user, "Chicken curry")
+
+        self.assertEqual(self._search("chicken -soup"), ["Chicken curry"])
+        self.assertEqual(self._search('"chicken soup"'), ["Chicken soup"])
+
+    def test_search_limited_to_user(self):
+        """Test other users' recipes are never found"""
+        create_recipe(create_user(email="other@example.com"), "Secret soup")
+
+        self.assertEqual(self._search("soup"), [])
+
+    def test_empty_search_returns_all(self):
+        """Test an empty search parameter doesn't filter"""
+        create_recipe(self.user, "Soup")
+
+        self.assertEqual(self._search(""), ["Soup"])
+
+    def test_paginates_through_tied_ranks(self):
+        """Test cursors walk every result when ranks are equal"""
+        for i in range(5):
+            create_recipe(self.user, f"Soup {i}")
+
+        titles = []
+        res = self.client.get(RECIPE_URL, {"search": "soup", "page_size": 2})
+        while True:
+            titles += [item["title"] for item in res.data["results"]]
+            if not res.data["next"]:
+                break
+            res = self.client.get(res.data["next"])
+
+        self.assertEqual(titles, [f"Soup {i}" for i in reversed(range(5))])
+
+    def test_combines_with_attr_filters(self):
+        """Test search can be combined with tag filters"""
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        create_recipe(self.user, "Lentil soup", tags=[tag])
+        create_recipe(self.user, "Chicken soup")
+
+        self.assertEqual(self._search("soup", tags=tag.id), ["Lentil soup"])
+
+
+class SearchVectorUpdateTests(TestCase):
+    """Test search vectors follow changes to recipes and their attributes"""
+
+    def setUp(self):
+        self.user = create_user()
+        self.tag = Tag.objects.create(user=self.user, name="Spicy")
+        self.recipe = create_recipe(self.user, "Chili", tags=[self.tag])
+        return super().setUp()
+
+    def _matches(self, text):
+        """Return the titles of recipes matching text"""
+        return list(search(Recipe.objects.all(), text).values_list("title", flat=True))
+
+    def test_title_update(self):
+        """Test saving a recipe updates its vector"""
+        self.recipe.title = "Chowder"
+        self.recipe.save()
+
+        self.assertEqual(self._matches("chowder"), ["Chowder"])
+        self.assertEqual(self._matches("chili"), [])
+
+    def test_tag_rename(self):
+        """Test renaming a tag updates its recipes"""
+        self.tag.name = "Mild"
+        self.tag.save()
+
+        self.assertEqual(self._matches("mild"), ["Chili"])
+        self.assertEqual(self._matches("spicy"), [])
+
+    def test_tag_delete(self):
+        """Test deleting a tag removes it from its recipes"""
+        self.tag.delete()
+
+        self.assertEqual(self._matches("spicy"), [])
+        self.assertEqual(self._matches("chili"), ["Chili"])
+
+    def test_tag_removed_from_recipe(self):
+        """Test removing a tag from a recipe updates the vector"""
+        self.recipe.tags.remove(self.tag)
+
+        self.assertEqual(self._matches("spicy"), [])
+
+    def test_reverse_clear(self):
+        """Test clearing a tag's recipes updates their vectors"""
+        self.tag.recipe_set.clear()
+
+        self.assertEqual(self._matches("spicy"), [])
+
+    def test_search_uses_gin_index(self):
+        """Test the search query can use the GIN index"""
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = search(Recipe.objects.all(), "chili").explain()
+
+        self.assertIn("recipe_search_vector_idx", plan)
@@ -10,7 +10,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from recipe.serializers import TagSerializer
+from recipe.serializers import TagDetailSerializer
 from core.models import Tag, Recipe
 
 TAGS_URL = reverse("recipe:tag-list")
@@ -63,10 +63,10 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL)
 
         tags = Tag.objects.all().order_by("-name")
-        serializer = TagSerializer(tags, many=True)
+        serializer = TagDetailSerializer(tags, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_tags_limited_to_user(self):
         """Test Tags list is limited to authenticated user"""
@@ -77,9 +77,9 @@ class PrivateTagsApiTests(TestCase):
         res = self.client.get(TAGS_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data[0]["name"], tag.name)
-        self.assertEqual(res.data[0]["id"], tag.id)
+        self.assertEqual(len(res.data["results"]), 1)
+        self.assertEqual(res.data["results"][0]["name"], tag.name)
+        self.assertEqual(res.data["results"][0]["id"], tag.id)
 
     def test_update_tag(self):
         """Test updating an existig Tag"""
@@ -95,6 +95,18 @@ class PrivateTagsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(tag.name, payload["name"])
 
+    def test_update_tag_duplicate_name_error(self):
+        """Test renaming a tag to an existing name returns an error"""
+        create_tag(user=self.user, name="Dinner")
+        tag = create_tag(user=self.user, name="Supper")
+        url = detail_url(tag_id=tag.id)
+
+        res = self.client.patch(url, {"name": "Dinner"})
+        tag.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(tag.name, "Supper")
+
     def test_delete_tag(self):
         """Test deleting an existing tag"""
         tag = create_tag(user=self.user, name="Breakfast")
@@ -119,10 +131,11 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
-        s1 = TagSerializer(tag1)
-        s2 = TagSerializer(tag2)
-        self.assertIn(s1.data, res.data)
-        self.assertNotIn(s2.data, res.data)
+        tag1.refresh_from_db()
+        s1 = TagDetailSerializer(tag1)
+        s2 = TagDetailSerializer(tag2)
+        self.assertIn(s1.data, res.data["results"])
+        self.assertNotIn(s2.data, res.data["results"])
 
     def test_filtered_tag_unique(self):
         """Test filtered tags returns a unique list."""
@@ -145,4 +158,4 @@ class PrivateTagsApiTests(TestCase):
 
         res = self.client.get(TAGS_URL, {"assigned_only": 1})
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
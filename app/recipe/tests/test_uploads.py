@@ -0,0 +1,179 @@
+"""
+Tests for streaming image uploads.
+"""
+import os
+import struct
+import tempfile
+import tracemalloc
+import zlib
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import resolve, reverse
+
+from rest_framework.test import force_authenticate
+from rest_framework import status
+
+from core.models import Recipe
+from recipe.uploads import MULTIPART_OVERHEAD, LimitedImageUploadHandler
+
+
+BOUNDARY = "UploadBoundary"
+MB = 2 ** 20
+
+
+def bmp_header(width, height):
+    """Return the header of an uncompressed 24-bit BMP"""
+    row_size = (width * 3 + 3) & ~3
+    image_size = row_size * height
+    return (
+        struct.pack("<2sIHHI", b"BM", 54 + image_size, 0, 0, 54)
+        + struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, image_size, 0, 0, 0, 0)
+    ), image_size
+
+
+def png_header(width, height):
+    """Return a PNG signature and IHDR chunk claiming the given size"""
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr
+        + struct.pack(">I", zlib.crc32(b"IHDR" + ihdr))
+    )
+
+
+def write_multipart(path, header, body_size):
+    """Write a multipart body with one image file to path, in chunks"""
+    with open(path, "wb") as f:
+        f.write(
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="image"; filename="upload.bmp"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n".encode()
+        )
+        f.write(header)
+        chunk = b"\0" * MB
+        remaining = body_size
+        while remaining > 0:
+            f.write(chunk[:remaining])
+            remaining -= len(chunk)
+        f.write(f"\r\n--{BOUNDARY}--\r\n".encode())
+    return os.path.getsize(path)
+
+
+class StreamingUploadTests(TestCase):
+    """Test uploads are streamed and checked before being read fully"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(
+            email="test@example.com",
+            password="TestPass1234",
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            title="Sample Recipe",
+            time_minutes=10,
+            price=Decimal("5.50"),
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.body_path = os.path.join(self.tmp_dir.name, "body")
+        return super().setUp()
+
+    def tearDown(self):
+        self.recipe.refresh_from_db()
+        self.recipe.image.delete()
+        self.tmp_dir.cleanup()
+        return super().tearDown()
+
+    def _post(self, length):
+        """Stream the body file through the upload view"""
+        url = reverse("recipe:recipe-upload-image", args=[self.recipe.id])
+        with open(self.body_path, "rb") as body:
+            request = WSGIRequest({
+                "REQUEST_METHOD": "POST",
+                "PATH_INFO": url,
+                "CONTENT_TYPE": f"multipart/form-data; boundary={BOUNDARY}",
+                "CONTENT_LENGTH": str(length),
+                "SERVER_NAME": "testserver",
+                "SERVER_PORT": "80",
+                "wsgi.url_scheme": "http",
+                "wsgi.input": body,
+            })
+            force_authenticate(request, user=self.user)
+            return resolve(url).func(request, pk=self.recipe.id)
+
+    def _measure(self, length):
+        """Post the body and return the response and peak allocations in bytes"""
+        tracemalloc.start()
+        try:
+            res = self._post(length)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return res, peak
+
+    @override_settings(RECIPE_IMAGES={
+        **settings.RECIPE_IMAGES,
+        "MAX_UPLOAD_BYTES": 64 * MB,
+    })
+    def test_large_upload_streams_with_flat_memory(self):
+        """Test a 50 MB upload is written to disk without buffering it"""
+        header, image_size = bmp_header(4096, 4096)
+        length = write_multipart(self.body_path, header, image_size)
+        self.assertGreater(length, 48 * MB)
+
+        res, peak = self._measure(length)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK, res.data)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image.size, len(header) + image_size)
+        self.assertLess(peak, 8 * MB)
+
+    def test_oversized_upload_rejected_before_reading(self):
+        """Test a 50 MB upload is refused from its Content-Length"""
+        header, image_size = bmp_header(4096, 4096)
+        length = write_multipart(self.body_path, header, image_size)
+
+        res, peak = self._measure(length)
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertLess(peak, 2 * MB)
+
+    @override_settings(RECIPE_IMAGES={**settings.RECIPE_IMAGES, "MAX_UPLOAD_BYTES": MB})
+    def test_oversized_file_rejected_while_streaming(self):
+        """Test a file over the limit is aborted when its length passes the check"""
+        header, _ = bmp_header(1024, 1024)
+        length = write_multipart(self.body_path, header, MB + 16 * 2 ** 10 - len(header))
+        self.assertLessEqual(length, MB + MULTIPART_OVERHEAD)
+        interrupted = LimitedImageUploadHandler.upload_interrupted
+
+        with mock.patch.object(
+            LimitedImageUploadHandler, "upload_interrupted",
+            autospec=True, side_effect=interrupted,
+        ) as upload_interrupted:
+            res = self._post(length)
+
+        self.assertEqual(res.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        upload_interrupted.assert_called_once()
+        self.recipe.refresh_from_db()
+        self.assertFalse(self.recipe.image)
+
+    def test_decompression_bomb_rejected_from_header(self):
+        """Test images claiming huge dimensions are rejected early"""
+        length = write_multipart(self.body_path, png_header(100_000, 100_000), MB)
+
+        res = self._post(length)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("image", res.data)
+
+    def test_non_image_rejected(self):
+        """Test files without an image header are rejected"""
+        length = write_multipart(self.body_path, b"not an image", MB)
+
+        res = self._post(length)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
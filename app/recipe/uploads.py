@@ -0,0 +1,108 @@
+"""
+Streaming upload handling for recipe images
+"""
+import io
+import warnings
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.http.multipartparser import (
+    MultiPartParser as DjangoMultiPartParser,
+    MultiPartParserError,
+)
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, ParseError, ValidationError
+from rest_framework.parsers import DataAndFiles, MultiPartParser
+
+
+# Room for the multipart boundaries and headers around the file.
+MULTIPART_OVERHEAD = 64 * 2 ** 10
+
+
+class RequestEntityTooLarge(APIException):
+    """Raised when an upload exceeds the configured size"""
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Uploaded file is too large."
+    default_code = "too_large"
+
+
+def _config():
+    """Return the image settings."""
+    return settings.RECIPE_IMAGES
+
+
+class LimitedImageUploadHandler(TemporaryFileUploadHandler):
+    """Stream an image upload to disk, checking its size as it arrives
+
+    The request is refused from its Content-Length before any of the
+    body is read, and the upload is aborted as soon as the byte limit is
+    passed. The pixel dimensions are read from the image header in the
+    first chunks, so decompression bombs are rejected without reading
+    the rest of the body.
+    """
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        if content_length > _config()["MAX_UPLOAD_BYTES"] + MULTIPART_OVERHEAD:
+            raise RequestEntityTooLarge()
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.header = bytearray()
+        self.header_checked = False
+
+    def _abort(self, exc):
+        """Remove the partial file and raise exc."""
+        self.upload_interrupted()
+        raise exc
+
+    def _check_header(self, raw_data):
+        """Read the image dimensions once enough of the header arrived."""
+        self.header += raw_data
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+                with Image.open(io.BytesIO(self.header)) as img:
+                    width, height = img.size
+        except Image.DecompressionBombError:
+            self._abort(ValidationError({"image": "Image dimensions are too large."}))
+        except Exception:
+            if len(self.header) >= _config()["MAX_HEADER_BYTES"]:
+                self._abort(ValidationError({"image": "Upload a valid image."}))
+            return
+
+        if width * height > _config()["MAX_PIXELS"]:
+            self._abort(ValidationError({"image": "Image dimensions are too large."}))
+        self.header_checked = True
+        self.header = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > _config()["MAX_UPLOAD_BYTES"]:
+            self._abort(RequestEntityTooLarge())
+        if not self.header_checked:
+            self._check_header(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if not self.header_checked:
+            self._abort(ValidationError({"image": "Upload a valid image."}))
+        return super().file_complete(file_size)
+
+
+class ImageUploadParser(MultiPartParser):
+    """Multipart parser that streams files through LimitedImageUploadHandler"""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        request = parser_context["request"]
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        meta = request.META.copy()
+        meta["CONTENT_TYPE"] = media_type
+        upload_handlers = [LimitedImageUploadHandler(request)]
+
+        try:
+            parser = DjangoMultiPartParser(meta, stream, upload_handlers, encoding)
+            data, files = parser.parse()
+            return DataAndFiles(data, files)
+        except MultiPartParserError as exc:
+            raise ParseError(f"Multipart form parse error - {exc}")
@@ -1,6 +1,8 @@
 """
 Views for recipe APIs
 """
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from drf_spectacular.utils import (
     extend_schema,
     extend_schema_view,
@@ -11,17 +13,58 @@ from drf_spectacular.utils import (
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
+from recipe.asyncviews import AsyncReadMixin
+from recipe.batch import run_batch
+from recipe.cache import CachedListMixin
+from recipe.conditional import ConditionalGetMixin, ConditionalRetrieveMixin
+from recipe.exports import read_blocks, spool, stream
+from recipe.fast import recipe_rows, use_fast_list
+from recipe.fieldsets import attrs, columns, select_fields
+from recipe.filters import RecipeAttrFilterBackend, RecipeSearchFilterBackend
+from recipe.images import enqueue_derivatives
+from recipe.imports import import_recipes
+from recipe.pagination import (
+    RecipeCursorPagination,
+    RecipeAttrCursorPagination,
+)
+from recipe.parsers import NDJSONParser, CSVParser
+from recipe.renderers import NDJSONRenderer, CSVRenderer
+from recipe.replicas import ReplicaReadMixin
 from recipe.serializers import (
     RecipeSerializer,
+    FastRecipeSerializer,
     RecipeDetailSerializer,
-    TagSerializer,
-    IngredientSerializer,
+    TagDetailSerializer,
+    IngredientDetailSerializer,
     RecipeImageSerializer,
+    RecipeBatchSerializer,
 )
+from recipe.uploads import ImageUploadParser
 from core.models import Recipe, Tag, Ingredient
+from user.authentication import CachedTokenAuthentication
+
+
+LIST_FIELDS = RecipeSerializer.Meta.fields
+DETAIL_FIELDS = RecipeDetailSerializer.Meta.fields
+FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        OpenApiTypes.STR,
+        description="Comma separated list of fields to return instead of the default ones.",
+    ),
+    OpenApiParameter(
+        "exclude",
+        OpenApiTypes.STR,
+        description="Comma separated list of fields to leave out.",
+    ),
+    OpenApiParameter(
+        "expand",
+        OpenApiTypes.STR,
+        description="Comma separated list of detail fields to add to list results.",
+    ),
+]
 
 
 @extend_schema_view(
@@ -32,52 +75,109 @@ from core.models import Recipe, Tag, Ingredient
                 OpenApiTypes.STR,
                 description="Comma separeted list of IDs to filter"
             ),
+            OpenApiParameter(
+                "tags_match",
+                OpenApiTypes.STR, enum=["any", "all"],
+                description="Match recipes with any (default) or all of the tags."
+            ),
             OpenApiParameter(
                 "ingredients",
                 OpenApiTypes.STR,
                 description="Comma separated list of ingredient IDs to filter"
-            )
-        ]
-    )
+            ),
+            OpenApiParameter(
+                "ingredients_match",
+                OpenApiTypes.STR, enum=["any", "all"],
+                description="Match recipes with any (default) or all of the ingredients."
+            ),
+            OpenApiParameter(
+                "search",
+                OpenApiTypes.STR,
+                description="Full-text search, results ordered by relevance."
+            ),
+        ] + FIELDSET_PARAMETERS
+    ),
+    retrieve=extend_schema(parameters=FIELDSET_PARAMETERS[:2]),
 )
-class RecipeViewset(viewsets.ModelViewSet):
+class RecipeViewset(AsyncReadMixin,
+                    ReplicaReadMixin,
+                    ConditionalRetrieveMixin,
+                    CachedListMixin,
+                    viewsets.ModelViewSet):
     """View for listing der Recipie"""
     queryset = Recipe.objects.all()
     serializer_class = RecipeDetailSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeCursorPagination
+    filter_backends = [RecipeAttrFilterBackend, RecipeSearchFilterBackend]
+
+    def get_fields(self):
+        """Return the fields selected for list and detail responses."""
+        if self.action not in ("list", "retrieve"):
+            return None
+        if not hasattr(self, "_fields"):
+            default = LIST_FIELDS if self.action == "list" else DETAIL_FIELDS
+            self._fields = select_fields(self.request.query_params, default, DETAIL_FIELDS)
+        return self._fields
 
-    def _params_to_ints(self, qs):
-        """Convert a list of strings to integers."""
-        return [int(str_id) for str_id in qs.split(',')]
+    def _fast_list(self):
+        """Return whether the list is read as plain rows."""
+        return (
+            self.action == "list"
+            and use_fast_list()
+            and self.get_fields() == LIST_FIELDS
+        )
 
     def get_queryset(self):
         """Retrieve recipes for authenticated user."""
-        tags = self.request.query_params.get("tags")
-        ingredients = self.request.query_params.get("ingredients")
         queryset = self.queryset
-        if tags:
-            tag_ids = self._params_to_ints(tags)
-            queryset = queryset.filter(tags__id__in=tag_ids)
-        if ingredients:
-            ingredients_ids = self._params_to_ints(ingredients)
-            queryset = queryset.filter(ingredients__id__in=ingredients_ids)
+        fields = self.get_fields()
+        if fields is not None and not self._fast_list():
+            # Detail responses send updated_at as Last-Modified.
+            queryset = queryset.only(*columns(fields), "updated_at")
+            queryset = queryset.with_attrs(attrs(fields))
+        elif fields is None and self.action not in ("upload_image", "export"):
+            queryset = queryset.with_attrs()
 
-        return queryset.filter(user=self.request.user).order_by("-id").distinct()
+        return queryset.for_user(self.request.user).order_by("-id")
+
+    def filter_queryset(self, queryset):
+        """Filter recipes, reading them as plain rows for the fast list."""
+        queryset = super().filter_queryset(queryset)
+        if self._fast_list():
+            return recipe_rows(queryset)
+        return queryset
 
     def get_serializer_class(self):
         """Return the serializer class for request"""
         if self.action == "list":
+            if self._fast_list():
+                return FastRecipeSerializer
+            if set(self.get_fields()) - set(LIST_FIELDS):
+                return RecipeDetailSerializer
             return RecipeSerializer
         elif self.action == "upload_image":
             return RecipeImageSerializer
         return self.serializer_class
 
+    def get_serializer(self, *args, **kwargs):
+        """Return a serializer limited to the selected fields."""
+        fields = self.get_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
     def perform_create(self, serializer):
         """Create new Recipe"""
         serializer.save(user=self.request.user)
 
-    @action(methods=["POST"], detail=True, url_path="upload-image")
+    @action(
+        methods=["POST"],
+        detail=True,
+        url_path="upload-image",
+        parser_classes=[ImageUploadParser],
+    )
     def upload_image(self, request, pk=None):
         """Upload an image to a recipe"""
         recipe = self.get_object()
@@ -85,9 +185,72 @@ class RecipeViewset(viewsets.ModelViewSet):
 
         if serializer.is_valid():
             serializer.save()
+            enqueue_derivatives(recipe)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @extend_schema(
+        request={
+            "application/x-ndjson": RecipeDetailSerializer,
+            "text/csv": OpenApiTypes.STR,
+        },
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="import",
+        parser_classes=[NDJSONParser, CSVParser],
+    )
+    def bulk_import(self, request):
+        """Import recipes from NDJSON or CSV, reporting rejected rows"""
+        report = import_recipes(request.data, self.get_serializer(), request.user)
+        return Response(report, status=status.HTTP_200_OK)
+
+    @extend_schema(request=RecipeBatchSerializer, responses=OpenApiTypes.OBJECT)
+    @action(methods=["POST"], detail=False)
+    def batch(self, request):
+        """Create, update and delete recipes in one transaction"""
+        serializer = RecipeBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        status_code, results = run_batch(
+            serializer.validated_data["operations"],
+            request.user,
+            RecipeDetailSerializer,
+            self.get_serializer_context(),
+        )
+        return Response({"results": results}, status=status_code)
+
+    @extend_schema(responses={
+        (200, "application/x-ndjson"): OpenApiTypes.STR,
+        (200, "text/csv"): OpenApiTypes.STR,
+    })
+    @action(
+        methods=["GET"],
+        detail=False,
+        renderer_classes=[NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request):
+        """Stream all recipes as NDJSON or CSV, chosen by Accept or ?format="""
+        renderer = request.accepted_renderer
+        content = stream(renderer, self.filter_queryset(self.get_queryset()))
+        size = None
+        if isinstance(request._request, ASGIRequest):
+            # Django 3.2 sends streaming responses from the event loop under
+            # ASGI, where queries can't run. Read the export here instead.
+            buffer, size = spool(content, renderer.charset)
+            content = read_blocks(buffer)
+        response = StreamingHttpResponse(
+            content,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        if size is not None:
+            response["Content-Length"] = size
+        response["Content-Disposition"] = (
+            f'attachment; filename="recipes.{renderer.format}"'
+        )
+        return response
+
 
 @extend_schema_view(
     list=extend_schema(
@@ -96,17 +259,27 @@ class RecipeViewset(viewsets.ModelViewSet):
                 "assigned_only",
                 OpenApiTypes.INT, enum=[0, 1],
                 description="Filter by items assigned to recipes.",
-            )
+            ),
+            OpenApiParameter(
+                "ordering",
+                OpenApiTypes.STR, enum=["-name", "-recipe_count"],
+                description="Order by name (default) or by number of recipes.",
+            ),
         ]
     )
 )
-class BaseRecipeAttrViewset(viewsets.GenericViewSet,
+class BaseRecipeAttrViewset(AsyncReadMixin,
+                            ReplicaReadMixin,
+                            ConditionalGetMixin,
+                            CachedListMixin,
+                            viewsets.GenericViewSet,
                             mixins.ListModelMixin,
                             mixins.UpdateModelMixin,
                             mixins.DestroyModelMixin):
     """Base class for Recipe Attributes"""
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = RecipeAttrCursorPagination
 
     def get_queryset(self):
         """Filter queryset to authenticated user"""
@@ -115,17 +288,17 @@ class BaseRecipeAttrViewset(viewsets.GenericViewSet,
         )
         queryset = self.queryset
         if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
-        return queryset.filter(user=self.request.user).order_by("-name").distinct()
+            queryset = queryset.filter(recipe_count__gt=0)
+        return queryset.filter(user=self.request.user).order_by("-name")
 
 
 class TagViewset(BaseRecipeAttrViewset):
     """Manage Tags in Database"""
-    serializer_class = TagSerializer
+    serializer_class = TagDetailSerializer
     queryset = Tag.objects.all()
 
 
 class IngredientsViewset(BaseRecipeAttrViewset):
     """Manage Ingredients in Database"""
-    serializer_class = IngredientSerializer
+    serializer_class = IngredientDetailSerializer
     queryset = Ingredient.objects.all()
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class UserConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'user'
+
+    def ready(self):
+        from user import signals  # noqa: F401
+        from user.authentication import check_shared_cache
+
+        check_shared_cache()
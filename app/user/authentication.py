@@ -0,0 +1,153 @@
+"""
+Authentication classes for the API.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import TokenAuthentication
+
+from core.caches import is_database, is_process_local
+
+
+SHARED_KEY = "auth:token:{digest}"
+# User fields kept in the cache, the others load from the database on use.
+USER_FIELDS = ("id", "is_active", "is_staff", "is_superuser")
+
+
+class LocalTTLCache:
+    """Small in-process LRU cache whose entries expire after a TTL"""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value for key or None if missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Store value, evicting the least recently used entry if full."""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+
+def _config():
+    """Return the token cache settings."""
+    return getattr(settings, "TOKEN_AUTH_CACHE", {})
+
+
+local_cache = LocalTTLCache(
+    maxsize=_config().get("LOCAL_MAXSIZE", 1024),
+    ttl=_config().get("LOCAL_TIMEOUT", 30),
+)
+
+
+def _digest(key):
+    """Hash a token key so raw tokens never end up in cache keys."""
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _shared_cache():
+    """Return the shared cache backend for tokens, or None to skip it.
+
+    A lookup in a database cache costs as much as the token query itself.
+    """
+    alias = _config().get("ALIAS", "default")
+    if is_database(alias):
+        return None
+    return caches[alias]
+
+
+def check_shared_cache():
+    """Refuse a shared tier that other processes can't see.
+
+    Deleted tokens are only dropped from the shared tier of other
+    processes, so a process-local cache would accept them for TIMEOUT.
+    """
+    alias = _config().get("ALIAS", "default")
+    if is_process_local(alias):
+        raise ImproperlyConfigured(
+            f'TOKEN_AUTH_CACHE["ALIAS"] is "{alias}", a process-local cache. '
+            "Use a cache shared between processes so deleted tokens are rejected everywhere."
+        )
+
+
+def invalidate_token(key):
+    """Drop a token from both cache tiers."""
+    digest = _digest(key)
+    local_cache.delete(digest)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(SHARED_KEY.format(digest=digest))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that caches the token and user lookup
+
+    Lookups go to a short-lived in-process tier first and a shared cache
+    second. Deleting a token or saving its user invalidates both tiers in
+    this process and the shared tier everywhere; other processes may keep
+    a stale entry for at most LOCAL_TIMEOUT seconds. Only the user's id
+    and flags are cached, never the password hash or the token key.
+    """
+
+    def _cached(self, key, values):
+        """Build the user and token of a cached lookup."""
+        user = get_user_model().from_db(DEFAULT_DB_ALIAS, USER_FIELDS, values)
+        token = self.get_model().from_db(DEFAULT_DB_ALIAS, ("key", "user_id"), (key, user.pk))
+        return user, token
+
+    def authenticate_credentials(self, key):
+        digest = _digest(key)
+        shared = _shared_cache()
+        values = local_cache.get(digest)
+        if values is None and shared is not None:
+            values = shared.get(SHARED_KEY.format(digest=digest))
+            if values is not None:
+                local_cache.set(digest, values)
+        if values is not None:
+            return self._cached(key, values)
+
+        user, token = super().authenticate_credentials(key)
+        values = tuple(getattr(user, field) for field in USER_FIELDS)
+        local_cache.set(digest, values)
+        if shared is not None:
+            shared.set(
+                SHARED_KEY.format(digest=digest),
+                values,
+                _config().get("TIMEOUT", 300),
+            )
+        return user, token
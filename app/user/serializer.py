@@ -5,8 +5,10 @@ from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import gettext as _
 from rest_framework import serializers
 
+from core.metrics import ProfiledSerializerMixin
 
-class UserModelSerializer(serializers.ModelSerializer):
+
+class UserModelSerializer(ProfiledSerializerMixin, serializers.ModelSerializer):
     """Model Serializer for the active Usermodel"""
 
     class Meta:
@@ -0,0 +1,24 @@
+"""
+Signal handlers for users.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from user.authentication import invalidate_token
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Stop accepting a deleted token from the cache"""
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=get_user_model())
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    """Refresh cached users after changes such as deactivation"""
+    if created:
+        return
+    for key in Token.objects.filter(user=instance).values_list("key", flat=True):
+        invalidate_token(key)
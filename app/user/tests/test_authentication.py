@@ -0,0 +1,185 @@
+"""
+Tests for cached token authentication.
+"""
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import (
+    SHARED_KEY,
+    CachedTokenAuthentication,
+    LocalTTLCache,
+    _digest,
+    check_shared_cache,
+    local_cache,
+)
+
+ME_URL = reverse("user:me")
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test the token lookup is cached and invalidated"""
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email="test@example.com",
+            password="TestPass1234",
+            name="Test Name",
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        return super().setUp()
+
+    def _authenticate(self):
+        """Authenticate the token and return the user, token and queries"""
+        with CaptureQueriesContext(connection) as ctx:
+            user, token = CachedTokenAuthentication().authenticate_credentials(self.token.key)
+        return user, token, ctx.captured_queries
+
+    def test_repeated_requests_skip_token_lookup(self):
+        """Test only the first request queries the token table"""
+        self.client.get(ME_URL)
+
+        user, token, queries = self._authenticate()
+
+        self.assertEqual(queries, [])
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_shared_tier_used_when_local_expired(self):
+        """Test the shared cache serves lookups missing from the local tier"""
+        self.client.get(ME_URL)
+        local_cache.clear()
+
+        user, _, queries = self._authenticate()
+
+        self.assertEqual(queries, [])
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_only_ids_and_flags_cached(self):
+        """Test the password hash and token key stay out of the cache"""
+        self.client.get(ME_URL)
+
+        cached = cache.get(SHARED_KEY.format(digest=_digest(self.token.key)))
+
+        self.assertEqual(cached, (self.user.id, True, False, False))
+
+    def test_cached_user_loads_fields(self):
+        """Test fields left out of the cache load from the database"""
+        self.client.get(ME_URL)
+
+        user, _, _ = self._authenticate()
+
+        self.assertEqual(user.email, self.user.email)
+        self.assertTrue(user.check_password("TestPass1234"))
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "api_cache",
+    }})
+    def test_database_cache_skipped(self):
+        """Test a database cache isn't used as the shared tier"""
+        self.client.get(ME_URL)
+        local_cache.clear()
+
+        _, _, queries = self._authenticate()
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("api_cache", queries[0]["sql"])
+
+    def test_deleted_token_rejected(self):
+        """Test deleting a token invalidates the cache"""
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """Test deactivating a user invalidates the cache"""
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_visible(self):
+        """Test updates through the API aren't hidden by the cache"""
+        self.client.get(ME_URL)
+
+        self.client.patch(ME_URL, {"name": "Updated Name"})
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data["name"], "Updated Name")
+
+    def test_invalid_token_rejected(self):
+        """Test unknown tokens are still rejected"""
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LocalTTLCacheTests(TestCase):
+    """Test the in-process cache tier"""
+
+    def test_least_recently_used_evicted(self):
+        """Test the oldest entry is evicted when the cache is full"""
+        local = LocalTTLCache(maxsize=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+
+        self.assertEqual(local.get("a"), 1)
+        self.assertIsNone(local.get("b"))
+        self.assertEqual(local.get("c"), 3)
+
+    @patch("user.authentication.time.monotonic")
+    def test_entries_expire(self, mock_monotonic):
+        """Test entries are dropped after the TTL"""
+        local = LocalTTLCache(maxsize=2, ttl=30)
+        mock_monotonic.return_value = 100
+        local.set("a", 1)
+
+        mock_monotonic.return_value = 129
+        self.assertEqual(local.get("a"), 1)
+        mock_monotonic.return_value = 131
+        self.assertIsNone(local.get("a"))
+
+
+class SharedCacheCheckTests(TestCase):
+    """Test the shared tier must be shared between processes"""
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }})
+    def test_process_local_cache(self):
+        """Test a process-local cache is refused"""
+        with self.assertRaisesRegex(ImproperlyConfigured, 'TOKEN_AUTH_CACHE\\["ALIAS"\\]'):
+            check_shared_cache()
+
+    @override_settings(CACHES={"default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "api_cache",
+    }})
+    def test_shared_cache(self):
+        """Test a database cache is accepted, as it is skipped"""
+        check_shared_cache()
@@ -1,10 +1,12 @@
 """Views for the user API."""
 
+from django.contrib.auth import get_user_model
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView
 from rest_framework.authtoken.views import ObtainAuthToken
 from user.serializer import UserModelSerializer, AuthTokenSerializer
 from rest_framework.settings import api_settings
-from rest_framework import authentication, permissions
+from rest_framework import permissions
+from user.authentication import CachedTokenAuthentication
 
 
 class UserCreateAPIView(CreateAPIView):
@@ -21,9 +23,12 @@ class CreateAuthToken(ObtainAuthToken):
 class ManageUserView(RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = UserModelSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        """Retrieve and return the authenticated user"""
-        return self.request.user
+        """Retrieve and return the authenticated user
+
+        Cached authentication only loads the user's id and flags.
+        """
+        return get_user_model().objects.get(pk=self.request.user.pk)